@@ -0,0 +1,10 @@
+"""
+Columnar analytics engine behind the lesson's two debugging exercises.
+
+movie_analytics.py (part1) and sales_analytics.py (part2) stay as they are: small,
+list-of-dicts classes with bugs planted for students to find. This package answers the
+same questions at production sizes (millions of rows), using NumPy column arrays and
+memory-mapped caches. Run the modules from the lesson folder, e.g.
+
+    python -m analytics_engine.movies --bench
+"""
@@ -0,0 +1,396 @@
+"""
+Columnar storage for the analytics datasets.
+
+Instead of one dict per CSV row (several hundred bytes each, and every query a Python loop),
+a ColumnarTable keeps one NumPy array per column:
+  - dates       -> int32 days since 1970-01-01
+  - int / float -> int64 / float64
+  - category    -> int32 codes + a Dictionary of labels (user, title, genre: few distinct values)
+  - text        -> one UTF-8 blob + int64 offsets (unique ids such as view_id)
+
+A table can be saved to a single binary file and re-opened with mmap: no parsing at all,
+the OS pages the arrays in on first touch.
+
+File layout:
+  b"COLTAB01" | uint64 header length | JSON header | arrays (each 64-byte aligned)
+`extras` are extra named arrays saved alongside the columns (a dataset's aggregates),
+stored under "@name" and mmapped back into table.extras.
+"""
+from __future__ import annotations
+import csv, datetime as _dt, gc, json, mmap, os, struct
+from itertools import islice
+
+import numpy as np
+
+DATE, INT, FLOAT, CATEGORY, TEXT = "date", "int", "float", "category", "text"
+DTYPES = {DATE: np.int32, INT: np.int64, FLOAT: np.float64, CATEGORY: np.int32}
+EPOCH = _dt.date(1970, 1, 1).toordinal()
+MAGIC = b"COLTAB01"
+ALIGN = 64
+
+
+def to_days(d) -> int:
+    """date (or 'YYYY-MM-DD') -> days since 1970-01-01."""
+    if not isinstance(d, _dt.date):
+        d = _dt.date.fromisoformat(str(d))
+    return d.toordinal() - EPOCH
+
+
+def from_days(n) -> _dt.date:
+    return _dt.date.fromordinal(int(n) + EPOCH)
+
+
+class Dictionary:
+    """Label <-> int code mapping for a category column. Codes are assigned in arrival order."""
+
+    def __init__(self, labels=()):
+        self.labels = list(labels)
+        self.codes = {label: i for i, label in enumerate(self.labels)}
+
+    def encode(self, label) -> int:
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def lookup(self, label):
+        """Code for an existing label, or None (never adds)."""
+        return self.codes.get(label)
+
+    def __getitem__(self, code):
+        return self.labels[code]
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class ColumnarTable:
+    def __init__(self, schema):
+        self.schema = dict(schema)              # name -> kind, in column order
+        self.n = 0
+        self.meta = {}                          # free-form, saved with the table
+        self.dictionaries = {name: Dictionary() for name, kind in self.schema.items() if kind == CATEGORY}
+        self._arrays = {}                       # name -> array with spare capacity
+        self._blobs = {}                        # text column -> bytearray (or mmap slice)
+        self.deleted = set()                    # row numbers; rows are never physically removed
+        self.extras = {}                        # name -> array saved with the table
+        self._mmap = None
+        for name, kind in self.schema.items():
+            if kind == TEXT:
+                self._arrays[name] = np.zeros(1, np.int64)   # offsets; offsets[i]..offsets[i+1]
+                self._blobs[name] = bytearray()
+            else:
+                self._arrays[name] = np.empty(0, DTYPES[kind])
+
+    # ---------- reading ----------
+
+    def __len__(self):
+        return self.n
+
+    def column(self, name):
+        """Zero-copy view of a column (codes for categories, days for dates)."""
+        if self.schema[name] == TEXT:
+            raise TypeError(f"{name} is a text column, use text(name, i)")
+        return self._arrays[name][:self.n]
+
+    def text(self, name, i) -> str:
+        offsets = self._arrays[name]
+        return bytes(self._blobs[name][offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def value(self, name, i):
+        kind = self.schema[name]
+        if kind == TEXT:
+            return self.text(name, i)
+        v = self._arrays[name][i]
+        if kind == CATEGORY:
+            return self.dictionaries[name][v]
+        if kind == DATE:
+            return from_days(v)
+        return int(v) if kind == INT else float(v)
+
+    def row(self, i) -> dict:
+        return {name: self.value(name, i) for name in self.schema}
+
+    def rows(self, indices=None):
+        """Decoded row dicts, lazily, for the given indices (default: every live row)."""
+        if indices is None:
+            indices = (i for i in range(self.n) if i not in self.deleted)
+        for i in indices:
+            yield self.row(int(i))
+
+    def delete(self, i):
+        """Mark row i deleted. Column views keep it; use live_mask() to filter."""
+        if not 0 <= i < self.n or i in self.deleted:
+            raise KeyError(i)
+        self.deleted.add(i)
+
+    def live_mask(self, start=0, stop=None):
+        """Boolean mask of live rows in [start, stop), or None when nothing there is deleted."""
+        stop = self.n if stop is None else stop
+        if not self.deleted:
+            return None
+        mask = np.ones(stop - start, bool)
+        dead = [i - start for i in self.deleted if start <= i < stop]
+        if not dead:
+            return None
+        mask[dead] = False
+        return mask
+
+    @property
+    def live_count(self):
+        return self.n - len(self.deleted)
+
+    @property
+    def nbytes(self) -> int:
+        total = 0
+        for name, kind in self.schema.items():
+            arr = self._arrays[name]
+            total += arr[:self.n + (kind == TEXT)].nbytes
+            if kind == TEXT:
+                total += int(arr[self.n])
+        return total
+
+    # ---------- appending ----------
+
+    def _reserve(self, extra):
+        """Make room for `extra` more rows; mmapped (read-only) arrays are copied out first."""
+        need = self.n + extra
+        for name, kind in self.schema.items():
+            arr = self._arrays[name]
+            used = self.n + (kind == TEXT)
+            if len(arr) < need + (kind == TEXT) or not arr.flags.writeable:
+                grown = np.empty(max(need + (kind == TEXT), 2 * len(arr), 1024), arr.dtype)
+                grown[:used] = arr[:used]
+                self._arrays[name] = grown
+            if kind == TEXT and not isinstance(self._blobs[name], bytearray):
+                self._blobs[name] = bytearray(self._blobs[name][:int(self._arrays[name][self.n])])
+
+    def append(self, row: dict):
+        """Append one row of decoded Python values (dates as date or 'YYYY-MM-DD')."""
+        self._reserve(1)
+        i = self.n
+        for name, kind in self.schema.items():
+            v = row[name]
+            if kind == TEXT:
+                blob = self._blobs[name]
+                blob += str(v).encode("utf-8")
+                self._arrays[name][i + 1] = len(blob)
+            elif kind == CATEGORY:
+                self._arrays[name][i] = self.dictionaries[name].encode(v)
+            elif kind == DATE:
+                self._arrays[name][i] = to_days(v)
+            else:
+                self._arrays[name][i] = v
+        self.n += 1
+        return i
+
+    def extend(self, batch: dict):
+        """
+        Append many rows given as name -> list of values (dates already as days).
+        A category column may also be given as an int array of existing dictionary codes,
+        and a text column as a pre-encoded (utf-8 blob, int lengths) pair.
+        """
+        first = next(iter(batch.values()), ())
+        count = len(first[1] if isinstance(first, tuple) else first)
+        if not count:
+            return
+        self._reserve(count)
+        lo, hi = self.n, self.n + count
+        for name, kind in self.schema.items():
+            values = batch[name]
+            if kind == TEXT and isinstance(values, tuple):
+                blob = self._blobs[name]
+                start = len(blob)
+                blob += values[0]
+                self._arrays[name][lo + 1:hi + 1] = start + np.cumsum(values[1])
+            elif kind == TEXT:
+                blob = self._blobs[name]
+                start = len(blob)
+                encoded = [v.encode("utf-8") if type(v) is str else str(v).encode("utf-8") for v in values]
+                blob += b"".join(encoded)
+                lengths = np.fromiter(map(len, encoded), np.int64, count)
+                self._arrays[name][lo + 1:hi + 1] = start + np.cumsum(lengths)
+            elif kind == CATEGORY and isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+                self._arrays[name][lo:hi] = values   # already dictionary codes
+            elif kind == CATEGORY:
+                d = self.dictionaries[name]
+                for label in set(values).difference(d.codes):
+                    d.encode(label)
+                self._arrays[name][lo:hi] = np.fromiter(map(d.codes.__getitem__, values), np.int32, count)
+            else:
+                self._arrays[name][lo:hi] = values
+        self.n = hi
+
+    def sort_by(self, name):
+        """Stable in-place sort of all columns by `name`. Returns False if already sorted."""
+        keys = self.column(name)
+        if self.n < 2 or bool(np.all(keys[1:] >= keys[:-1])):
+            return False
+        order = np.argsort(keys, kind="stable")
+        for col, kind in self.schema.items():
+            arr = self._arrays[col]
+            if kind != TEXT:
+                self._arrays[col] = arr[:self.n][order]
+                continue
+            # gather every string's bytes in the new order with one fancy index
+            lengths = np.diff(arr[:self.n + 1])[order]
+            offsets = np.concatenate(([0], np.cumsum(lengths)))
+            starts = arr[:self.n][order]
+            src = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+            blob = np.frombuffer(self._blobs[col], np.uint8, int(arr[self.n]))
+            self._blobs[col] = bytearray(blob[src].tobytes())
+            self._arrays[col] = offsets
+        if self.deleted:
+            position = np.empty(self.n, np.int64)
+            position[order] = np.arange(self.n)
+            self.deleted = {int(position[i]) for i in self.deleted}
+        return True
+
+    # ---------- persistence ----------
+
+    def save(self, path):
+        """Write the table to `path` (atomically: temp file + rename)."""
+        pieces, arrays, offset = [], {}, 0
+        for name, kind in self.schema.items():
+            arr = self._arrays[name][:self.n + (kind == TEXT)]
+            pieces.append((name, arr))
+            if kind == TEXT:
+                pieces.append((name + ".blob", np.frombuffer(bytes(self._blobs[name][:int(arr[-1])]), np.uint8)))
+        pieces.extend(("@" + name, np.ascontiguousarray(arr)) for name, arr in self.extras.items())
+        for key, arr in pieces:
+            arrays[key] = [offset, arr.dtype.str, len(arr)]
+            offset += -(-arr.nbytes // ALIGN) * ALIGN
+        header = json.dumps({
+            "n": self.n, "schema": list(self.schema.items()), "arrays": arrays, "meta": self.meta,
+            "deleted": sorted(self.deleted),
+            "dictionaries": {name: d.labels for name, d in self.dictionaries.items()},
+        }).encode("utf-8")
+        data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            for key, arr in pieces:
+                f.seek(data_start + arrays[key][0])
+                f.write(arr.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp, path)
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a saved table. Columns are read-only views until the first append."""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(MAGIC)] != MAGIC:
+            mm.close()
+            raise ValueError(f"{path}: not a columnar table")
+        (header_len,) = struct.unpack_from("<Q", mm, len(MAGIC))
+        header = json.loads(mm[len(MAGIC) + 8:len(MAGIC) + 8 + header_len])
+        data_start = -(-(len(MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+        table = cls([tuple(col) for col in header["schema"]])
+        table.n = header["n"]
+        table.meta = header["meta"]
+        table.deleted = set(header.get("deleted", ()))
+        table.dictionaries = {name: Dictionary(labels) for name, labels in header["dictionaries"].items()}
+        for key, (offset, dtype, count) in header["arrays"].items():
+            arr = np.frombuffer(mm, np.dtype(dtype), count, data_start + offset)
+            if key.startswith("@"):
+                table.extras[key[1:]] = arr
+            elif key.endswith(".blob") and key[:-5] in table._blobs:
+                table._blobs[key[:-5]] = memoryview(arr)
+            else:
+                table._arrays[key] = arr
+        table._mmap = mm
+        return table
+
+
+_DATE_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9]     # character positions in YYYY-MM-DD
+_DATE_DASHES = [4, 7]
+
+
+def _parse_dates(values):
+    """
+    Exactly 'YYYY-MM-DD' strings -> int32 days, parsed in C. NumPy alone also takes '',
+    'NaT' and partial dates ('2024-01' -> 2024-01-01), so the shape is checked first.
+    """
+    if set(map(len, values)) - {10}:
+        raise ValueError("dates must be YYYY-MM-DD")
+    chars = np.frombuffer("".join(values).encode("ascii"), np.uint8).reshape(len(values), 10)
+    digits = chars[:, _DATE_DIGITS]
+    if not (((digits >= ord("0")) & (digits <= ord("9"))).all() and (chars[:, _DATE_DASHES] == ord("-")).all()):
+        raise ValueError("dates must be YYYY-MM-DD")
+    return np.array(values, dtype="datetime64[D]").astype(np.int32)   # still raises for 2024-02-30
+
+
+def _parse_column(kind, values):
+    """Convert one column of CSV strings in a single NumPy call (raises ValueError if any is bad)."""
+    if kind == DATE:
+        return _parse_dates(values)
+    if kind in (INT, FLOAT):
+        return np.fromiter(map(int if kind == INT else float, values), DTYPES[kind], len(values))
+    return list(map(str.strip, values))
+
+
+def _parse_row(schema, rec):
+    out = []
+    for kind, v in zip(schema, rec):
+        if kind == DATE:
+            out.append(to_days(_dt.date.fromisoformat(v)))
+        elif kind in (INT, FLOAT):
+            out.append(int(v) if kind == INT else float(v))
+        else:
+            out.append(v.strip())
+    return out
+
+
+def _parse_rows(kinds, columns):
+    """Row-by-row version of _parse_batch, for a batch known to hold bad rows: drops them."""
+    good = []
+    for rec in zip(*columns):
+        try:
+            good.append(_parse_row(kinds, rec))
+        except (ValueError, TypeError):
+            continue
+    return [list(col) for col in zip(*good)] if good else [[] for _ in kinds]
+
+
+def _parse_batch(kinds, columns):
+    """columns: one tuple of CSV strings per schema column -> parsed columns, bad rows dropped."""
+    try:
+        return [_parse_column(kind, col) for kind, col in zip(kinds, columns)]
+    except ValueError:
+        return _parse_rows(kinds, columns)
+
+
+def read_csv(path, schema, batch_rows=65536, derived=None) -> ColumnarTable:
+    """
+    Parse a CSV with a header row into a ColumnarTable. Column names in `schema` must
+    appear in the header, except `derived` ones (name -> fn(batch dict) -> column).
+    Malformed rows are skipped, like the dict-row loaders do.
+    Rows are converted a batch at a time, one NumPy call per column.
+    """
+    table = ColumnarTable(schema)
+    derived = derived or {}
+    names = [name for name in table.schema if name not in derived]
+    kinds = [table.schema[name] for name in names]
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return table
+        where = [header.index(name) for name in names]
+        gc_was_enabled = gc.isenabled()
+        gc.disable()   # millions of short-lived lists, no cycles: the collector only slows this down
+        try:
+            while batch := list(islice(reader, batch_rows)):
+                good = [rec for rec in batch if len(rec) == len(header)]
+                if good:
+                    cols = [[rec[j] for rec in good] for j in where]
+                    parsed = dict(zip(names, _parse_batch(kinds, cols)))
+                    for name, fn in derived.items():
+                        parsed[name] = fn(parsed)
+                    table.extend(parsed)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    return table
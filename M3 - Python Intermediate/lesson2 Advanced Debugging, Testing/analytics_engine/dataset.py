@@ -0,0 +1,330 @@
+"""
+Base class for the columnar datasets (MovieDataset, SalesDataset).
+
+Loading: the CSV is parsed once into a ColumnarTable and saved next to it as a snapshot,
+`<csv>.coltab`: the columns plus the subclass's aggregates (GroupIndex arrays) and the
+anomaly statistics. Later instances memory-map it and skip both parsing and _build().
+The snapshot is keyed by the CSV's size, mtime and BLAKE2 content hash:
+  - size, mtime and a hash of the first/last 64 KB match    -> used as is ("hit")
+    (verify=True also re-hashes the whole file)
+  - same content, new mtime (touched, copied)                -> used, key refreshed
+  - the old content is an unchanged prefix (rows appended)  -> only the new tail is
+    parsed and folded into the restored aggregates, then the snapshot is rewritten
+  - anything else                                            -> full parse
+Large CSVs are parsed across `workers` processes (ingest.read_csv_parallel).
+
+Rows are sorted by SORT_BY (the date) before the cache is written, so every load, parsed
+or mmapped, can answer date ranges by binary search through `self.dates` (a DateIndex).
+Rolling statistics over any column come from rolling.py, in date order.
+
+The ANOMALY_COLUMN's mean/std (Welford) and quantiles (QuantileSketch) are kept current
+on every append and delete, so anomalies() is one filter pass and watch_anomalies() can
+flag rows as they arrive.
+
+where() / between() / query() start a lazy Query that pushes filters down to these
+structures and to group_index(), the subclasses' running aggregates.
+"""
+from __future__ import annotations
+import hashlib, os
+
+import numpy as np
+
+from .columnar import ColumnarTable
+from .dateindex import DateIndex
+from .indexes import GroupIndex
+from .ingest import append_csv_range, read_csv_parallel
+from .query import Query
+from .rolling import RollingWindow, rolling, rolling_by_days
+from .streaming import MAD_SCALE, QuantileSketch, Welford
+
+SNAPSHOT_VERSION = 2
+EDGE_BYTES = 64 << 10
+
+
+def _hasher(path, size, h=None, start=0):
+    """BLAKE2 of bytes [start, size) of a file, continuing `h` if given."""
+    h = h or hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        f.seek(start)
+        left = size - start
+        while left > 0:
+            block = f.read(min(left, 1 << 20))
+            if not block:
+                break
+            h.update(block)
+            left -= len(block)
+    return h
+
+
+def _edge_hash(path, size):
+    """Cheap fingerprint for the fast path: the first and last EDGE_BYTES of the file."""
+    h = _hasher(path, min(size, EDGE_BYTES))
+    return _hasher(path, size, h, max(EDGE_BYTES, size - EDGE_BYTES)).hexdigest()
+
+
+class Dataset:
+    SCHEMA = []            # [(column, kind), ...], set by subclasses
+    DERIVED = {}           # column -> fn(batch) for schema columns computed from others
+    CACHE_SUFFIX = ".coltab"
+    SORT_BY = "date"       # rows are kept physically in this column's order
+    ANOMALY_COLUMN = None  # column whose outliers anomalies() returns
+    ANOMALY_K = 2.0        # ... at >= mean + K * std
+    ROBUST_K = 3.5         # ... or, robust=True, at >= median + K * 1.4826 * MAD
+
+    def __init__(self, csv_path, cache=True, workers=None, verify=False):
+        self.csv_path = csv_path
+        self.workers = workers                # parser processes for big CSVs; None = all cores
+        self.cache_path = csv_path + self.CACHE_SUFFIX if cache else None
+        self.verify = verify                  # hash the whole CSV even when size and mtime match
+        self.snapshot = None                  # "hit" | "touched" | "appended" | "parsed"
+        self._attach(self._load())
+        if self.cache_path and self.snapshot != "hit":
+            try:
+                self._save_snapshot()
+            except OSError:
+                pass   # read-only data directory: just don't cache
+
+    @property
+    def loaded_from_cache(self):
+        return self.snapshot in ("hit", "touched", "appended")
+
+    @classmethod
+    def from_table(cls, table):
+        """Wrap an already-built ColumnarTable (benchmarks, tests) without touching disk."""
+        ds = cls.__new__(cls)
+        ds.csv_path = ds.cache_path = ds.snapshot = None
+        ds._attach(table)
+        return ds
+
+    def _attach(self, table):
+        self.table = table
+        self._watches = []                    # (column, RollingWindow) fed by _appended
+        self.flagged = []                     # rows flagged by watch_anomalies, in arrival order
+        self._flagging = None                 # (callback, robust) while watching
+        covered = self._restore_snapshot()
+        if covered is None:
+            self._build()
+            self._build_stats(0, table.n)
+        elif covered < table.n:               # rows appended to the CSV since the snapshot
+            self._fold_rows(covered, table.n)
+            self._build_stats(covered, table.n)
+        table.sort_by(self.SORT_BY)           # aggregates don't depend on row order; no-op if sorted
+        self.dates = DateIndex(table, self.SORT_BY)
+
+    def _build(self):
+        """Subclass hook: derive indexes/aggregates from self.table after loading."""
+
+    def _fold_rows(self, lo, hi):
+        """Subclass hook: fold rows [lo, hi), appended after a snapshot, into the aggregates."""
+        self._build()
+
+    def _aggregates(self):
+        """Subclass hook for snapshots: ({name: GroupIndex}, JSON-able extra state)."""
+        return {}, {}
+
+    def _restore(self, indexes, extra):
+        """Subclass hook: take back what _aggregates() returned (indexes rebuilt from the snapshot)."""
+
+    def _build_stats(self, lo, hi):
+        """Fold rows [lo, hi) into the anomaly statistics (lo=0: start afresh)."""
+        if self.ANOMALY_COLUMN is None:
+            self.stats = self.sketch = None
+            return
+        if lo == 0:
+            self.stats, self.sketch = Welford(), QuantileSketch()
+        values = self.col(self.ANOMALY_COLUMN)[lo:hi]
+        live = self.table.live_mask(lo, hi)
+        if live is not None:
+            values = values[live]
+        self.stats.merge(Welford.of(values))
+        self.sketch.add_many(values)
+
+    # ---------- snapshots ----------
+
+    def _load(self):
+        st = os.stat(self.csv_path)
+        size = st.st_size
+        self._source = {"size": size, "mtime_ns": st.st_mtime_ns}
+        table = None
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                table = ColumnarTable.open(self.cache_path)
+            except (OSError, ValueError):
+                table = None
+        if table is not None:
+            old = table.meta.get("source", {})
+            edges = _edge_hash(self.csv_path, size)
+            if (old.get("size") == size and old.get("mtime_ns") == st.st_mtime_ns and old.get("edges") == edges
+                    and not self.verify):
+                self.snapshot = "hit"
+                return table
+            old_size = old.get("size", -1)
+            if "content" in old and 0 < old_size <= size:
+                h = _hasher(self.csv_path, old_size)
+                if h.hexdigest() == old["content"] and (old_size == size or self._ends_line(old_size)):
+                    if old_size < size:
+                        append_csv_range(table, self.csv_path, old_size, size, derived=self.DERIVED)
+                        self.snapshot = "appended"
+                    else:
+                        self.snapshot = "hit" if old.get("mtime_ns") == st.st_mtime_ns else "touched"
+                    self._source.update(edges=edges, content=_hasher(self.csv_path, size, h, old_size).hexdigest())
+                    return table
+        table = read_csv_parallel(self.csv_path, self.SCHEMA, self.workers, derived=self.DERIVED)
+        table.sort_by(self.SORT_BY)
+        self._source.update(edges=_edge_hash(self.csv_path, size), content=_hasher(self.csv_path, size).hexdigest())
+        self.snapshot = "parsed"
+        return table
+
+    def _ends_line(self, offset):
+        """Appended rows can only be parsed from `offset` if the old content ended a line there."""
+        with open(self.csv_path, "rb") as f:
+            f.seek(offset - 1)
+            return f.read(1) == b"\n"
+
+    def _restore_snapshot(self):
+        """Rebuild aggregates and stats from the snapshot; returns the rows they cover, or None."""
+        state = self.table.meta.get("state")
+        if not state or state.get("version") != SNAPSHOT_VERSION or state.get("class") != type(self).__name__:
+            return None
+        extras = self.table.extras
+        try:
+            indexes = {name: GroupIndex.from_arrays(extras[name + ".sums"], extras[name + ".counts"])
+                       for name in state["indexes"]}
+        except KeyError:
+            return None
+        self._restore(indexes, state["extra"])
+        if self.ANOMALY_COLUMN is None:
+            self.stats = self.sketch = None
+        else:
+            self.stats = Welford.from_state(state["stats"])
+            self.sketch = QuantileSketch.from_state(state["sketch"])
+        return state["rows"]
+
+    def _save_snapshot(self):
+        t = self.table
+        indexes, extra = self._aggregates()
+        t.extras = {}
+        for name, index in indexes.items():
+            t.extras[name + ".sums"], t.extras[name + ".counts"] = index.sums, index.counts
+        t.meta["source"] = self._source
+        t.meta["state"] = {
+            "version": SNAPSHOT_VERSION, "class": type(self).__name__, "rows": t.n,
+            "indexes": list(indexes), "extra": extra,
+            "stats": self.stats.state() if self.stats else None,
+            "sketch": self.sketch.state() if self.sketch else None,
+        }
+        t.save(self.cache_path)
+
+    def __len__(self):
+        return self.table.live_count
+
+    def col(self, name):
+        return self.table.column(name)
+
+    def rows(self, indices=None):
+        return list(self.table.rows(indices))
+
+    def _appended(self, i):
+        """Subclasses call this after appending row i, to keep the date index, stats and watches current."""
+        self.dates.on_append(i)
+        for name, window in self._watches:
+            window.push(self.col(name)[i], int(self.col(self.SORT_BY)[i]))
+        if self.stats is not None:
+            value = self.col(self.ANOMALY_COLUMN)[i]
+            self.stats.add(value)
+            self.sketch.add(value)
+            if self._flagging is not None:
+                callback, robust = self._flagging
+                cutoff = self.anomaly_cutoff(robust)
+                if value >= cutoff:
+                    self.flagged.append(i)
+                    if callback is not None:
+                        callback(i, value.item(), cutoff)
+
+    def _removed(self, i):
+        """Subclasses call this after deleting row i."""
+        if self.stats is not None:
+            value = self.col(self.ANOMALY_COLUMN)[i]
+            self.stats.remove(value)
+            self.sketch.remove(value)
+
+    def _ordered(self):
+        """Live row numbers in date order."""
+        order = self.dates.order()
+        if self.table.deleted:
+            order = order[~np.isin(order, list(self.table.deleted))]
+        return order
+
+    def rolling(self, name, stat="mean", window=None, days=None):
+        """
+        Rolling `stat` of a column in date order: over the last `window` rows (n - window + 1
+        values), or with days=N per row over the N days ending at its date.
+        """
+        if (window is None) == (days is None):
+            raise ValueError("give exactly one of window= or days=")
+        order = self._ordered()
+        if days is not None:
+            return rolling_by_days(self.col(self.SORT_BY)[order], self.col(name)[order], days, stat)
+        return rolling(self.col(name)[order], window, stat)
+
+    def watch(self, name, window=None, days=None):
+        """A RollingWindow over a column, primed with the latest rows and fed every later append."""
+        win = RollingWindow(window, days)
+        order = self._ordered()
+        dates = self.col(self.SORT_BY)[order]
+        if window is not None:
+            recent = order[-window:]
+        else:
+            recent = order[np.searchsorted(dates, dates[-1] - days, "right"):] if len(order) else order
+        win.extend(self.col(name)[recent].tolist(), self.col(self.SORT_BY)[recent].tolist())
+        self._watches.append((name, win))
+        return win
+
+    def filter_by_date_range(self, start_date, end_date):
+        """Rows with start_date <= date <= end_date, as a DateRange view (iterate for dicts)."""
+        return self.dates.range(start_date, end_date)
+
+    def iter_date_range(self, start_date, end_date, names=None, chunk_rows=65536):
+        """Stream a date range as {column: array} chunks without materialising it."""
+        return self.dates.range(start_date, end_date).iter_chunks(names, chunk_rows)
+
+    def group_index(self, column, value=None):
+        """
+        Subclass hook for the query planner: the maintained GroupIndex keyed by `column`
+        whose sums are of `value` (any index on `column` when value is None), or None.
+        """
+        return None
+
+    def query(self):
+        """An empty lazy Query over this dataset (see query.py)."""
+        return Query(self)
+
+    def where(self, **conditions):
+        return Query(self).where(**conditions)
+
+    def between(self, start_date, end_date):
+        return Query(self).between(start_date, end_date)
+
+    def anomaly_cutoff(self, robust=False):
+        """mean + K * std, or with robust=True median + ROBUST_K * 1.4826 * MAD (from the sketch)."""
+        if robust:
+            return self.sketch.median + self.ROBUST_K * MAD_SCALE * self.sketch.mad()
+        return self.stats.mean + self.ANOMALY_K * self.stats.std
+
+    def anomalies(self, robust=False):
+        """Rows with ANOMALY_COLUMN >= anomaly_cutoff(): one filter pass over the column."""
+        if not len(self):
+            return []
+        hit = self.col(self.ANOMALY_COLUMN) >= self.anomaly_cutoff(robust)
+        live = self.table.live_mask()
+        return self.rows(np.flatnonzero(hit if live is None else hit & live))
+
+    def watch_anomalies(self, callback=None, robust=False):
+        """
+        Online mode: every later append is checked against the current cutoff as it
+        arrives; hits go to self.flagged and callback(row, value, cutoff).
+        """
+        self._flagging = (callback, robust)
+
+    def stop_watching_anomalies(self):
+        self._flagging = None
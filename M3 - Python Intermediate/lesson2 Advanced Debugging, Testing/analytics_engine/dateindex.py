@@ -0,0 +1,169 @@
+"""
+Date-range queries by binary search instead of a scan over every row.
+
+Datasets keep their table physically sorted by date (Dataset sorts once before writing
+the .coltab cache, so mmapped loads are already in order). A DateIndex then only needs:
+  - a sorted prefix  rows [0, sorted_n), answered with np.searchsorted (a C bisect)
+  - a tail           rows appended out of date order, as a sorted list of (day, row)
+                     kept with bisect.insort
+A range query costs O(log n) to find its bounds plus O(k) for the k rows it returns.
+
+DateRange is the result: a view, not a list. Column slices of the sorted prefix are
+zero-copy; rows are decoded only when iterated, and iter_chunks() streams column
+slices so a range over the whole table never materialises.
+
+Benchmark (run from the lesson folder):
+    python -m analytics_engine.dateindex --bench
+"""
+from __future__ import annotations
+import argparse, bisect, time
+
+import numpy as np
+
+from .columnar import DATE, INT, TEXT, ColumnarTable, to_days
+
+
+class DateIndex:
+    def __init__(self, table, column="date"):
+        self.table = table
+        self.column = column
+        days = table.column(column)
+        if len(days) > 1 and not bool(np.all(days[1:] >= days[:-1])):
+            raise ValueError(f"table is not sorted by {column}; call table.sort_by({column!r}) first")
+        self.sorted_n = table.n
+        self.tail = []                        # [(day, row)] for rows past sorted_n, sorted
+
+    def on_append(self, i):
+        """Register row i (just appended). O(1) if it is in date order, else O(log t + t)."""
+        day = int(self.table.column(self.column)[i])
+        if not self.tail and i == self.sorted_n and (i == 0 or day >= self.table.column(self.column)[i - 1]):
+            self.sorted_n += 1
+        else:
+            bisect.insort(self.tail, (day, i))
+
+    def bounds(self, start, end):
+        """[lo, hi) of the sorted prefix with start <= date <= end (dates or ISO strings)."""
+        days = self.table.column(self.column)[:self.sorted_n]
+        # needles in the column's dtype: a mismatched one makes searchsorted convert all n days
+        lo = int(np.searchsorted(days, days.dtype.type(to_days(start)), "left"))
+        hi = int(np.searchsorted(days, days.dtype.type(to_days(end)), "right"))
+        return lo, max(lo, hi)
+
+    def range(self, start, end):
+        lo, hi = self.bounds(start, end)
+        a, b = to_days(start), to_days(end)
+        t_lo = bisect.bisect_left(self.tail, (a, -1))
+        t_hi = bisect.bisect_right(self.tail, (b, self.table.n))
+        return DateRange(self.table, lo, hi, [row for _, row in self.tail[t_lo:t_hi]])
+
+    def order(self):
+        """Every row number in date order (ties in append order)."""
+        if not self.tail:
+            return np.arange(self.table.n)
+        extra = np.fromiter((row for _, row in self.tail), np.int64, len(self.tail))
+        head = np.arange(self.sorted_n)
+        pos = np.searchsorted(self.table.column(self.column)[:self.sorted_n],
+                              self.table.column(self.column)[extra], "right")
+        return np.insert(head, pos, extra)
+
+
+class DateRange:
+    """Rows lo..hi of the sorted prefix plus any matching tail rows; deleted rows excluded."""
+
+    def __init__(self, table, lo, hi, extra=()):
+        self.table, self.lo, self.hi = table, lo, hi
+        self.extra = [i for i in extra if i not in table.deleted]
+        self._live = table.live_mask(lo, hi)    # None when nothing in [lo, hi) is deleted
+
+    def __len__(self):
+        head = self.hi - self.lo if self._live is None else int(self._live.sum())
+        return head + len(self.extra)
+
+    @property
+    def contiguous(self):
+        """True when column() returns a zero-copy slice of the table."""
+        return self._live is None and not self.extra
+
+    def indices(self):
+        head = np.arange(self.lo, self.hi)
+        if self._live is not None:
+            head = head[self._live]
+        return np.concatenate((head, np.asarray(self.extra, np.int64))) if self.extra else head
+
+    def column(self, name):
+        """The range's values of one column: a view when contiguous, else a gathered copy."""
+        col = self.table.column(name)
+        if self.contiguous:
+            return col[self.lo:self.hi]
+        return col[self.indices()]
+
+    def sum(self, name):
+        return self.column(name).sum().item()
+
+    def iter_chunks(self, names=None, size=65536):
+        """Stream {name: array} chunks of at most `size` rows (views where the range is contiguous)."""
+        names = names or [n for n, kind in self.table.schema.items() if kind != TEXT]
+        if self.contiguous:
+            for lo in range(self.lo, self.hi, size):
+                yield {n: self.table.column(n)[lo:min(lo + size, self.hi)] for n in names}
+            return
+        idx = self.indices()
+        for lo in range(0, len(idx), size):
+            part = idx[lo:lo + size]
+            yield {n: self.table.column(n)[part] for n in names}
+
+    def __iter__(self):
+        """Decoded row dicts, one at a time."""
+        if self.contiguous:
+            return self.table.rows(range(self.lo, self.hi))
+        return self.table.rows(self.indices())
+
+    def rows(self):
+        return list(self)
+
+    def __repr__(self):
+        return f"<DateRange rows {self.lo}:{self.hi} +{len(self.extra)} tail, {len(self)} live>"
+
+
+# --------------------------- Benchmark ---------------------------
+
+def _bench(sizes, width_days, per_day=1000):
+    """Same range width and density (so k is fixed) on growing tables: bisect vs. full mask."""
+    rng = np.random.default_rng(0)
+    print(f"[bench] {width_days}-day range, ~{per_day} rows/day: k stays ~{width_days * per_day:,} while n grows")
+    for n in sizes:
+        span = max(1, n // per_day)
+        table = ColumnarTable([("date", DATE), ("minutes", INT)])
+        table.extend({"date": (to_days("1990-01-01") + np.sort(rng.integers(0, span, n))).astype(np.int32),
+                      "minutes": rng.integers(5, 180, n)})
+        dates = DateIndex(table)
+        a = np.datetime64("1990-01-01") + np.timedelta64(span // 2, "D")
+        a, b = str(a), str(a + np.timedelta64(width_days - 1, "D"))
+        t_find, r = _timed(lambda: dates.range(a, b), 2000)
+        t_sum, total = _timed(lambda: dates.range(a, b).sum("minutes"), 200)
+        days, minutes = table.column("date"), table.column("minutes")
+        t_scan, scan = _timed(lambda: minutes[(days >= to_days(a)) & (days <= to_days(b))].sum().item(), 5)
+        print(f"[bench] n={n:>11,}  k={len(r):>7,}  bisect {t_find * 1e6:6.1f} us   "
+              f"bisect+sum {t_sum * 1e6:7.1f} us   mask scan {t_scan * 1e3:8.2f} ms   same={total == scan}")
+
+
+def _timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - t0) / repeat, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="binary-search date ranges vs. full scans")
+    ap.add_argument("--bench", action="store_true")
+    ap.add_argument("--sizes", default="1000000,4000000,16000000", help="comma-separated row counts")
+    ap.add_argument("--days", type=int, default=7, help="width of the queried range")
+    args = ap.parse_args()
+    if not args.bench:
+        ap.error("nothing to do (try --bench)")
+    _bench([int(s) for s in args.sizes.split(",")], args.days)
+
+
+if __name__ == "__main__":
+    main()
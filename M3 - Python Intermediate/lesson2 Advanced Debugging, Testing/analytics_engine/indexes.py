@@ -0,0 +1,107 @@
+"""
+Secondary indexes: per-group running aggregates, built once and updated on every append.
+
+A GroupIndex is keyed by small non-negative int codes (dictionary codes, month numbers),
+so it is two flat arrays (sum, count) indexed by code: lookup is O(1), an append is
+O(1) amortised, building from N rows is one np.bincount. top() is served by a TopK
+tracker (topk.py) when one is registered with track_top(), else by argpartition.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from .topk import TopK, top_k
+
+
+def month_keys(days):
+    """int days since 1970 -> year * 12 + month - 1 (vectorised)."""
+    months = np.asarray(days).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return months + 1970 * 12
+
+
+def month_key(year, month):
+    return year * 12 + month - 1
+
+
+class GroupIndex:
+    def __init__(self, keys=None, values=None, size=0, dtype=np.float64):
+        keys = np.empty(0, np.int64) if keys is None else np.asarray(keys)
+        size = max(size, int(keys.max()) + 1 if len(keys) else 0)
+        self.dtype = np.dtype(dtype)
+        self._sums = np.zeros(max(size, 16), self.dtype)
+        self._counts = np.zeros(max(size, 16), np.int64)
+        self.size = size
+        self._tops = []                         # TopK trackers told about every add()
+        if len(keys):
+            weights = None if values is None else np.asarray(values, np.float64)
+            sums = np.bincount(keys, weights=weights, minlength=size)
+            self._sums[:size] = np.rint(sums) if self.dtype.kind == "i" else sums
+            self._counts[:size] = np.bincount(keys, minlength=size)
+
+    @classmethod
+    def from_arrays(cls, sums, counts, dtype=None):
+        """Rebuild from saved sums()/counts() (copied, so a mmapped snapshot stays read-only)."""
+        index = cls(size=len(sums), dtype=dtype or np.asarray(sums).dtype)
+        index._sums[:index.size] = sums
+        index._counts[:index.size] = counts
+        return index
+
+    def add_many(self, keys, values=None):
+        """Fold a batch of rows in with one bincount (what __init__ does for the first batch)."""
+        keys = np.asarray(keys)
+        if not len(keys):
+            return
+        top = int(keys.max())
+        if top >= self.size:
+            self._grow(top)
+        weights = None if values is None else np.asarray(values, np.float64)
+        sums = np.bincount(keys, weights=weights, minlength=self.size)
+        self._sums[:self.size] += np.rint(sums).astype(self.dtype) if self.dtype.kind == "i" else sums
+        self._counts[:self.size] += np.bincount(keys, minlength=self.size)
+        for tracker in self._tops:
+            tracker.invalidate()
+
+    def _grow(self, key):
+        if key >= len(self._sums):
+            cap = max(key + 1, 2 * len(self._sums))
+            self._sums = np.concatenate((self._sums, np.zeros(cap - len(self._sums), self.dtype)))
+            self._counts = np.concatenate((self._counts, np.zeros(cap - len(self._counts), np.int64)))
+        self.size = max(self.size, key + 1)
+        for tracker in self._tops:
+            tracker.invalidate()
+
+    def add(self, key, value, count=1):
+        """Fold one row (or, with negative value/count, un-fold it) into group `key`."""
+        if key >= self.size:
+            self._grow(key)
+        self._sums[key] += value
+        self._counts[key] += count
+        for tracker in self._tops:
+            tracker.changed(key, value)
+
+    def track_top(self, k):
+        """Keep the top k groups current on every add(), so top(n <= k) is a lookup."""
+        tracker = TopK(self, k)
+        self._tops.append(tracker)
+        return tracker
+
+    def sum(self, key):
+        return self._sums[key].item() if 0 <= key < self.size else 0
+
+    def count(self, key):
+        return int(self._counts[key]) if 0 <= key < self.size else 0
+
+    @property
+    def sums(self):
+        return self._sums[:self.size]
+
+    @property
+    def counts(self):
+        return self._counts[:self.size]
+
+    def top(self, n):
+        """Codes of the n largest sums, largest first (ties: lower code first)."""
+        for tracker in self._tops:
+            if n <= tracker.k:
+                return list(tracker.top(n))
+        return top_k(self.sums, n)
@@ -0,0 +1,200 @@
+"""
+Parallel CSV ingestion: the file is cut into byte ranges that start and end on line
+boundaries, each range is parsed in a worker process, and the parsed chunks are merged
+into one ColumnarTable in file order (so the result is row-for-row what read_csv gives).
+
+Workers send back compact columns, not Python objects:
+  - category -> the chunk's own labels + int32 codes; the parent remaps the codes into
+                the table's Dictionary with one fancy index per chunk
+  - text     -> one UTF-8 blob + lengths
+  - dates    -> int32 days, through a memoised str -> day cache (a log has a few
+                thousand distinct dates, so each is parsed once per worker)
+
+Fields containing quoted newlines would straddle a cut; the logs here never have them.
+On platforms that spawn workers (Windows, macOS) call this from under
+`if __name__ == "__main__":`.
+
+Benchmark (run from the lesson folder; --mb 5000 for the 5 GB case):
+    python -m analytics_engine.ingest --bench --mb 300 --workers 1,2,4,8
+"""
+from __future__ import annotations
+import argparse, csv, datetime as _dt, gc, io, os, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .columnar import (CATEGORY, DATE, TEXT, ColumnarTable, Dictionary, _parse_column, _parse_rows, read_csv,
+                       to_days)
+
+CHUNK_BYTES = 32 << 20
+PARALLEL_MIN_BYTES = 64 << 20    # below this, process start-up costs more than it saves
+
+
+class _DateCache(dict):
+    """'YYYY-MM-DD' -> days since 1970, parsed on first sight."""
+
+    def __missing__(self, text):
+        days = self[text] = to_days(_dt.date.fromisoformat(text))
+        return days
+
+
+def byte_ranges(path, parts):
+    """
+    [(start, end)] covering the data rows (header excluded), each cut moved forward to
+    the next line start. Ranges may be empty when the file is short.
+    """
+    with open(path, "rb") as f:
+        f.readline()
+        data_start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        cuts = [data_start]
+        for k in range(1, parts):
+            f.seek(max(data_start + (size - data_start) * k // parts, cuts[-1]))
+            if f.tell() > data_start:
+                f.seek(f.tell() - 1)
+                f.readline()                   # finish the line the guess landed in
+            cuts.append(f.tell())
+        cuts.append(size)
+    return [(a, b) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def _parse_range(path, start, end, width, where, kinds):
+    """Worker: parse bytes [start, end) of the CSV into compact columns."""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _parse_bytes(path, start, end, width, where, kinds)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _parse_bytes(path, start, end, width, where, kinds):
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    good = [rec for rec in csv.reader(io.StringIO(text, newline="")) if len(rec) == width]
+    if not good:
+        return 0, []
+    dates = _DateCache()
+    cols = [[rec[j] for rec in good] for j in where]
+    try:
+        parsed = [np.fromiter(map(dates.__getitem__, col), np.int32, len(col)) if kind == DATE
+                  else _parse_column(kind, col) for kind, col in zip(kinds, cols)]
+    except ValueError:
+        parsed = _parse_rows(kinds, cols)     # a malformed row somewhere: per-row fallback drops it
+    out = []
+    for kind, values in zip(kinds, parsed):
+        if kind == CATEGORY:
+            local = Dictionary()
+            codes = np.fromiter(map(local.encode, values), np.int32, len(values))
+            out.append((local.labels, codes))
+        elif kind == TEXT:
+            encoded = [v.encode("utf-8") for v in values]
+            out.append((b"".join(encoded), np.fromiter(map(len, encoded), np.int64, len(encoded))))
+        else:
+            out.append(values)
+    return len(parsed[0]), out
+
+
+def _layout(table, path, derived):
+    """(names, kinds, header width, header positions) of the columns parsed from the CSV."""
+    names = [name for name in table.schema if name not in derived]
+    kinds = [table.schema[name] for name in names]
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), None)
+    if header is None:
+        return names, kinds, 0, None
+    return names, kinds, len(header), [header.index(name) for name in names]
+
+
+def _merge(table, names, kinds, columns, derived):
+    """Append one worker's chunk: remap its category codes into the table's dictionaries."""
+    batch = {}
+    for name, kind, values in zip(names, kinds, columns):
+        if kind == CATEGORY:
+            labels, codes = values
+            d = table.dictionaries[name]
+            remap = np.fromiter(map(d.encode, labels), np.int32, len(labels))
+            batch[name] = remap[codes]
+        else:
+            batch[name] = values
+    for name, fn in derived.items():
+        batch[name] = fn(batch)
+    table.extend(batch)
+
+
+def append_csv_range(table, path, start, end=None, derived=None):
+    """
+    Parse bytes [start, end) of a CSV (start on a line boundary, e.g. the old end of a
+    file that has since been appended to) and append the rows to `table`.
+    Returns the number of rows appended.
+    """
+    derived = derived or {}
+    end = os.path.getsize(path) if end is None else end
+    names, kinds, width, where = _layout(table, path, derived)
+    if where is None or end <= start:
+        return 0
+    count, columns = _parse_range(path, start, end, width, where, kinds)
+    if count:
+        _merge(table, names, kinds, columns, derived)
+    return count
+
+
+def read_csv_parallel(path, schema, workers=None, derived=None, chunk_bytes=CHUNK_BYTES) -> ColumnarTable:
+    """read_csv, with the parsing spread over `workers` processes (default: all cores)."""
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    if workers == 1 or size < PARALLEL_MIN_BYTES:
+        return read_csv(path, schema, derived=derived)
+    table = ColumnarTable(schema)
+    derived = derived or {}
+    names, kinds, width, where = _layout(table, path, derived)
+    if where is None:
+        return table
+    ranges = byte_ranges(path, max(workers, size // chunk_bytes))
+    with ProcessPoolExecutor(workers) as pool:
+        chunks = pool.map(_parse_range, *zip(*[(path, a, b, width, where, kinds) for a, b in ranges]))
+        for count, columns in chunks:         # in file order, each merged as soon as it is ready
+            if count:
+                _merge(table, names, kinds, columns, derived)
+    return table
+
+
+# --------------------------- Benchmark ---------------------------
+
+def _bench(mb, worker_counts):
+    from .sales import SALES_SCHEMA, SalesDataset
+    from .synth import write_sales_log
+    with tempfile.TemporaryDirectory(prefix="ingest_bench_") as tmp:
+        path = os.path.join(tmp, "orders.csv")
+        rows = int(mb * 1e6 / 52)               # ~52 bytes per synthetic order line
+        t0 = time.perf_counter()
+        write_sales_log(path, rows)
+        print(f"[bench] {rows:,} rows, {os.path.getsize(path) / 1e6:.0f} MB written in "
+              f"{time.perf_counter() - t0:.0f} s; {os.cpu_count()} CPU(s) available")
+        base = reference = None
+        for w in worker_counts:
+            t0 = time.perf_counter()
+            table = read_csv_parallel(path, SALES_SCHEMA, workers=w, derived=SalesDataset.DERIVED)
+            took = time.perf_counter() - t0
+            check = (table.n, float(table.column("amount").sum()))
+            base, reference = base or took, reference or check
+            print(f"[bench] workers={w:<3} {took:7.2f} s   {os.path.getsize(path) / 1e6 / took:6.0f} MB/s   "
+                  f"speedup x{base / took:4.2f}   same={check == reference}")
+            del table
+
+
+def main():
+    ap = argparse.ArgumentParser(description="parallel chunked CSV ingestion")
+    ap.add_argument("--bench", action="store_true")
+    ap.add_argument("--mb", type=float, default=300, help="size of the synthetic CSV")
+    ap.add_argument("--workers", default="1,2,4,8", help="comma-separated process counts to time")
+    args = ap.parse_args()
+    if not args.bench:
+        ap.error("nothing to do (try --bench)")
+    _bench(args.mb, [int(w) for w in args.workers.split(",")])
+
+
+if __name__ == "__main__":
+    main()
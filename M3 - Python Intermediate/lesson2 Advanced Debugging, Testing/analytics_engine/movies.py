@@ -0,0 +1,249 @@
+"""
+MovieDataset: the questions MovieAnalytics (part1/movie_analytics.py) answers, over a
+ColumnarTable instead of a list of dicts. Method names and results match what
+tests_movie.py expects from a fixed MovieAnalytics.
+
+Benchmarks (run from the lesson folder):
+    python -m analytics_engine.movies --bench --rows 1000000   # dict rows vs. parse vs. snapshot
+    python -m analytics_engine.movies --bench-indexes           # 10M rows: indexes vs. full scans
+"""
+from __future__ import annotations
+import argparse, csv, datetime as _dt, os, sys, tempfile, time
+
+import numpy as np
+
+from .columnar import CATEGORY, DATE, FLOAT, INT, TEXT, Dictionary, from_days, to_days
+from .dataset import Dataset
+from .indexes import GroupIndex, month_key, month_keys
+
+MOVIE_SCHEMA = [("date", DATE), ("view_id", TEXT), ("user", CATEGORY), ("title", CATEGORY),
+                ("genre", CATEGORY), ("minutes", INT), ("rating", FLOAT)]
+TOP_TRACKED = 10         # top_titles(n <= 10) is answered by a maintained TopK
+
+
+class MovieDataset(Dataset):
+    SCHEMA = MOVIE_SCHEMA
+    ANOMALY_COLUMN, ANOMALY_K = "minutes", 1.5   # anomalies(): minutes >= mean + 1.5 * std
+
+    def _build(self):
+        """One bincount per index: minutes by user, genre (case-folded), title and month."""
+        t = self.table
+        self.genre_folds = Dictionary()          # case-folded genre labels
+        self._fold_of = []
+        self.by_user = GroupIndex(size=len(t.dictionaries["user"]), dtype=np.int64)
+        self.by_genre = GroupIndex(dtype=np.int64)
+        self.by_title = GroupIndex(size=len(t.dictionaries["title"]), dtype=np.int64)
+        self.by_month = GroupIndex(dtype=np.int64)
+        self._fold_rows(0, t.n)
+        self.by_title.track_top(TOP_TRACKED)
+
+    def _sync_folds(self):
+        """Give every genre label seen so far its case-folded code."""
+        labels = self.table.dictionaries["genre"].labels
+        while len(self._fold_of) < len(labels):
+            self._fold_of.append(self.genre_folds.encode(labels[len(self._fold_of)].casefold()))
+
+    def _fold_rows(self, lo, hi):
+        t = self.table
+        rows = slice(lo, hi)
+        minutes = t.column("minutes")[rows]
+        self._sync_folds()
+        self.by_user.add_many(t.column("user")[rows], minutes)
+        self.by_genre.add_many(np.asarray(self._fold_of, np.int64)[t.column("genre")[rows]], minutes)
+        self.by_title.add_many(t.column("title")[rows], minutes)
+        self.by_month.add_many(month_keys(t.column("date")[rows]), minutes)
+
+    def _aggregates(self):
+        indexes = {"user": self.by_user, "genre": self.by_genre, "title": self.by_title, "month": self.by_month}
+        return indexes, {"genre_folds": self.genre_folds.labels, "fold_of": self._fold_of}
+
+    def _restore(self, indexes, extra):
+        self.genre_folds = Dictionary(extra["genre_folds"])
+        self._fold_of = list(extra["fold_of"])
+        self.by_user, self.by_genre = indexes["user"], indexes["genre"]
+        self.by_title, self.by_month = indexes["title"], indexes["month"]
+        self.by_title.track_top(TOP_TRACKED)
+
+    def _index_row(self, i):
+        t = self.table
+        minutes = int(t.column("minutes")[i])
+        genre = int(t.column("genre")[i])
+        if genre >= len(self._fold_of):          # a genre label first seen in this row
+            self._sync_folds()
+        self.by_user.add(int(t.column("user")[i]), minutes)
+        self.by_genre.add(self._fold_of[genre], minutes)
+        self.by_title.add(int(t.column("title")[i]), minutes)
+        d = from_days(t.column("date")[i])
+        self.by_month.add(month_key(d.year, d.month), minutes)
+
+    def group_index(self, column, value=None):
+        """Genre is left out: by_genre is keyed by case-folded labels, queries match exact ones."""
+        if value in (None, "minutes"):
+            return {"user": self.by_user, "title": self.by_title}.get(column)
+        return None
+
+    # --------------------------- Queries ---------------------------
+
+    def total_views(self):
+        return len(self.table)
+
+    def total_minutes(self):
+        return int(self.by_month.sums.sum())
+
+    def average_rating(self):
+        return float(self.col("rating").mean()) if len(self.table) else 0.0
+
+    def minutes_by_user(self, user):
+        code = self.table.dictionaries["user"].lookup(user)
+        return 0 if code is None else self.by_user.sum(code)
+
+    def minutes_by_genre(self, genre):
+        """Case-insensitive: 'Animation' and 'animation' are the same genre."""
+        code = self.genre_folds.lookup(genre.casefold())
+        return 0 if code is None else self.by_genre.sum(code)
+
+    def top_titles(self, n=3):
+        titles = self.table.dictionaries["title"]
+        return [titles[code] for code in self.by_title.top(n)]
+
+    def average_minutes_per_entry(self):
+        return self.total_minutes() / len(self.table) if len(self.table) else 0.0
+
+    def moving_average_minutes(self, window=3):
+        """Moving average of minutes in date order; N - window + 1 values."""
+        if window <= 0:
+            raise ValueError("window must be positive")
+        return self.rolling("minutes", "mean", window).tolist()
+
+    def add_view(self, date, view_id, user, title, genre, minutes, rating):
+        """Append a view; every index is updated in O(1)."""
+        i = self.table.append({
+            "date": date if isinstance(date, _dt.date) else _dt.date.fromisoformat(str(date)),
+            "view_id": str(view_id), "user": str(user).strip(), "title": str(title).strip(),
+            "genre": str(genre).strip(), "minutes": int(minutes), "rating": float(rating),
+        })
+        self._appended(i)
+        self._index_row(i)
+
+    def monthly_minutes(self, year, month):
+        return self.by_month.sum(month_key(year, month))
+
+
+# --------------------------- Benchmark ---------------------------
+
+def _dict_rows(path):
+    """What MovieAnalytics.load does: csv.DictReader, one dict per row."""
+    rows = []
+    with open(path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            rows.append({"date": _dt.date.fromisoformat(row["date"]), "view_id": row["view_id"],
+                         "user": row["user"].strip(), "title": row["title"].strip(),
+                         "genre": row["genre"].strip(), "minutes": int(row["minutes"]),
+                         "rating": float(row["rating"])})
+    return rows
+
+
+def _bench(rows):
+    from .synth import write_watch_log
+    with tempfile.TemporaryDirectory(prefix="movies_bench_") as tmp:
+        path = os.path.join(tmp, "watch_log.csv")
+        write_watch_log(path, rows)
+        print(f"[bench] {rows:,} rows, CSV {os.path.getsize(path) / 1e6:.0f} MB")
+
+        t0 = time.perf_counter()
+        dict_rows = _dict_rows(path)
+        t_dict = time.perf_counter() - t0
+        sample = dict_rows[:1000]
+        per_row = sum(sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r.values()) for r in sample) / len(sample)
+        del dict_rows
+        print(f"[bench] dict rows        : {t_dict:8.3f} s   ~{per_row:.0f} B/row")
+
+        t0 = time.perf_counter()
+        cold = MovieDataset(path)
+        t_cold = time.perf_counter() - t0
+        print(f"[bench] columnar (parse) : {t_cold:8.3f} s   {cold.table.nbytes / rows:.0f} B/row (+ cache write)")
+
+        t0 = time.perf_counter()
+        warm = MovieDataset(path)
+        t_warm = time.perf_counter() - t0
+        assert warm.loaded_from_cache
+        print(f"[bench] columnar (mmap)  : {t_warm * 1000:8.3f} ms")
+
+        t0 = time.perf_counter()
+        top = warm.top_titles(3)
+        print(f"[bench] top_titles(3) on the mmapped table: {(time.perf_counter() - t0) * 1000:.1f} ms -> {top}")
+
+        extra = max(1, rows // 100)
+        with open(path, "a", newline="") as f:
+            w = csv.writer(f)
+            for k in range(extra):
+                w.writerow(("2030-01-01", f"tail{k}", f"user{k % 97}", "title1", "drama", 60, 4.0))
+        t0 = time.perf_counter()
+        grown = MovieDataset(path)
+        t_tail = time.perf_counter() - t0
+        assert grown.snapshot == "appended" and grown.total_views() == rows + extra
+        print(f"[bench] +{extra:,} rows appended: {t_tail * 1000:8.1f} ms   (tail parsed, aggregates folded, "
+              f"snapshot rewritten)")
+
+
+def _timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - t0) / repeat, result
+
+
+def _bench_indexes(rows):
+    from .synth import movie_table
+    t0 = time.perf_counter()
+    table = movie_table(rows, MOVIE_SCHEMA)
+    print(f"[bench] {rows:,} synthetic rows in {time.perf_counter() - t0:.1f} s")
+    t0 = time.perf_counter()
+    ds = MovieDataset.from_table(table)
+    print(f"[bench] build user/genre/title/month indexes: {time.perf_counter() - t0:.3f} s")
+
+    # what each query costs without an index: one vectorised pass over all rows
+    minutes, days = table.column("minutes"), table.column("date")
+    user, genre = table.dictionaries["user"].lookup("user42"), table.dictionaries["genre"].lookup("drama")
+    may = (to_days("2022-05-01"), to_days("2022-06-01"))
+    cases = [
+        ("minutes_by_user", lambda: ds.minutes_by_user("user42"),
+         lambda: int(minutes[table.column("user") == user].sum())),
+        ("minutes_by_genre", lambda: ds.minutes_by_genre("Drama"),
+         lambda: int(minutes[table.column("genre") == genre].sum())),
+        ("monthly_minutes", lambda: ds.monthly_minutes(2022, 5),
+         lambda: int(minutes[(days >= may[0]) & (days < may[1])].sum())),
+        ("top_titles(10)", lambda: ds.top_titles(10),
+         lambda: np.argsort(-np.bincount(table.column("title"), weights=minutes))[:10]),
+    ]
+    for name, indexed, scan in cases:
+        t_idx, a = _timed(indexed, 1000)
+        t_scan, b = _timed(scan, 3)
+        same = a == b if not isinstance(a, list) else a == [table.dictionaries["title"][c] for c in b]
+        print(f"[bench] {name:<17} index {t_idx * 1e6:9.1f} us   full scan {t_scan * 1e3:9.1f} ms   same={same}")
+    t_add, _ = _timed(lambda: ds.add_view("2024-01-01", "vx", "user42", "title7", "drama", 90, 4.0), 10_000)
+    print(f"[bench] add_view + index maintenance: {t_add * 1e6:.1f} us/row")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="columnar MovieAnalytics")
+    ap.add_argument("csv", nargs="?", help="watch log to summarise")
+    ap.add_argument("--bench", action="store_true", help="dict rows vs. columnar vs. mmapped cache")
+    ap.add_argument("--bench-indexes", action="store_true", help="indexed queries vs. full scans")
+    ap.add_argument("--rows", type=int, default=None, help="default: 1M for --bench, 10M for --bench-indexes")
+    args = ap.parse_args()
+    if args.bench_indexes:
+        _bench_indexes(args.rows or 10_000_000)
+        return
+    if args.bench:
+        _bench(args.rows or 1_000_000)
+        return
+    if not args.csv:
+        ap.error("give a CSV path (or --bench)")
+    ds = MovieDataset(args.csv)
+    print(f"{ds.total_views()} views, {ds.total_minutes()} minutes, avg rating {ds.average_rating():.2f}, "
+          f"top titles {ds.top_titles(3)} ({'mmapped cache' if ds.loaded_from_cache else 'parsed CSV'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+A small lazy query API over a Dataset:
+
+    ds.where(genre="Drama").between("2022-01-01", "2022-03-31").group_by("user").sum("minutes").top(10)
+
+Building a query only records a plan; collect() runs it, explain() describes it.
+Execution, cheapest first:
+  1. index pushdown   - a plan the running aggregates already answer (sum/count of one
+                        group, group_by + sum over everything) is a GroupIndex lookup
+  2. date pushdown    - between() becomes a DateIndex bisect: only rows [lo, hi) are read
+  3. one fused pass   - every where() is a comparison on the range's column slices,
+                        and'ed into a single mask; the aggregate (bincount for group_by)
+                        reads the masked values. No row dicts, no intermediate lists.
+
+where() takes column=value (a label for category columns, a list for "any of"), or
+column__op=value with op in gt, ge, lt, le, ne, in.
+
+Benchmark (run from the lesson folder):
+    python -m analytics_engine.query --bench --rows 2000000
+"""
+from __future__ import annotations
+import argparse, operator, time
+from collections import Counter
+
+import numpy as np
+
+from .columnar import CATEGORY, DATE, FLOAT, TEXT, to_days
+from .topk import top_k
+
+OPS = {"eq": operator.eq, "ne": operator.ne, "gt": operator.gt, "ge": operator.ge,
+       "lt": operator.lt, "le": operator.le, "in": None}
+SYMBOLS = {"eq": "==", "ne": "!=", "gt": ">", "ge": ">=", "lt": "<", "le": "<=", "in": "in"}
+ALL_GROUPS = object()     # _index_plan: the whole GroupIndex, not one group
+
+
+class Query:
+    def __init__(self, ds):
+        self.ds = ds
+        self.filters = []        # (column, op, value)
+        self.dates = None        # (start, end) inclusive
+        self.group = None
+        self.agg = None          # (name, column or None)
+        self.limit = None        # (n, by)
+
+    def _with(self, **changes):
+        q = Query(self.ds)
+        q.__dict__.update(self.__dict__)
+        q.filters = list(self.filters)
+        q.__dict__.update(changes)
+        return q
+
+    # ---------- building ----------
+
+    def where(self, **conditions):
+        filters = list(self.filters)
+        for key, value in conditions.items():
+            name, _, op = key.partition("__")
+            op = op or ("in" if isinstance(value, (list, tuple, set)) else "eq")
+            if name not in self.ds.table.schema:
+                raise KeyError(f"unknown column {name!r}")
+            if op not in OPS:
+                raise ValueError(f"unknown operator {op!r}, expected one of {sorted(OPS)}")
+            kind = self.ds.table.schema[name]
+            if kind == TEXT:
+                raise TypeError(f"{name} is a text column and cannot be filtered")
+            if kind == CATEGORY and op not in ("eq", "ne", "in"):
+                raise TypeError(f"{name} is a category column: use ==, ne or in")
+            filters.append((name, op, value))
+        return self._with(filters=filters)
+
+    def between(self, start, end):
+        """start <= date <= end (dates or ISO strings), answered by the DateIndex."""
+        return self._with(dates=(start, end))
+
+    def group_by(self, column):
+        if self.ds.table.schema.get(column) != CATEGORY:
+            raise TypeError(f"group_by needs a category column, not {column!r}")
+        return self._with(group=column)
+
+    def sum(self, column):
+        return self._with(agg=("sum", column))
+
+    def mean(self, column):
+        return self._with(agg=("mean", column))
+
+    def count(self):
+        return self._with(agg=("count", None))
+
+    def top(self, n, by=None):
+        """The n largest groups (after group_by + an aggregate), or the n rows with the largest `by`."""
+        if self.group is None and by is None:
+            raise ValueError("top() without group_by needs by=<column>")
+        return self._with(limit=(n, by))
+
+    # ---------- planning ----------
+
+    def _encode(self, name, value):
+        """Filter value in the column's storage form (codes, days); None for an unknown label."""
+        kind = self.ds.table.schema[name]
+        if isinstance(value, (list, tuple, set)):
+            codes = [self._encode(name, v) for v in value]
+            return np.asarray([c for c in codes if c is not None])
+        if kind == CATEGORY:
+            return self.ds.table.dictionaries[name].lookup(value)
+        if kind == DATE:
+            return to_days(value)
+        return value
+
+    def _index_plan(self):
+        """
+        (GroupIndex, code) when the maintained aggregates answer this plan outright, else None.
+        code is the filtered group's code (None for an unknown label), or ALL_GROUPS for group_by.
+        """
+        if self.dates is not None or self.agg is None or self.limit and self.limit[1] is not None:
+            return None
+        column = self.agg[1]
+        if self.group is not None and not self.filters:
+            index = self.ds.group_index(self.group, column)
+            return None if index is None else (index, ALL_GROUPS)
+        if self.group is None and len(self.filters) == 1 and self.filters[0][1] == "eq":
+            fname, _, value = self.filters[0]
+            if self.ds.table.schema[fname] != CATEGORY:
+                return None
+            index = self.ds.group_index(fname, column)
+            return None if index is None else (index, self._encode(fname, value))
+        return None
+
+    def explain(self):
+        """The plan, one step per line, as collect() would run it."""
+        ds = self.ds
+        lines = [f"{type(ds).__name__}: {len(ds):,} live rows"]
+        plan = self._index_plan()
+        if plan is not None:
+            index, code = plan
+            what = (f"all {self.group} groups" if code is ALL_GROUPS else
+                    f"group {self.filters[0][2]!r} (code {code})")
+            lines.append(f"  index pushdown: {self.agg[0]} from the maintained GroupIndex, {what} -> O(1) per group")
+            if self.limit:
+                lines.append(f"  top {self.limit[0]}: argpartition over {index.size:,} group sums")
+            return "\n".join(lines)
+        if self.dates is not None:
+            r = ds.dates.range(*self.dates)
+            lines.append(f"  between {self.dates[0]} .. {self.dates[1]}: DateIndex bisect -> rows "
+                         f"[{r.lo:,}, {r.hi:,}) + {len(r.extra)} tail rows = {len(r):,} rows to read")
+        else:
+            lines.append(f"  full range: {ds.table.n:,} rows to read")
+        for name, op, value in self.filters:
+            lines.append(f"  where {name} {SYMBOLS[op]} {value!r}: encoded {self._encode(name, value)!r}, "
+                         f"fused into the single mask")
+        if ds.table.deleted:
+            lines.append(f"  and live (excludes {len(ds.table.deleted):,} deleted rows)")
+        if self.agg:
+            target = self.agg[1] or "rows"
+            how = f"bincount by {self.group}" if self.group else "reduction"
+            lines.append(f"  {self.agg[0]} {target}: {how} over the masked values")
+        if self.limit:
+            n, by = self.limit
+            lines.append(f"  top {n}" + (f" by {by}" if by else "") + ": argpartition, then sort the winners")
+        if not self.agg and not self.limit:
+            lines.append("  collect: decode the matching rows to dicts")
+        return "\n".join(lines)
+
+    # ---------- execution ----------
+
+    def _selection(self):
+        """(row numbers or a slice into the columns, mask or None) after pushdown and the fused pass."""
+        t = self.ds.table
+        if self.dates is not None:
+            r = self.ds.dates.range(*self.dates)
+            rows = slice(r.lo, r.hi) if r.contiguous else r.indices()
+            live = None                      # DateRange already dropped deleted rows
+        else:
+            rows = slice(0, t.n)
+            live = t.live_mask()
+        mask = live
+        for name, op, value in self.filters:
+            encoded = self._encode(name, value)
+            col = t.column(name)[rows]
+            if op == "in":
+                hit = np.isin(col, encoded)
+            elif encoded is None:           # an unknown label: nothing equals it, everything differs
+                hit = np.full(len(col), op == "ne")
+            else:
+                hit = OPS[op](col, encoded)
+            mask = hit if mask is None else mask & hit
+        return rows, mask
+
+    @staticmethod
+    def _pick(values, mask):
+        return values if mask is None else values[mask]
+
+    def _groups(self, sums, counts):
+        labels = self.ds.table.dictionaries[self.group]
+        name = self.agg[0]
+        values = counts if name == "count" else sums / np.maximum(counts, 1) if name == "mean" else sums
+        present = np.flatnonzero(counts)
+        if self.limit:
+            present = top_k(values[present], self.limit[0], present)
+        return [(labels[c], values[c].item()) for c in present]
+
+    def collect(self):
+        ds, t = self.ds, self.ds.table
+        plan = self._index_plan()
+        if plan is not None:
+            index, code = plan
+            name = self.agg[0]
+            if code is ALL_GROUPS:
+                return self._groups(index.sums, index.counts)
+            count = 0 if code is None else index.count(code)
+            if name == "count":
+                return count
+            total = 0 if code is None else index.sum(code)
+            return total if name == "sum" else (total / count if count else 0.0)
+
+        rows, mask = self._selection()
+        if self.group is not None:
+            if self.agg is None:
+                raise ValueError("group_by needs an aggregate: sum(), mean() or count()")
+            codes = self._pick(t.column(self.group)[rows], mask)
+            size = len(t.dictionaries[self.group])
+            counts = np.bincount(codes, minlength=size)
+            sums = counts if self.agg[1] is None else np.bincount(
+                codes, weights=self._pick(t.column(self.agg[1])[rows], mask), minlength=size)
+            if self.agg[1] is not None and t.schema[self.agg[1]] != FLOAT:
+                sums = np.rint(sums).astype(np.int64)
+            return self._groups(sums, counts)
+        if self.agg is not None:
+            name, column = self.agg
+            if name == "count":
+                if mask is not None:
+                    return int(mask.sum())
+                return rows.stop - rows.start if isinstance(rows, slice) else len(rows)
+            values = self._pick(t.column(column)[rows], mask)
+            if name == "sum":
+                return values.sum().item()
+            return float(values.mean()) if len(values) else 0.0
+        index = np.arange(t.n)[rows]
+        if mask is not None:
+            index = index[mask]
+        if self.limit:
+            n, by = self.limit
+            index = top_k(t.column(by)[index], n, index)
+        return list(t.rows(index))
+
+    def __repr__(self):
+        return "<Query\n" + self.explain() + "\n>"
+
+
+# --------------------------- Benchmark ---------------------------
+
+def _timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - t0) / repeat, result
+
+
+def _bench(rows):
+    from .movies import MOVIE_SCHEMA, MovieDataset
+    from .synth import movie_table
+    ds = MovieDataset.from_table(movie_table(rows, MOVIE_SCHEMA))
+    print(f"[bench] {rows:,} views")
+
+    def existing_drama_q1():
+        """The same question with the existing methods: a date filter, then a loop over row dicts."""
+        per_user = Counter()
+        for r in ds.filter_by_date_range("2022-01-01", "2022-03-31"):
+            if r["genre"] == "drama":
+                per_user[r["user"]] += r["minutes"]
+        return sorted(per_user.items(), key=lambda kv: (-kv[1], kv[0]))[:10]
+
+    q1 = ds.between("2022-01-01", "2022-03-31").where(genre="drama").group_by("user").sum("minutes").top(10)
+    q2 = ds.where(user="user42").sum("minutes")
+    q3 = ds.where(genre="drama", minutes__ge=120, rating__ge=4.0).count()
+    cases = [
+        ("range+where+group+top", q1, existing_drama_q1, 3),
+        ("where(user).sum", q2, lambda: ds.minutes_by_user("user42"), 1000),
+        ("3 predicates .count", q3,
+         lambda: sum(1 for r in ds.table.rows() if r["genre"] == "drama" and r["minutes"] >= 120 and r["rating"] >= 4.0),
+         1),
+    ]
+    for name, query, existing, reps in cases:
+        t_q, a = _timed(query.collect, reps)
+        t_e, b = _timed(existing, reps)
+        same = [(k, int(v)) for k, v in a] == b if isinstance(a, list) else a == b
+        print(f"[bench] {name:<22} query {t_q * 1e3:9.3f} ms   existing {t_e * 1e3:9.3f} ms   same={same}")
+    print("[bench] explain():\n" + q1.explain() + "\n" + q2.explain())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="lazy queries vs. the hand-written dataset methods")
+    ap.add_argument("--bench", action="store_true")
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    args = ap.parse_args()
+    if not args.bench:
+        ap.error("nothing to do (try --bench)")
+    _bench(args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Rolling-window statistics in O(n), whatever the window size.
+
+Count windows (the last `window` rows), over a series already in date order:
+  - sum / mean / std  -> differences of prefix sums (cumsum of x and x**2)
+  - min / max         -> van Herk / Gil-Werman: per-block prefix and suffix extrema,
+                         two accumulate passes and one elementwise compare
+Each returns the n - window + 1 "full" windows, like the exercises' moving averages.
+
+Time windows (`days`): every row gets the statistic of all rows dated in
+(date - days, date], so rows on the same day share one value. Rows are bucketed by
+day, the buckets are rolled over the calendar with the count-window code, and the
+result is mapped back to the rows: O(n + number of days).
+
+RollingWindow is the online form for appended rows: push() is O(1) amortised (a
+running sum / sum of squares plus monotonic deques for min and max).
+
+Benchmark (run from the lesson folder):
+    python -m analytics_engine.rolling --bench
+"""
+from __future__ import annotations
+import argparse, math, time
+from collections import deque
+
+import numpy as np
+
+STATS = ("sum", "mean", "std", "min", "max", "count")
+
+
+def _check(window):
+    if window <= 0:
+        raise ValueError("window must be positive")
+
+
+def _prefix(values):
+    """cumsum with a leading 0; ints stay exact, everything else is float64."""
+    values = np.asarray(values)
+    dtype = np.int64 if values.dtype.kind in "iub" else np.float64
+    out = np.zeros(len(values) + 1, dtype)
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+def rolling_sum(values, window):
+    _check(window)
+    csum = _prefix(values)
+    return csum[window:] - csum[:-window] if len(csum) > window else csum[:0]
+
+
+def rolling_mean(values, window):
+    return rolling_sum(values, window) / window
+
+
+def rolling_std(values, window, ddof=0):
+    """
+    Population std by default. Integer columns are summed exactly in int64 (when x**2 sums
+    cannot overflow); floats are centred first so the x**2 sums stay small.
+    """
+    _check(window)
+    values = np.asarray(values)
+    if len(values) < window or window - ddof <= 0:
+        return np.empty(0)
+    if values.dtype.kind in "iub" and _exact_squares(values, window):
+        v = values.astype(np.int64)
+        s, s2 = rolling_sum(v, window), rolling_sum(v * v, window)
+        return np.sqrt((window * s2 - s * s) / (window * (window - ddof)))
+    x = values.astype(np.float64) - values.mean()
+    c2 = _prefix(x * x)
+    s, s2 = rolling_sum(x, window), c2[window:] - c2[:-window]
+    return np.sqrt(_clean_var((s2 - s * s / window) / (window - ddof), c2[window:], window - ddof, len(values)))
+
+
+def _exact_squares(values, window):
+    """True when int64 prefix sums of x**2 (and window * those sums) cannot overflow."""
+    top = int(np.abs(values).max()) if len(values) else 0
+    return top * top * (len(values) + window * window) < 2 ** 62
+
+
+def _clean_var(var, prefix_sq, count, rows):
+    """
+    Variances from prefix-sum differences carry rounding noise that grows with the prefix
+    (the running sum of squares up to each window's end, over up to `rows` additions), not
+    with the window's own values; anything below that noise is 0.
+    """
+    noise = 4 * np.finfo(np.float64).eps * math.sqrt(rows) * prefix_sq / count
+    return np.where(var > noise, var, 0.0)
+
+
+def _extreme(values, window, op):
+    values = np.asarray(values)
+    n = len(values)
+    _check(window)
+    if n < window:
+        return values[:0]
+    if window == 1:
+        return values.copy()
+    if values.dtype.kind == "f":
+        fill = np.inf if op is np.minimum else -np.inf
+    else:
+        info = np.iinfo(values.dtype)
+        fill = info.max if op is np.minimum else info.min
+    blocks = np.concatenate((values, np.full(-n % window, fill, values.dtype))).reshape(-1, window)
+    prefix = op.accumulate(blocks, axis=1).ravel()
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    # window [i, i + w - 1] = (i .. end of i's block) + (start of the next block .. i + w - 1)
+    return op(suffix[:n - window + 1], prefix[window - 1:n])
+
+
+def rolling_min(values, window):
+    return _extreme(values, window, np.minimum)
+
+
+def rolling_max(values, window):
+    return _extreme(values, window, np.maximum)
+
+
+def rolling(values, window, stat="mean"):
+    """Count-window statistic by name (see STATS)."""
+    if stat == "count":
+        return np.full(max(0, len(values) - window + 1), window)
+    fns = {"sum": rolling_sum, "mean": rolling_mean, "std": rolling_std, "min": rolling_min, "max": rolling_max}
+    if stat not in fns:
+        raise ValueError(f"unknown statistic {stat!r}, expected one of {STATS}")
+    return fns[stat](values, window)
+
+
+def rolling_by_days(days, values, window_days, stat="mean"):
+    """
+    Time-window statistic per row: over every row dated in (day - window_days, day].
+    `days` must be sorted (int days, e.g. a date column read in DateIndex.order()).
+    """
+    _check(window_days)
+    days, values = np.asarray(days, np.int64), np.asarray(values)
+    if stat not in STATS:
+        raise ValueError(f"unknown statistic {stat!r}, expected one of {STATS}")
+    if not len(days):
+        return np.empty(0)
+    if len(days) > 1 and np.any(days[1:] < days[:-1]):
+        raise ValueError("days must be sorted")
+    first = days[0]
+    slot = days - first                         # row -> calendar day
+    span = int(slot[-1]) + 1
+    pad = window_days - 1                       # neutral days before the first, so every day has a full window
+    counts = np.bincount(slot, minlength=span)
+    rolled_counts = rolling_sum(np.concatenate((np.zeros(pad, np.int64), counts)), window_days)
+    if stat == "count":
+        return rolled_counts[slot]
+    if stat in ("min", "max"):
+        op = np.minimum if stat == "min" else np.maximum
+        starts = np.flatnonzero(np.r_[True, slot[1:] != slot[:-1]])
+        fill = np.inf if op is np.minimum else -np.inf
+        per_day = np.full(span + pad, fill)
+        per_day[pad + slot[starts]] = op.reduceat(values.astype(np.float64), starts)
+        return _extreme(per_day, window_days, op)[slot]
+    rolled_counts = np.maximum(rolled_counts, 1)  # empty days are never read back; avoid 0/0
+    x = values.astype(np.float64)
+    shift = x.mean() if stat == "std" else 0.0
+    x = x - shift
+    sums = rolling_sum(np.concatenate((np.zeros(pad), np.bincount(slot, weights=x, minlength=span))), window_days)
+    if stat == "sum":
+        return (sums + shift * rolled_counts)[slot]
+    if stat == "mean":
+        return (sums / rolled_counts + shift)[slot]
+    c2 = _prefix(np.concatenate((np.zeros(pad), np.bincount(slot, weights=x * x, minlength=span))))
+    sq = c2[window_days:] - c2[:-window_days]
+    var = (sq - sums * sums / rolled_counts) / rolled_counts
+    return np.sqrt(_clean_var(var, c2[window_days:], rolled_counts, len(values)))[slot]
+
+
+class RollingWindow:
+    """
+    Online rolling statistics: either the last `size` values, or (with `days`) the values
+    dated in (latest day - days, latest day].
+    """
+
+    def __init__(self, size=None, days=None):
+        if (size is None) == (days is None):
+            raise ValueError("give exactly one of size= or days=")
+        _check(size or days)
+        self.size, self.days = size, days
+        self._items = deque()                   # (seq, day, value)
+        self._min, self._max = deque(), deque()  # monotonic (seq, value)
+        self._seq = 0
+        self._sum = self._sumsq = 0.0
+        self._day = None
+
+    def push(self, value, day=None):
+        if self.days is not None:
+            if day is None:
+                raise TypeError("a time window needs the row's day")
+            # a late row (dated before the newest one) counts as arriving on the newest day
+            day = day if self._day is None else max(day, self._day)
+            self._day = day
+        value = float(value)
+        seq, self._seq = self._seq, self._seq + 1
+        self._items.append((seq, day, value))
+        self._sum += value
+        self._sumsq += value * value
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((seq, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((seq, value))
+        self._evict()
+
+    def extend(self, values, days=None):
+        for k, value in enumerate(values):
+            self.push(value, None if days is None else days[k])
+
+    def _evict(self):
+        items = self._items
+        while items and (len(items) > self.size if self.days is None else items[0][1] <= self._day - self.days):
+            seq, _, value = items.popleft()
+            self._sum -= value
+            self._sumsq -= value * value
+            if self._min[0][0] == seq:
+                self._min.popleft()
+            if self._max[0][0] == seq:
+                self._max.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def full(self):
+        """A count window holding `size` values (time windows are always 'full')."""
+        return self.days is not None or len(self._items) == self.size
+
+    @property
+    def sum(self):
+        return self._sum
+
+    @property
+    def mean(self):
+        return self._sum / len(self._items) if self._items else math.nan
+
+    @property
+    def std(self):
+        n = len(self._items)
+        if not n:
+            return math.nan
+        return math.sqrt(max(self._sumsq / n - (self._sum / n) ** 2, 0.0))
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else math.nan
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else math.nan
+
+    def stats(self):
+        return {"count": len(self), "sum": self.sum, "mean": self.mean, "std": self.std,
+                "min": self.min, "max": self.max}
+
+
+# --------------------------- Benchmark ---------------------------
+
+def _naive_mean(values, window):
+    """What the exercises do: slice and sum at every position, O(n * window)."""
+    values = values.tolist()
+    return [sum(values[i:i + window]) / window for i in range(len(values) - window + 1)]
+
+
+def _bench(rows, windows):
+    rng = np.random.default_rng(0)
+    values = rng.integers(5, 180, rows)
+    days = np.sort(rng.integers(0, 1500, rows))
+    naive_rows = min(rows, 20_000)
+    for w in windows:
+        t0 = time.perf_counter()
+        naive = _naive_mean(values[:naive_rows], w)
+        t_naive = (time.perf_counter() - t0) * rows / naive_rows
+        t0 = time.perf_counter()
+        fast = rolling_mean(values, w)
+        t_mean = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        rolling_std(values, w), rolling_min(values, w), rolling_max(values, w)
+        t_rest = time.perf_counter() - t0
+        same = np.allclose(fast[:len(naive)], naive)
+        print(f"[bench] window {w:>6}: slice+sum ~{t_naive:8.2f} s (extrapolated)   cumsum mean {t_mean * 1e3:6.1f} ms"
+              f"   std+min+max {t_rest * 1e3:6.1f} ms   same={same}")
+    t0 = time.perf_counter()
+    rolling_by_days(days, values, 7, "mean"), rolling_by_days(days, values, 7, "max")
+    print(f"[bench] 7-day mean+max per row over {rows:,} rows: {(time.perf_counter() - t0) * 1e3:.1f} ms")
+    win = RollingWindow(size=1000)
+    t0 = time.perf_counter()
+    for v in values[:200_000].tolist():
+        win.push(v)
+    print(f"[bench] RollingWindow.push: {(time.perf_counter() - t0) / 200_000 * 1e6:.2f} us/row")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="O(n) rolling statistics vs. per-window slicing")
+    ap.add_argument("--bench", action="store_true")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--windows", default="3,30,300,3000")
+    args = ap.parse_args()
+    if not args.bench:
+        ap.error("nothing to do (try --bench)")
+    _bench(args.rows, [int(w) for w in args.windows.split(",")])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+SalesDataset: the questions SalesAnalytics (part2/debug exercise/sales_analytics.py)
+answers, from running aggregates that are never rebuilt.
+
+Revenue is kept per customer, category, product and month (GroupIndex). Every change
+is folded in O(1):
+  - add_transaction      -> +amount, +1 order in each of the four indexes
+  - delete_transaction   -> -amount, -1 order; the row is marked deleted, not removed
+  - correct_transaction  -> delete + add of the corrected row
+Deletions and corrections are journalled as Delta records in `deltas`, so the history of
+a figure can be explained (and replayed onto a snapshot of the CSV).
+
+Benchmark (run from the lesson folder):
+    python -m analytics_engine.sales --bench --rows 1000000
+"""
+from __future__ import annotations
+import argparse, datetime as _dt, time
+from typing import NamedTuple
+
+import numpy as np
+
+from .columnar import CATEGORY, DATE, FLOAT, INT, TEXT, from_days
+from .dataset import Dataset
+from .indexes import GroupIndex, month_key, month_keys
+
+SALES_SCHEMA = [("date", DATE), ("order_id", TEXT), ("customer", CATEGORY), ("product", CATEGORY),
+                ("category", CATEGORY), ("quantity", INT), ("unit_price", FLOAT), ("amount", FLOAT)]
+DIMENSIONS = ("customer", "category", "product")
+TOP_TRACKED = 10         # top_products(n <= 10) is answered by a maintained TopK
+
+
+class Delta(NamedTuple):
+    op: str          # "delete" | "correct"
+    order_id: str
+    old_row: int     # row that stopped counting
+    new_row: int     # replacement row (correct only), else -1
+
+
+class SalesDataset(Dataset):
+    SCHEMA = SALES_SCHEMA
+    ANOMALY_COLUMN, ANOMALY_K = "amount", 2.0    # anomalies(): amount >= mean + 2 * std
+    DERIVED = {"amount": lambda b: np.asarray(b["quantity"], np.float64) * np.asarray(b["unit_price"], np.float64)}
+
+    def _build(self):
+        t = self.table
+        self.by = {name: GroupIndex(size=len(t.dictionaries[name])) for name in DIMENSIONS}
+        self.by_month = GroupIndex()
+        self._fold_rows(0, t.n)
+        self._start()
+
+    def _start(self):
+        self.by["product"].track_top(TOP_TRACKED)
+        self.deltas = []
+        self._row_of_order = None     # order_id -> live row, built on the first delete/correct
+
+    def _fold_rows(self, lo, hi):
+        t = self.table
+        live = t.live_mask(lo, hi)
+        cols = {name: t.column(name)[lo:hi] if live is None else t.column(name)[lo:hi][live]
+                for name in DIMENSIONS + ("date", "amount")}
+        for name in DIMENSIONS:
+            self.by[name].add_many(cols[name], cols["amount"])
+        self.by_month.add_many(month_keys(cols["date"]), cols["amount"])
+
+    def _aggregates(self):
+        return {**{f"by.{name}": self.by[name] for name in DIMENSIONS}, "by_month": self.by_month}, {}
+
+    def _restore(self, indexes, extra):
+        self.by = {name: indexes[f"by.{name}"] for name in DIMENSIONS}
+        self.by_month = indexes["by_month"]
+        self._start()
+
+    def _fold(self, i, sign):
+        """Add (sign=+1) or retract (sign=-1) row i in every aggregate."""
+        t = self.table
+        amount = sign * float(t.column("amount")[i])
+        for name in DIMENSIONS:
+            self.by[name].add(int(t.column(name)[i]), amount, sign)
+        d = from_days(t.column("date")[i])
+        self.by_month.add(month_key(d.year, d.month), amount, sign)
+
+    def _order_index(self):
+        if self._row_of_order is None:
+            t = self.table
+            self._row_of_order = {t.text("order_id", i): i for i in range(t.n) if i not in t.deleted}
+        return self._row_of_order
+
+    def group_index(self, column, value=None):
+        return self.by.get(column) if value in (None, "amount") else None
+
+    # --------------------------- Changes ---------------------------
+
+    @staticmethod
+    def _values(date, order_id, customer, product, category, quantity, unit_price):
+        """A row dict with every field converted; raises before anything is changed."""
+        quantity, unit_price = int(quantity), float(unit_price)
+        return {
+            "date": date if isinstance(date, _dt.date) else _dt.date.fromisoformat(str(date)),
+            "order_id": str(order_id), "customer": str(customer).strip(), "product": str(product).strip(),
+            "category": str(category).strip(), "quantity": quantity, "unit_price": unit_price,
+            "amount": quantity * unit_price,
+        }
+
+    def _append(self, values):
+        i = self.table.append(values)
+        self._appended(i)
+        self._fold(i, +1)
+        if self._row_of_order is not None:
+            self._row_of_order[values["order_id"]] = i
+        return i
+
+    def add_transaction(self, date, order_id, customer, product, category, quantity, unit_price):
+        """Append an order; aggregates are updated in O(1). Returns the row number."""
+        return self._append(self._values(date, order_id, customer, product, category, quantity, unit_price))
+
+    def delete_transaction(self, order_id):
+        """Stop counting an order. KeyError if it is unknown or already deleted."""
+        i = self._order_index().pop(str(order_id))
+        self.table.delete(i)
+        self._removed(i)
+        self._fold(i, -1)
+        delta = Delta("delete", str(order_id), i, -1)
+        self.deltas.append(delta)
+        return delta
+
+    def correct_transaction(self, order_id, **changes):
+        """Replace an order with a copy that has `changes` applied (e.g. quantity=3)."""
+        unknown = set(changes) - {name for name, _ in SALES_SCHEMA if name not in ("order_id", "amount")}
+        if unknown:
+            raise TypeError(f"cannot correct {sorted(unknown)}")
+        i = self._order_index()[str(order_id)]
+        row = self.table.row(i)
+        row.update(changes)
+        # convert first: a bad value must leave the original order in place
+        values = self._values(row["date"], order_id, row["customer"], row["product"], row["category"],
+                              row["quantity"], row["unit_price"])
+        self.delete_transaction(order_id)
+        self.deltas.pop()
+        j = self._append(values)
+        delta = Delta("correct", str(order_id), i, j)
+        self.deltas.append(delta)
+        return delta
+
+    # --------------------------- Queries ---------------------------
+
+    def total_orders(self):
+        return self.table.live_count
+
+    def total_revenue(self):
+        return float(self.by_month.sums.sum())
+
+    def _sum(self, dimension, label):
+        code = self.table.dictionaries[dimension].lookup(label)
+        return 0.0 if code is None else self.by[dimension].sum(code)
+
+    def revenue_by_customer(self, customer):
+        return self._sum("customer", customer)
+
+    def revenue_by_category(self, category):
+        return self._sum("category", category)
+
+    def revenue_by_product(self, product):
+        return self._sum("product", product)
+
+    def top_products(self, n=3):
+        products = self.table.dictionaries["product"]
+        return [products[code] for code in self.by["product"].top(n)]
+
+    def average_order_value(self):
+        orders = self.total_orders()
+        return self.total_revenue() / orders if orders else 0.0
+
+    def revenue_by_month(self, year, month):
+        return self.by_month.sum(month_key(year, month))
+
+    def moving_average_daily(self, window=3):
+        """Moving average of order amounts in date order; N - window + 1 values."""
+        if window <= 0:
+            raise ValueError("window must be positive")
+        return self.rolling("amount", "mean", window).tolist()
+
+    def get_rows(self):
+        """A fresh list of row dicts: mutating it cannot affect the dataset."""
+        return self.rows()
+
+
+# --------------------------- Benchmark ---------------------------
+
+def _bench(rows):
+    from .synth import sales_table
+    table = sales_table(rows, SALES_SCHEMA)
+    t0 = time.perf_counter()
+    ds = SalesDataset.from_table(table)
+    print(f"[bench] {rows:,} orders, aggregates built in {time.perf_counter() - t0:.3f} s")
+
+    amount, customer = table.column("amount"), table.column("customer")
+    code = table.dictionaries["customer"].lookup("customer7")
+    t0 = time.perf_counter()
+    rescan = float(amount[customer == code].sum())
+    t_scan = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        indexed = ds.revenue_by_customer("customer7")
+    t_idx = (time.perf_counter() - t0) / 1000
+    print(f"[bench] revenue_by_customer: {t_idx * 1e6:.1f} us (rescan {t_scan * 1e3:.1f} ms), "
+          f"same={abs(indexed - rescan) < 1e-6 * max(1.0, abs(rescan))}")
+
+    n = 20_000
+    t0 = time.perf_counter()
+    for k in range(n):
+        ds.add_transaction("2024-05-20", f"new{k}", "customer7", "product3", "food", 2, 3.5)
+    print(f"[bench] add_transaction     : {(time.perf_counter() - t0) / n * 1e6:.1f} us/order")
+    t0 = time.perf_counter()
+    ds._order_index()
+    print(f"[bench] order_id index (first delete only): {time.perf_counter() - t0:.2f} s")
+    t0 = time.perf_counter()
+    for k in range(n):
+        ds.correct_transaction(f"new{k}", quantity=1)
+    print(f"[bench] correct_transaction : {(time.perf_counter() - t0) / n * 1e6:.1f} us/order")
+    t0 = time.perf_counter()
+    for k in range(n):
+        ds.delete_transaction(f"new{k}")
+    print(f"[bench] delete_transaction  : {(time.perf_counter() - t0) / n * 1e6:.1f} us/order")
+    print(f"[bench] revenue back to start: {abs(ds.revenue_by_customer('customer7') - indexed) < 1e-6 * max(1.0, indexed)}, "
+          f"{len(ds.deltas):,} deltas journalled")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="incrementally aggregated SalesAnalytics")
+    ap.add_argument("csv", nargs="?", help="orders CSV to summarise")
+    ap.add_argument("--bench", action="store_true", help="O(1) updates vs. rescans on synthetic orders")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    if args.bench:
+        _bench(args.rows)
+        return
+    if not args.csv:
+        ap.error("give a CSV path (or --bench)")
+    ds = SalesDataset(args.csv)
+    print(f"{ds.total_orders()} orders, revenue {ds.total_revenue():.2f}, "
+          f"average order {ds.average_order_value():.2f}, top products {ds.top_products(3)}")
+
+
+if __name__ == "__main__":
+    main()
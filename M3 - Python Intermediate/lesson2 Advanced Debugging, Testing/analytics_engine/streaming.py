@@ -0,0 +1,265 @@
+"""
+Streaming statistics, kept current as rows are appended (or deleted), so an anomaly
+query is a single filter pass instead of list -> mean -> variance -> scan.
+
+Welford        count / mean / variance. add() and remove() are O(1) and numerically
+               stable (no sum of squares); merge() combines two accumulators (Chan et
+               al.), which is also how a whole column is folded in at load time.
+QuantileSketch a DDSketch-style log-bucket histogram: every quantile is within
+               `relative_accuracy` (1% by default) of a true sample value, in a few
+               hundred buckets whatever the row count. Gives the median and the MAD
+               (median absolute deviation) for the robust anomaly cutoff.
+
+Benchmark (run from the lesson folder):
+    python -m analytics_engine.streaming --bench
+"""
+from __future__ import annotations
+import argparse, math, statistics, time
+
+import numpy as np
+
+MAD_SCALE = 1.4826       # MAD * 1.4826 estimates the std of normally distributed data
+
+
+class Welford:
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0          # sum of squared deviations from the mean
+
+    @classmethod
+    def of(cls, values):
+        """Accumulator for a whole array (vectorised, then merged like any other)."""
+        acc = cls()
+        values = np.asarray(values, np.float64)
+        if len(values):
+            acc.n = len(values)
+            acc.mean = float(values.mean())
+            acc.m2 = float(((values - acc.mean) ** 2).sum())
+        return acc
+
+    def state(self):
+        return [self.n, self.mean, self.m2]
+
+    @classmethod
+    def from_state(cls, state):
+        acc = cls()
+        acc.n, acc.mean, acc.m2 = int(state[0]), float(state[1]), float(state[2])
+        return acc
+
+    def add(self, x):
+        x = float(x)
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        """Undo add(x) for a value that was added earlier."""
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        x = float(x)
+        old_mean = (self.n * self.mean - x) / (self.n - 1)
+        self.m2 = max(self.m2 - (x - self.mean) * (x - old_mean), 0.0)
+        self.mean = old_mean
+        self.n -= 1
+
+    def merge(self, other):
+        if not other.n:
+            return self
+        if not self.n:
+            self.n, self.mean, self.m2 = other.n, other.mean, other.m2
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        return self
+
+    @property
+    def variance(self):
+        """Population variance, as np.std / the exercises use."""
+        return self.m2 / self.n if self.n else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def __repr__(self):
+        return f"<Welford n={self.n} mean={self.mean:.6g} std={self.std:.6g}>"
+
+
+class QuantileSketch:
+    def __init__(self, relative_accuracy=0.01):
+        self.alpha = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}     # bucket key -> count; bucket k holds (gamma**(k-1), gamma**k]
+        self.negative = {}     # same, for -x
+        self.zeros = 0
+        self.count = 0
+
+    def state(self):
+        """JSON-friendly contents, for snapshots."""
+        return {"alpha": self.alpha, "zeros": self.zeros, "count": self.count,
+                "positive": [list(self.positive), list(self.positive.values())],
+                "negative": [list(self.negative), list(self.negative.values())]}
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state["alpha"])
+        sketch.zeros, sketch.count = state["zeros"], state["count"]
+        sketch.positive = dict(zip(*state["positive"]))
+        sketch.negative = dict(zip(*state["negative"]))
+        return sketch
+
+    def _key(self, x):
+        return math.ceil(math.log(x) / self._log_gamma)
+
+    def _value(self, key):
+        """Bucket representative: within alpha (relatively) of anything in the bucket."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, x, count=1):
+        x = float(x)
+        if x > 0:
+            store, key = self.positive, self._key(x)
+        elif x < 0:
+            store, key = self.negative, self._key(-x)
+        else:
+            self.zeros += count
+            self.count += count
+            return
+        left = store.get(key, 0) + count
+        if left > 0:
+            store[key] = left
+        else:
+            store.pop(key, None)
+        self.count += count
+
+    def remove(self, x):
+        self.add(x, -1)
+
+    def add_many(self, values):
+        """Vectorised add of a whole array."""
+        values = np.asarray(values, np.float64)
+        for store, part in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if len(part):
+                keys, counts = np.unique(np.ceil(np.log(part) / self._log_gamma).astype(np.int64),
+                                         return_counts=True)
+                for key, c in zip(keys.tolist(), counts.tolist()):
+                    store[key] = store.get(key, 0) + c
+        zeros = int(np.count_nonzero(values == 0))
+        self.zeros += zeros
+        self.count += len(values)
+        return self
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("can only merge sketches with the same relative accuracy")
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, c in theirs.items():
+                mine[key] = mine.get(key, 0) + c
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def _buckets(self):
+        """(value, count) in ascending value order."""
+        out = [(-self._value(k), self.negative[k]) for k in sorted(self.negative, reverse=True)]
+        if self.zeros:
+            out.append((0.0, self.zeros))
+        out.extend((self._value(k), self.positive[k]) for k in sorted(self.positive))
+        return out
+
+    @staticmethod
+    def _weighted_quantile(buckets, total, q):
+        rank = q * (total - 1)
+        seen = 0
+        for value, c in buckets:
+            seen += c
+            if seen > rank:
+                return value
+        return buckets[-1][0]
+
+    def quantile(self, q):
+        if not 0 <= q <= 1:
+            raise ValueError("q must be in [0, 1]")
+        if not self.count:
+            return math.nan
+        return self._weighted_quantile(self._buckets(), self.count, q)
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+    def mad(self):
+        """Median absolute deviation from the median, from the bucket representatives."""
+        if not self.count:
+            return math.nan
+        buckets = self._buckets()
+        m = self._weighted_quantile(buckets, self.count, 0.5)
+        deviations = sorted((abs(v - m), c) for v, c in buckets)
+        return self._weighted_quantile(deviations, self.count, 0.5)
+
+    def __len__(self):
+        return self.count
+
+
+# --------------------------- Benchmark ---------------------------
+
+def _list_anomalies(values, k):
+    """What the exercises do: list of values, mean, variance, then a scan."""
+    vals = [v for v in values]
+    mean = sum(vals) / len(vals)
+    std = math.sqrt(sum((v - mean) ** 2 for v in vals) / len(vals))
+    return [i for i, v in enumerate(vals) if v >= mean + k * std]
+
+
+def _bench(rows):
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(3.5, 0.6, rows)
+    as_list = values.tolist()
+
+    t0 = time.perf_counter()
+    slow = _list_anomalies(as_list, 2)
+    t_list = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    stats, sketch = Welford.of(values), QuantileSketch().add_many(values)
+    t_build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fast = np.flatnonzero(values >= stats.mean + 2 * stats.std)
+    t_pass = time.perf_counter() - t0
+    print(f"[bench] {rows:,} values: list+mean+var+scan {t_list * 1e3:.0f} ms   "
+          f"one filter pass {t_pass * 1e3:.1f} ms (stats built once in {t_build * 1e3:.0f} ms)   "
+          f"same={slow == fast.tolist()}")
+
+    median, mad = float(np.median(values)), float(np.median(np.abs(values - np.median(values))))
+    print(f"[bench] sketch median {sketch.median:.3f} (exact {median:.3f})   MAD {sketch.mad():.3f} (exact {mad:.3f})   "
+          f"{len(sketch.positive)} buckets")
+    n = 100_000
+    extra = rng.lognormal(3.5, 0.6, n).tolist()
+    t0 = time.perf_counter()
+    for x in extra:
+        stats.add(x)
+        sketch.add(x)
+    print(f"[bench] per appended row: Welford + sketch update {(time.perf_counter() - t0) / n * 1e6:.2f} us")
+    all_values = as_list + extra
+    print(f"[bench] after appends: mean {stats.mean:.6f} vs {statistics.fmean(all_values):.6f}, "
+          f"std {stats.std:.6f} vs {statistics.pstdev(all_values):.6f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="streaming mean/std and quantile sketch")
+    ap.add_argument("--bench", action="store_true")
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    args = ap.parse_args()
+    if not args.bench:
+        ap.error("nothing to do (try --bench)")
+    _bench(args.rows)
+
+
+if __name__ == "__main__":
+    main()
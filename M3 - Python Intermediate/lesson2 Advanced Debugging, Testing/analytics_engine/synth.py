@@ -0,0 +1,94 @@
+"""Synthetic watch logs and order logs for the benchmarks (same columns as the exercises' tests)."""
+from __future__ import annotations
+import csv
+
+import numpy as np
+
+from .columnar import ColumnarTable, Dictionary, to_days
+
+GENRES = ["sci-fi", "animation", "drama", "comedy", "horror", "documentary", "thriller", "romance"]
+MOVIE_HEADER = ["date", "view_id", "user", "title", "genre", "minutes", "rating"]
+CATEGORIES = ["beverages", "food", "dessert", "snacks", "household", "electronics", "books", "toys"]
+SALES_HEADER = ["date", "order_id", "customer", "product", "category", "quantity", "unit_price"]
+
+
+def movie_columns(rows, users=50_000, titles=20_000, start="2020-01-01", days=1500, seed=0):
+    """Random watch-log columns as arrays: (days, user_codes, title_codes, genre_codes, minutes, rating)."""
+    rng = np.random.default_rng(seed)
+    day = (to_days(start) + np.sort(rng.integers(0, days, rows))).astype(np.int32)
+    title = rng.zipf(1.3, rows) % titles          # a few blockbusters, a long tail
+    user = rng.integers(0, users, rows)
+    genre = title % len(GENRES)
+    minutes = rng.integers(5, 180, rows)
+    rating = rng.integers(2, 11, rows) / 2.0
+    return day, user.astype(np.int32), title.astype(np.int32), genre.astype(np.int32), minutes, rating
+
+
+def write_watch_log(path, rows, seed=0, **kwargs):
+    day, user, title, genre, minutes, rating = movie_columns(rows, seed=seed, **kwargs)
+    dates = {}
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(MOVIE_HEADER)
+        for i in range(rows):
+            d = int(day[i])
+            if d not in dates:
+                dates[d] = str(np.datetime64(d, "D"))
+            w.writerow((dates[d], f"v{i}", f"user{user[i]}", f"title{title[i]}", GENRES[genre[i]],
+                        int(minutes[i]), float(rating[i])))
+
+
+def movie_table(rows, schema, users=50_000, titles=20_000, seed=0, chunk=1_000_000):
+    """The same random watch log built straight into a ColumnarTable (no CSV round trip)."""
+    day, user, title, genre, minutes, rating = movie_columns(rows, users, titles, seed=seed)
+    table = ColumnarTable(schema)
+    table.dictionaries["user"] = Dictionary(f"user{i}" for i in range(users))
+    table.dictionaries["title"] = Dictionary(f"title{i}" for i in range(titles))
+    table.dictionaries["genre"] = Dictionary(GENRES)
+    for lo in range(0, rows, chunk):
+        hi = min(rows, lo + chunk)
+        table.extend({"date": day[lo:hi], "view_id": [f"v{i}" for i in range(lo, hi)], "user": user[lo:hi],
+                      "title": title[lo:hi], "genre": genre[lo:hi], "minutes": minutes[lo:hi],
+                      "rating": rating[lo:hi]})
+    return table
+
+
+def sales_columns(rows, customers=100_000, products=50_000, start="2020-01-01", days=1500, seed=0):
+    """Random order columns: (days, customer_codes, product_codes, category_codes, quantity, unit_price)."""
+    rng = np.random.default_rng(seed)
+    day = (to_days(start) + np.sort(rng.integers(0, days, rows))).astype(np.int32)
+    product = (rng.zipf(1.2, rows) % products).astype(np.int32)
+    customer = rng.integers(0, customers, rows).astype(np.int32)
+    category = (product % len(CATEGORIES)).astype(np.int32)
+    quantity = rng.integers(1, 6, rows)
+    unit_price = np.round(0.5 + (product % 200) * 0.25, 2)   # one price per product
+    return day, customer, product, category, quantity, unit_price
+
+
+def write_sales_log(path, rows, seed=0, **kwargs):
+    day, customer, product, category, quantity, price = sales_columns(rows, seed=seed, **kwargs)
+    dates = {}
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(SALES_HEADER)
+        for i in range(rows):
+            d = int(day[i])
+            if d not in dates:
+                dates[d] = str(np.datetime64(d, "D"))
+            w.writerow((dates[d], i, f"customer{customer[i]}", f"product{product[i]}", CATEGORIES[category[i]],
+                        int(quantity[i]), float(price[i])))
+
+
+def sales_table(rows, schema, customers=100_000, products=50_000, seed=0, chunk=1_000_000):
+    day, customer, product, category, quantity, price = sales_columns(rows, customers, products, seed=seed)
+    table = ColumnarTable(schema)
+    table.dictionaries["customer"] = Dictionary(f"customer{i}" for i in range(customers))
+    table.dictionaries["product"] = Dictionary(f"product{i}" for i in range(products))
+    table.dictionaries["category"] = Dictionary(CATEGORIES)
+    for lo in range(0, rows, chunk):
+        hi = min(rows, lo + chunk)
+        table.extend({"date": day[lo:hi], "order_id": [str(i) for i in range(lo, hi)],
+                      "customer": customer[lo:hi], "product": product[lo:hi], "category": category[lo:hi],
+                      "quantity": quantity[lo:hi], "unit_price": price[lo:hi],
+                      "amount": quantity[lo:hi] * price[lo:hi]})
+    return table
@@ -0,0 +1,71 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_columnar
+import os, csv, tempfile, unittest, shutil
+from datetime import date
+
+from .columnar import ColumnarTable, read_csv
+from .movies import MOVIE_SCHEMA, MovieDataset
+
+HEADER = ["date", "view_id", "user", "title", "genre", "minutes", "rating"]
+DATA = [
+    ("2024-06-01", "v1001", "amy",  "Inception",     "sci-fi",    148, 5.0),
+    ("2024-06-02", "v1002", "ben",  "Spirited Away", "animation", 125, 4.5),
+    ("2024-06-03", "v1003", "amy",  "Inception",     "sci-fi",    148, 4.0),
+    ("2024-06-10", "v1004", "cara", "Amélie",        "drama",     122, 4.0),
+]
+
+class ColumnarTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="columnar_")
+        self.csv_path = os.path.join(self.tmpdir, "watch_log.csv")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write(self, rows):
+        with open(self.csv_path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(HEADER)
+            for row in rows:
+                w.writerow(row)
+
+    def test_01_read_csv_rows(self):
+        self.write(DATA)
+        table = read_csv(self.csv_path, MOVIE_SCHEMA)
+        self.assertEqual(table.n, len(DATA))
+        first = table.row(0)
+        self.assertEqual(first["date"], date(2024, 6, 1))
+        self.assertEqual((first["user"], first["title"], first["minutes"]), ("amy", "Inception", 148))
+        self.assertEqual(table.row(3)["title"], "Amélie")
+
+    def test_02_malformed_dates_are_skipped(self):
+        # NumPy reads '' and 'NaT' as NaT (1970-01-01 as days) and '2024-01' as 2024-01-01
+        self.write([DATA[0],
+                    ("", "v2", "ben", "Up", "animation", 96, 4.0),
+                    ("NaT", "v3", "ben", "Up", "animation", 96, 4.0),
+                    ("2024-01", "v4", "ben", "Up", "animation", 96, 4.0)])
+        table = read_csv(self.csv_path, MOVIE_SCHEMA)
+        self.assertEqual(table.n, 1)
+        self.assertEqual(table.row(0)["view_id"], "v1001")
+        ds = MovieDataset(self.csv_path, cache=False)
+        self.assertEqual(ds.total_views(), 1)
+
+    def test_03_bad_number_drops_only_that_row(self):
+        self.write(DATA + [("2024-06-11", "v9", "dan", "Up", "animation", "ninety", 4.0)])
+        self.assertEqual(read_csv(self.csv_path, MOVIE_SCHEMA).n, len(DATA))
+
+    def test_04_save_and_open(self):
+        self.write(DATA)
+        table = read_csv(self.csv_path, MOVIE_SCHEMA)
+        table.delete(1)
+        path = os.path.join(self.tmpdir, "t.coltab")
+        table.save(path)
+        opened = ColumnarTable.open(path)
+        self.assertEqual(opened.n, table.n)
+        self.assertEqual(opened.deleted, {1})
+        self.assertEqual(list(opened.rows()), list(table.rows()))
+        opened.append({"date": "2024-06-12", "view_id": "v5", "user": "amy", "title": "Up", "genre": "animation",
+                       "minutes": 96, "rating": 4.0})   # the first append copies the mmapped columns
+        self.assertEqual(opened.row(opened.n - 1)["title"], "Up")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
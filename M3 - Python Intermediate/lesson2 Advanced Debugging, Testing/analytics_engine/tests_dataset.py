@@ -0,0 +1,139 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_dataset
+import os, csv, tempfile, unittest, shutil
+
+from .movies import MovieDataset
+from .sales import SalesDataset
+from .synth import write_sales_log, write_watch_log
+
+NEW_VIEWS = [
+    ("2020-01-02", "n1", "newcomer", "title3", "drama", 700, 4.5),      # back-dated, new user
+    ("2024-12-31", "n2", "user1", "brand new", "comedy", 45, 2.0),      # new title
+    ("2022-06-01", "n3", "user1", "title3", "Drama", 30, 3.5),
+]
+
+class SnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="snapshot_ds_")
+        self.csv_path = os.path.join(self.tmpdir, "views.csv")
+        write_watch_log(self.csv_path, 3000, seed=12, users=40, titles=25)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def load(self, **kwargs):
+        return MovieDataset(self.csv_path, workers=1, **kwargs)
+
+    def append(self, rows):
+        with open(self.csv_path, "a", newline="") as f:
+            csv.writer(f).writerows(rows)
+
+    def assertSameAsFresh(self, ds):
+        fresh = self.load(cache=False)
+        self.assertEqual(ds.total_views(), fresh.total_views())
+        self.assertEqual(ds.total_minutes(), fresh.total_minutes())
+        for user in ("user0", "user1", "newcomer", "nobody"):
+            self.assertEqual(ds.minutes_by_user(user), fresh.minutes_by_user(user), user)
+        for genre in ("drama", "comedy"):
+            self.assertEqual(ds.minutes_by_genre(genre), fresh.minutes_by_genre(genre))
+        self.assertEqual(ds.monthly_minutes(2020, 1), fresh.monthly_minutes(2020, 1))
+        self.assertEqual(ds.top_titles(5), fresh.top_titles(5))
+        self.assertEqual(ds.stats.n, fresh.stats.n)
+        self.assertAlmostEqual(ds.stats.mean, fresh.stats.mean, places=9)
+        self.assertAlmostEqual(ds.stats.std, fresh.stats.std, places=9)
+        self.assertEqual(ds.sketch.median, fresh.sketch.median)
+        self.assertEqual(sorted(r["view_id"] for r in ds.filter_by_date_range("2020-01-01", "2020-01-31")),
+                         sorted(r["view_id"] for r in fresh.filter_by_date_range("2020-01-01", "2020-01-31")))
+
+    def test_01_parsed_then_hit(self):
+        self.assertEqual(self.load().snapshot, "parsed")
+        self.assertTrue(os.path.exists(self.csv_path + MovieDataset.CACHE_SUFFIX))
+        ds = self.load()
+        self.assertEqual(ds.snapshot, "hit")
+        self.assertTrue(ds.loaded_from_cache)
+        self.assertSameAsFresh(ds)
+        self.assertEqual(self.load(verify=True).snapshot, "hit")
+        self.assertEqual(self.load(cache=False).snapshot, "parsed")
+
+    def test_02_touched(self):
+        self.load()
+        st = os.stat(self.csv_path)
+        os.utime(self.csv_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        ds = self.load()
+        self.assertEqual(ds.snapshot, "touched")
+        self.assertSameAsFresh(ds)
+        self.assertEqual(self.load().snapshot, "hit")             # the refreshed key was saved
+
+    def test_03_appended_rows_match_a_fresh_parse(self):
+        self.load()
+        self.append(NEW_VIEWS[:2])
+        ds = self.load()
+        self.assertEqual(ds.snapshot, "appended")
+        self.assertEqual(ds.total_views(), 3002)
+        self.assertSameAsFresh(ds)
+        self.append(NEW_VIEWS[2:])                                 # append again on top of that
+        ds = self.load()
+        self.assertEqual(ds.snapshot, "appended")
+        self.assertSameAsFresh(ds)
+        self.assertEqual(self.load().snapshot, "hit")
+
+    def test_04_same_size_change_is_reparsed(self):
+        self.load()
+        with open(self.csv_path, "r+b") as f:                      # one digit of the last rating
+            data = f.read()
+            at = len(data.rstrip()) - 1
+            f.seek(at)
+            f.write(b"1" if data[at:at + 1] != b"1" else b"2")
+        ds = self.load()
+        self.assertEqual(ds.snapshot, "parsed")
+        self.assertSameAsFresh(ds)
+
+    def test_05_old_content_ending_mid_line_is_reparsed(self):
+        with open(self.csv_path, "rb") as f:
+            data = f.read()
+        with open(self.csv_path, "wb") as f:                       # no trailing newline
+            f.write(data.rstrip())
+        self.load()
+        with open(self.csv_path, "ab") as f:                       # so the "appended" bytes finish a row
+            f.write(b"\r\n")
+        self.append(NEW_VIEWS[:1])
+        ds = self.load()
+        self.assertEqual(ds.snapshot, "parsed")
+        self.assertSameAsFresh(ds)
+
+    def test_06_corrupt_snapshot_is_reparsed(self):
+        self.load()
+        with open(self.csv_path + MovieDataset.CACHE_SUFFIX, "wb") as f:
+            f.write(b"not a snapshot")
+        ds = self.load()
+        self.assertEqual(ds.snapshot, "parsed")
+        self.assertSameAsFresh(ds)
+
+class SalesSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="snapshot_sales_")
+        self.csv_path = os.path.join(self.tmpdir, "sales.csv")
+        write_sales_log(self.csv_path, 2000, seed=3, customers=30, products=20)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_01_appended_sales_match_a_fresh_parse(self):
+        SalesDataset(self.csv_path, workers=1)
+        with open(self.csv_path, "a", newline="") as f:
+            csv.writer(f).writerows([("2020-01-05", "x1", "newcomer", "product2", "misc", 3, 2.5),
+                                     ("2023-03-03", "x2", "customer1", "new product", "misc", 10000, 9.0)])
+        ds = SalesDataset(self.csv_path, workers=1)
+        fresh = SalesDataset(self.csv_path, cache=False, workers=1)
+        self.assertEqual(ds.snapshot, "appended")
+        self.assertAlmostEqual(ds.total_revenue(), fresh.total_revenue(), places=6)
+        for label in ("newcomer", "customer1"):
+            self.assertAlmostEqual(ds.revenue_by_customer(label), fresh.revenue_by_customer(label), places=6)
+        self.assertAlmostEqual(ds.revenue_by_category("misc"), fresh.revenue_by_category("misc"), places=6)
+        self.assertAlmostEqual(ds.revenue_by_month(2020, 1), fresh.revenue_by_month(2020, 1), places=6)
+        self.assertEqual(ds.top_products(3), fresh.top_products(3))
+        self.assertIn("new product", ds.top_products(3))
+        ds.delete_transaction("x2")
+        self.assertNotIn("new product", ds.top_products(3))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,85 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_dateindex
+import unittest
+from datetime import date, timedelta
+
+import numpy as np
+
+from .columnar import DATE, INT, ColumnarTable, from_days, to_days
+from .dateindex import DateIndex
+from .movies import MOVIE_SCHEMA, MovieDataset
+from .synth import movie_table
+
+START = date(2024, 1, 1)
+
+class DateIndexTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.table = ColumnarTable([("date", DATE), ("minutes", INT)])
+        self.table.extend({"date": (to_days(START) + np.sort(rng.integers(0, 60, 500))).astype(np.int32),
+                           "minutes": rng.integers(5, 180, 500)})
+        self.index = DateIndex(self.table)
+        # appends: some in order, some back-dated, some duplicates of existing days
+        for offset, minutes in [(59, 1), (61, 2), (3, 3), (30, 4), (61, 5), (0, 6), (70, 7), (30, 8)]:
+            i = self.table.append({"date": START + timedelta(offset), "minutes": minutes})
+            self.index.on_append(i)
+
+    def brute(self, a, b):
+        days = self.table.column("date")
+        return sorted(i for i in range(self.table.n)
+                      if i not in self.table.deleted and to_days(a) <= days[i] <= to_days(b))
+
+    def test_01_unsorted_table_is_rejected(self):
+        table = ColumnarTable([("date", DATE)])
+        table.extend({"date": np.array([5, 3], np.int32)})
+        with self.assertRaises(ValueError):
+            DateIndex(table)
+
+    def test_02_ranges_match_a_scan(self):
+        self.assertEqual(self.index.sorted_n, 502)                # the first two appends kept the order
+        for a, b in [(0, 0), (0, 59), (3, 3), (10, 30), (30, 30), (55, 75), (61, 61), (80, 90), (20, 10)]:
+            lo, hi = START + timedelta(a), START + timedelta(b)
+            r = self.index.range(lo, hi)
+            self.assertEqual(sorted(r.indices().tolist()), self.brute(lo, hi), (a, b))
+            self.assertEqual(len(r), len(self.brute(lo, hi)))
+            self.assertEqual(r.sum("minutes"), sum(int(self.table.column("minutes")[i]) for i in self.brute(lo, hi)))
+
+    def test_03_iso_strings_and_deleted_rows(self):
+        self.table.delete(10)
+        self.table.delete(self.table.n - 1)                       # a tail row
+        r = self.index.range("2024-01-01", "2024-02-29")
+        self.assertEqual(sorted(r.indices().tolist()), self.brute(START, date(2024, 2, 29)))
+        self.assertFalse(r.contiguous)
+        self.assertEqual([row["minutes"] for row in r], [int(self.table.column("minutes")[i]) for i in r.indices()])
+
+    def test_04_contiguous_range_is_a_view(self):
+        lo, hi = self.index.bounds("2024-01-10", "2024-01-20")
+        r = self.index.range("2024-01-10", "2024-01-20")
+        self.assertTrue(r.contiguous)
+        self.assertTrue(np.shares_memory(r.column("minutes"), self.table.column("minutes")))
+        chunks = list(r.iter_chunks(["minutes"], size=7))
+        self.assertEqual(sum(len(c["minutes"]) for c in chunks), hi - lo)
+
+    def test_05_order_is_by_date_then_append(self):
+        order = self.index.order()
+        self.assertEqual(sorted(order.tolist()), list(range(self.table.n)))
+        days = self.table.column("date")[order]
+        self.assertTrue(np.all(days[1:] >= days[:-1]))
+        same_day = [i for i in order.tolist() if self.table.column("date")[i] == to_days(START + timedelta(30))]
+        self.assertEqual(same_day, sorted(same_day))
+
+class DatasetDateTests(unittest.TestCase):
+    def test_01_dataset_ranges_after_out_of_order_add_view(self):
+        ds = MovieDataset.from_table(movie_table(3000, MOVIE_SCHEMA, users=20, titles=10, seed=5))
+        first = from_days(int(ds.col("date")[0]))
+        ds.add_view(first + timedelta(400), "late", "u", "t", "drama", 10, 3.0)
+        ds.add_view(first + timedelta(2), "early", "u", "t", "drama", 20, 3.0)
+        a, b = first, first + timedelta(5)
+        got = sorted(r["view_id"] for r in ds.filter_by_date_range(a, b))
+        want = sorted(r["view_id"] for r in ds.rows() if a <= r["date"] <= b)
+        self.assertEqual(got, want)
+        self.assertIn("early", got)
+        total = sum(int(c["minutes"].sum()) for c in ds.iter_date_range(a, b, ["minutes"], chunk_rows=50))
+        self.assertEqual(total, sum(r["minutes"] for r in ds.rows() if a <= r["date"] <= b))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
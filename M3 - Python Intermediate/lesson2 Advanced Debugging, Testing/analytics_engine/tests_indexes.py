@@ -0,0 +1,84 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_indexes
+import unittest
+from collections import Counter, defaultdict
+from datetime import date
+
+import numpy as np
+
+from .indexes import GroupIndex, month_key, month_keys
+from .movies import MOVIE_SCHEMA, MovieDataset
+from .synth import movie_table
+
+class GroupIndexTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.keys = rng.integers(0, 40, 500)
+        self.values = rng.integers(1, 100, 500)
+
+    def brute(self, keys, values):
+        sums, counts = defaultdict(int), Counter(keys.tolist())
+        for k, v in zip(keys.tolist(), values.tolist()):
+            sums[k] += v
+        return sums, counts
+
+    def test_01_build_matches_loop(self):
+        index = GroupIndex(self.keys, self.values, dtype=np.int64)
+        sums, counts = self.brute(self.keys, self.values)
+        for k in range(45):
+            self.assertEqual(index.sum(k), sums.get(k, 0))
+            self.assertEqual(index.count(k), counts.get(k, 0))
+        self.assertEqual(index.sum(-1), 0)
+
+    def test_02_add_and_retract(self):
+        index = GroupIndex(self.keys, self.values, dtype=np.int64)
+        before = index.sums.copy()
+        index.add(3, 50)
+        self.assertEqual(index.sum(3), before[3] + 50)
+        index.add(3, -50, -1)                     # what a delete does
+        np.testing.assert_array_equal(index.sums, before)
+        index.add(1000, 7)                        # a new group far past the end
+        self.assertEqual((index.size, index.sum(1000), index.count(1000)), (1001, 7, 1))
+
+    def test_03_add_many_equals_one_build(self):
+        index = GroupIndex(self.keys[:200], self.values[:200], dtype=np.int64)
+        index.add_many(self.keys[200:], self.values[200:])
+        index.add_many(np.array([77]), np.array([5]))
+        whole = GroupIndex(np.append(self.keys, 77), np.append(self.values, 5), dtype=np.int64)
+        np.testing.assert_array_equal(index.sums, whole.sums)
+        np.testing.assert_array_equal(index.counts, whole.counts)
+
+    def test_04_top_with_and_without_tracker(self):
+        index = GroupIndex(self.keys, self.values, dtype=np.int64)
+        plain = index.top(5)
+        index.track_top(10)
+        self.assertEqual(index.top(5), plain)
+        order = sorted(range(index.size), key=lambda k: (-index.sum(k), k))
+        self.assertEqual(plain, order[:5])
+
+    def test_05_month_keys(self):
+        days = np.array([0, 31, 59, 19723], np.int32)     # 1970-01-01, 02-01, 03-01, 2024-01-01
+        self.assertEqual(month_keys(days).tolist(),
+                         [month_key(1970, 1), month_key(1970, 2), month_key(1970, 3), month_key(2024, 1)])
+
+class MovieIndexTests(unittest.TestCase):
+    def test_01_indexes_follow_add_view(self):
+        ds = MovieDataset.from_table(movie_table(2000, MOVIE_SCHEMA, users=30, titles=20, seed=3))
+        ds.add_view("2024-02-03", "x1", "user5", "title2", "Drama", 90, 4.0)
+        ds.add_view(date(2024, 2, 4), "x2", "newcomer", "brand new", "NEW-GENRE", 30, 3.0)
+        rows = list(ds.rows())
+        self.assertEqual(ds.total_minutes(), sum(r["minutes"] for r in rows))
+        for user in ("user5", "newcomer", "nobody"):
+            self.assertEqual(ds.minutes_by_user(user), sum(r["minutes"] for r in rows if r["user"] == user))
+        for genre in ("drama", "DRAMA", "new-genre"):
+            self.assertEqual(ds.minutes_by_genre(genre),
+                             sum(r["minutes"] for r in rows if r["genre"].casefold() == genre.casefold()))
+        self.assertEqual(ds.monthly_minutes(2024, 2),
+                         sum(r["minutes"] for r in rows if (r["date"].year, r["date"].month) == (2024, 2)))
+        per_title = Counter()
+        for r in rows:
+            per_title[r["title"]] += r["minutes"]
+        code = ds.table.dictionaries["title"].lookup           # ties go to the lower code
+        self.assertEqual(ds.top_titles(3), sorted(per_title, key=lambda t: (-per_title[t], code(t)))[:3])
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
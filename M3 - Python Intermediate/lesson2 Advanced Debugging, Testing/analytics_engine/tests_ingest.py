@@ -0,0 +1,70 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_ingest
+import os, csv, tempfile, unittest, shutil
+from unittest import mock
+
+from . import ingest
+from .columnar import read_csv
+from .ingest import append_csv_range, byte_ranges, read_csv_parallel
+from .movies import MOVIE_SCHEMA
+
+HEADER = ["date", "view_id", "user", "title", "genre", "minutes", "rating"]
+GOOD = [(f"2024-06-{1 + i % 28:02d}", f"v{i}", f"user{i % 7}", f"title{i % 5}", "drama", 90 + i, 4.0)
+        for i in range(60)]
+BAD = [
+    ("", "b1", "amy", "Up", "animation", 96, 4.0),
+    ("NaT", "b2", "amy", "Up", "animation", 96, 4.0),
+    ("2024-01", "b3", "amy", "Up", "animation", 96, 4.0),
+    ("2024-02-30", "b4", "amy", "Up", "animation", 96, 4.0),
+    ("2024-06-05", "b5", "amy", "Up", "animation", "n/a", 4.0),
+    ("2024-06-05", "b6", "amy", "Up"),
+]
+
+class IngestTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="ingest_")
+        self.csv_path = os.path.join(self.tmpdir, "watch_log.csv")
+        rows = list(GOOD)
+        for k, bad in enumerate(BAD):             # spread the bad rows over several byte ranges
+            rows.insert(5 + 10 * k, bad)
+        self.write(rows)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def write(self, rows, mode="w"):
+        with open(self.csv_path, mode, newline="") as f:
+            w = csv.writer(f)
+            if mode == "w":
+                w.writerow(HEADER)
+            for row in rows:
+                w.writerow(row)
+
+    def test_01_byte_ranges_cut_on_lines(self):
+        ranges = byte_ranges(self.csv_path, 7)
+        with open(self.csv_path, "rb") as f:
+            data = f.read()
+        self.assertEqual(ranges[0][0], data.index(b"\n") + 1)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (a, b), (c, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(b, c)
+            self.assertEqual(data[b - 1:b], b"\n")
+
+    def test_02_parallel_matches_serial_with_malformed_rows(self):
+        serial = read_csv(self.csv_path, MOVIE_SCHEMA)
+        with mock.patch.object(ingest, "PARALLEL_MIN_BYTES", 0):
+            parallel = read_csv_parallel(self.csv_path, MOVIE_SCHEMA, workers=2, chunk_bytes=512)
+        self.assertEqual(serial.n, len(GOOD))
+        self.assertEqual(list(parallel.rows()), list(serial.rows()))
+
+    def test_03_append_range_parses_only_the_tail(self):
+        table = read_csv(self.csv_path, MOVIE_SCHEMA)
+        start = os.path.getsize(self.csv_path)
+        # only dates NumPy would accept: an outright parse error sends the batch row-wise anyway
+        self.write([("2024-07-01", "t1", "newbie", "title1", "drama", 50, 3.0)] + BAD[:3], mode="a")
+        self.assertEqual(append_csv_range(table, self.csv_path, start), 1)
+        self.assertEqual(table.n, len(GOOD) + 1)
+        self.assertEqual(table.row(table.n - 1)["user"], "newbie")
+        self.assertEqual(list(table.rows()), list(read_csv(self.csv_path, MOVIE_SCHEMA).rows()))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
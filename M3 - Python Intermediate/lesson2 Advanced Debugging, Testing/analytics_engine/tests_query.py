@@ -0,0 +1,109 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_query
+import statistics, unittest
+from collections import defaultdict
+from datetime import date
+
+from .movies import MOVIE_SCHEMA, MovieDataset
+from .sales import SALES_SCHEMA, SalesDataset
+from .synth import movie_table, sales_table
+
+def grouped(rows, column, value=None, agg="sum"):
+    groups = defaultdict(list)
+    for r in rows:
+        groups[r[column]].append(1 if value is None else r[value])
+    how = {"sum": sum, "mean": statistics.fmean, "count": len}[agg]
+    return {label: how(values) for label, values in groups.items()}
+
+class MovieQueryTests(unittest.TestCase):
+    def setUp(self):
+        self.ds = MovieDataset.from_table(movie_table(4000, MOVIE_SCHEMA, users=25, titles=15, seed=6))
+        self.ds.add_view("2020-01-03", "back", "user2", "title1", "drama", 300, 1.0)   # out of date order
+        self.ds.add_view("2031-01-01", "late", "newcomer", "title1", "drama", 10, 2.0)
+        self.rows = list(self.ds.rows())
+
+    def test_01_index_pushdown_matches_a_scan(self):
+        q = self.ds.where(user="user2").sum("minutes")
+        self.assertIn("index pushdown", q.explain())
+        self.assertEqual(q.collect(), sum(r["minutes"] for r in self.rows if r["user"] == "user2"))
+        self.assertEqual(self.ds.where(user="user2").count().collect(),
+                         sum(r["user"] == "user2" for r in self.rows))
+        self.assertEqual(self.ds.where(user="nobody").sum("minutes").collect(), 0)
+        q = self.ds.query().group_by("title").sum("minutes")
+        self.assertIn("index pushdown", q.explain())
+        self.assertEqual(dict(q.collect()), grouped(self.rows, "title", "minutes"))
+
+    def test_02_filters_match_a_scan(self):
+        cases = [
+            ({"genre": "drama"}, lambda r: r["genre"] == "drama"),
+            ({"genre__ne": "drama"}, lambda r: r["genre"] != "drama"),
+            ({"genre": ["drama", "comedy", "no-such"]}, lambda r: r["genre"] in ("drama", "comedy")),
+            ({"genre__ne": "no-such"}, lambda r: True),
+            ({"genre": "no-such"}, lambda r: False),
+            ({"minutes__ge": 120, "rating__lt": 3.0}, lambda r: r["minutes"] >= 120 and r["rating"] < 3.0),
+            ({"user": "user2", "minutes__gt": 60}, lambda r: r["user"] == "user2" and r["minutes"] > 60),
+            ({"date__le": "2020-03-01"}, lambda r: r["date"] <= date(2020, 3, 1)),
+        ]
+        for conditions, keep in cases:
+            want = [r for r in self.rows if keep(r)]
+            q = self.ds.where(**conditions)
+            self.assertEqual(q.count().collect(), len(want), conditions)
+            self.assertEqual(q.sum("minutes").collect(), sum(r["minutes"] for r in want), conditions)
+            self.assertEqual(sorted(r["view_id"] for r in q.collect()), sorted(r["view_id"] for r in want))
+
+    def test_03_between_and_group_by(self):
+        a, b = date(2020, 1, 1), date(2020, 2, 15)
+        want = [r for r in self.rows if a <= r["date"] <= b and r["genre"] != "horror"]
+        q = self.ds.between("2020-01-01", "2020-02-15").where(genre__ne="horror")
+        self.assertIn("DateIndex bisect", q.explain())
+        self.assertEqual(sorted(r["view_id"] for r in q.collect()), sorted(r["view_id"] for r in want))
+        self.assertIn("back", [r["view_id"] for r in q.collect()])
+        for agg, value in (("sum", "minutes"), ("count", None)):
+            step = q.group_by("user")
+            got = dict((step.count() if agg == "count" else step.sum(value)).collect())
+            self.assertEqual(got, grouped(want, "user", value, agg))
+        got = dict(q.group_by("genre").mean("rating").collect())
+        for label, mean in grouped(want, "genre", "rating", "mean").items():
+            self.assertAlmostEqual(got[label], mean, places=9)
+
+    def test_04_top(self):
+        per_user = grouped(self.rows, "user", "minutes")
+        self.assertEqual(self.ds.query().group_by("user").sum("minutes").top(3).collect(),
+                         sorted(per_user.items(), key=lambda kv: -kv[1])[:3])
+        longest = self.ds.where(genre="drama").top(5, by="minutes").collect()
+        want = sorted((r["minutes"] for r in self.rows if r["genre"] == "drama"), reverse=True)[:5]
+        self.assertEqual([r["minutes"] for r in longest], want)
+
+    def test_05_bad_queries(self):
+        with self.assertRaises(KeyError):
+            self.ds.where(nope=1)
+        with self.assertRaises(ValueError):
+            self.ds.where(minutes__between=1)
+        with self.assertRaises(TypeError):
+            self.ds.where(view_id="v1")
+        with self.assertRaises(TypeError):
+            self.ds.where(genre__gt="drama")
+        with self.assertRaises(TypeError):
+            self.ds.query().group_by("minutes")
+        with self.assertRaises(ValueError):
+            self.ds.query().top(3)
+        with self.assertRaises(ValueError):
+            self.ds.query().group_by("user").collect()
+
+class SalesQueryTests(unittest.TestCase):
+    def test_01_deleted_rows_are_skipped(self):
+        ds = SalesDataset.from_table(sales_table(1500, SALES_SCHEMA, customers=20, products=12, seed=4))
+        for i in range(0, 300, 2):
+            ds.delete_transaction(ds.table.text("order_id", i))
+        ds.correct_transaction(ds.table.text("order_id", 301), quantity=50)
+        rows = list(ds.rows())
+        got = dict(ds.query().group_by("customer").sum("amount").collect())
+        for label, total in grouped(rows, "customer", "amount").items():
+            self.assertAlmostEqual(got[label], total, places=6)
+        scanned = ds.where(product="product3", quantity__ge=2)
+        self.assertIn("deleted rows", scanned.explain())
+        want = [r for r in rows if r["product"] == "product3" and r["quantity"] >= 2]
+        self.assertEqual(scanned.count().collect(), len(want))
+        self.assertAlmostEqual(scanned.sum("amount").collect(), sum(r["amount"] for r in want), places=6)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
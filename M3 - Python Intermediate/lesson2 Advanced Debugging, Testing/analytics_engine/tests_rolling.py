@@ -0,0 +1,91 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_rolling
+import math, statistics, unittest
+
+import numpy as np
+
+from .movies import MOVIE_SCHEMA, MovieDataset
+from .rolling import STATS, RollingWindow, rolling, rolling_by_days
+from .synth import movie_table
+
+NAIVE = {"sum": sum, "mean": statistics.fmean, "std": statistics.pstdev, "min": min, "max": max, "count": len}
+
+def naive_count(values, window, stat):
+    return [NAIVE[stat](values[i - window + 1:i + 1]) for i in range(window - 1, len(values))]
+
+def naive_days(days, values, window_days, stat):
+    return [NAIVE[stat]([v for d, v in zip(days, values) if day - window_days < d <= day]) for day in days]
+
+class RollingTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.values = rng.integers(0, 200, 300)
+        self.floats = rng.normal(1e6, 3.0, 300)                   # large mean, small spread
+        self.days = np.sort(rng.integers(0, 90, 300))
+
+    def test_01_count_windows_match_loops(self):
+        for window in (1, 2, 7, 50, 300):
+            for stat in STATS:
+                for values in (self.values, self.floats):
+                    got, want = rolling(values, window, stat), naive_count(values.tolist(), window, stat)
+                    np.testing.assert_allclose(got, want, rtol=1e-9, atol=1e-6, err_msg=f"{stat} w={window}")
+
+    def test_02_window_longer_than_series(self):
+        for stat in STATS:
+            self.assertEqual(len(rolling(self.values[:3], 5, stat)), 0)
+        with self.assertRaises(ValueError):
+            rolling(self.values, 0)
+        with self.assertRaises(ValueError):
+            rolling(self.values, 3, "median")
+
+    def test_03_constant_series_has_zero_std(self):
+        self.assertTrue(np.all(rolling(np.full(100, 0.1), 10, "std") == 0.0))
+
+    def test_04_day_windows_match_loops(self):
+        for window_days in (1, 3, 10, 200):
+            for stat in STATS:
+                got = rolling_by_days(self.days, self.floats, window_days, stat)
+                want = naive_days(self.days.tolist(), self.floats.tolist(), window_days, stat)
+                np.testing.assert_allclose(got, want, rtol=1e-9, atol=1e-6, err_msg=f"{stat} days={window_days}")
+        with self.assertRaises(ValueError):
+            rolling_by_days(self.days[::-1], self.values, 3)
+
+    def test_05_online_window_matches_batch(self):
+        win = RollingWindow(size=20)
+        for k, v in enumerate(self.floats.tolist()):
+            win.push(v)
+            if k >= 19:
+                tail = self.floats[k - 19:k + 1].tolist()
+                self.assertTrue(win.full)
+                self.assertAlmostEqual(win.mean, statistics.fmean(tail), places=6)
+                self.assertAlmostEqual(win.std, statistics.pstdev(tail), places=3)
+                self.assertEqual((win.min, win.max), (min(tail), max(tail)))
+
+    def test_06_online_day_window(self):
+        win = RollingWindow(days=7)
+        for d, v in zip(self.days.tolist(), self.values.tolist()):
+            win.push(v, d)
+        latest = int(self.days[-1])
+        inside = [v for d, v in zip(self.days.tolist(), self.values.tolist()) if d > latest - 7]
+        self.assertEqual((len(win), win.sum, win.min, win.max), (len(inside), sum(inside), min(inside), max(inside)))
+        win.push(1000, latest - 30)                              # late row: counted on the newest day
+        self.assertEqual((len(win), win.max), (len(inside) + 1, 1000))
+        with self.assertRaises(TypeError):
+            win.push(1)
+        self.assertTrue(math.isnan(RollingWindow(size=3).mean))
+
+class DatasetRollingTests(unittest.TestCase):
+    def test_01_dataset_rolling_and_watch(self):
+        ds = MovieDataset.from_table(movie_table(500, MOVIE_SCHEMA, users=10, titles=10, seed=2))
+        rows = sorted(ds.rows(), key=lambda r: r["date"])      # from_table sorts stably, so this is its order
+        minutes = [r["minutes"] for r in rows]
+        np.testing.assert_allclose(ds.moving_average_minutes(5), naive_count(minutes, 5, "mean"))
+        days = [r["date"].toordinal() for r in rows]
+        np.testing.assert_allclose(ds.rolling("minutes", "max", days=14), naive_days(days, minutes, 14, "max"))
+        win = ds.watch("minutes", window=4)
+        self.assertAlmostEqual(win.mean, statistics.fmean(minutes[-4:]))
+        ds.add_view(rows[-1]["date"], "w1", "u", "t", "drama", 999, 4.0)
+        self.assertEqual(win.max, 999)
+        self.assertAlmostEqual(win.mean, statistics.fmean(minutes[-3:] + [999]))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,119 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_sales
+import os, csv, tempfile, unittest, shutil
+from collections import defaultdict
+
+from .sales import SalesDataset
+
+DATA = [
+    # date, order_id, customer, product, category, quantity, unit_price
+    ("2024-03-01", "1001", "alice", "coffee",   "beverages", 2, 3.50),
+    ("2024-03-02", "1002", "bob",   "tea",      "beverages", 1, 2.50),
+    ("2024-03-03", "1003", "alice", "sandwich", "food",      1, 5.00),
+    ("2024-03-15", "1004", "carol", "coffee",   "beverages", 3, 3.50),
+    ("2024-03-20", "1005", "dan",   "salad",    "food",      1, 7.00),
+    ("2024-04-01", "1006", "alice", "coffee",   "beverages", 1, 3.50),
+    ("2024-04-05", "1007", "bob",   "sandwich", "food",      2, 5.00),
+    ("2024-04-10", "1008", "carol", "cake",     "dessert",   1, 4.00),
+    ("2024-04-20", "1009", "dan",   "coffee",   "beverages", 4, 3.50),
+    ("2024-05-01", "1010", "alice", "tea",      "beverages", 2, 2.50),
+    ("2024-05-07", "1011", "bob",   "salad",    "food",      3, 7.00),
+    ("2024-05-15", "1012", "carol", "sandwich", "food",      1, 5.00),
+]
+
+TOTAL_REVENUE = 94.5
+
+class SalesDatasetTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="sales_ds_")
+        self.csv_path = os.path.join(self.tmpdir, "sales.csv")
+        with open(self.csv_path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["date", "order_id", "customer", "product", "category", "quantity", "unit_price"])
+            for row in DATA:
+                w.writerow(row)
+        self.ds = SalesDataset(self.csv_path, cache=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def assertMatchesRows(self):
+        """Every aggregate equals a recomputation over the live rows."""
+        ds, rows = self.ds, self.ds.get_rows()
+        self.assertEqual(ds.total_orders(), len(rows))
+        self.assertAlmostEqual(ds.total_revenue(), sum(r["amount"] for r in rows), places=9)
+        for dim, method in (("customer", ds.revenue_by_customer), ("category", ds.revenue_by_category),
+                            ("product", ds.revenue_by_product)):
+            totals = defaultdict(float)
+            for r in rows:
+                totals[r[dim]] += r["amount"]
+            for label in set(totals) | {"nobody"}:
+                self.assertAlmostEqual(method(label), totals.get(label, 0.0), places=9, msg=f"{dim}={label}")
+        months = defaultdict(float)
+        for r in rows:
+            months[r["date"].year, r["date"].month] += r["amount"]
+        for (y, m), total in months.items():
+            self.assertAlmostEqual(ds.revenue_by_month(y, m), total, places=9)
+        per_product = defaultdict(float)
+        for r in rows:
+            per_product[r["product"]] += r["amount"]
+        self.assertEqual([per_product[p] for p in ds.top_products(3)],
+                         sorted(per_product.values(), reverse=True)[:3])
+
+    def test_01_loaded_totals(self):
+        self.assertEqual(self.ds.total_orders(), len(DATA))
+        self.assertAlmostEqual(self.ds.total_revenue(), TOTAL_REVENUE, places=6)
+        self.assertMatchesRows()
+
+    def test_02_add(self):
+        self.ds.add_transaction("2024-05-20", "2001", "erin", "tea", "beverages", 20, 2.50)
+        self.assertAlmostEqual(self.ds.revenue_by_customer("erin"), 50.0)
+        self.assertEqual(self.ds.top_products(1), ["tea"])
+        self.assertMatchesRows()
+
+    def test_03_delete(self):
+        delta = self.ds.delete_transaction("1009")          # dan's 4 coffees
+        self.assertEqual((delta.op, delta.order_id, delta.new_row), ("delete", "1009", -1))
+        self.assertAlmostEqual(self.ds.total_revenue(), TOTAL_REVENUE - 14.0)
+        self.assertMatchesRows()
+        with self.assertRaises(KeyError):
+            self.ds.delete_transaction("1009")
+        with self.assertRaises(KeyError):
+            self.ds.delete_transaction("no-such-order")
+
+    def test_04_correct(self):
+        delta = self.ds.correct_transaction("1011", quantity=1, product="tea", unit_price=2.5)
+        self.assertEqual(delta.op, "correct")
+        self.assertEqual(self.ds.deltas, [delta])
+        self.assertAlmostEqual(self.ds.revenue_by_product("salad"), 7.0)
+        self.assertMatchesRows()
+        self.ds.correct_transaction("1011", quantity=3)       # the replacement row can be corrected again
+        self.assertAlmostEqual(self.ds.revenue_by_product("tea"), 2.5 + 5.0 + 7.5)
+        self.assertMatchesRows()
+        with self.assertRaises(TypeError):
+            self.ds.correct_transaction("1001", amount=1.0)
+
+    def test_05_bad_correction_keeps_the_order(self):
+        for bad in ({"quantity": "abc"}, {"unit_price": "x"}, {"date": "2024-13-01"}):
+            with self.assertRaises(ValueError):
+                self.ds.correct_transaction("1004", **bad)
+        self.assertEqual(self.ds.total_orders(), len(DATA))
+        self.assertAlmostEqual(self.ds.total_revenue(), TOTAL_REVENUE)
+        self.assertEqual(self.ds.deltas, [])
+        self.assertMatchesRows()
+        self.assertEqual(self.ds.correct_transaction("1004", quantity=1).op, "correct")   # still there
+        self.assertAlmostEqual(self.ds.total_revenue(), TOTAL_REVENUE - 7.0)
+
+    def test_06_mixed_changes(self):
+        for k in range(30):
+            self.ds.add_transaction(f"2024-06-{1 + k % 28:02d}", f"n{k}", f"c{k % 4}", f"p{k % 6}", "misc",
+                                    1 + k % 3, 1.25 * (1 + k % 5))
+        for k in range(0, 30, 3):
+            self.ds.delete_transaction(f"n{k}")
+        for k in range(1, 30, 3):
+            self.ds.correct_transaction(f"n{k}", quantity=7)
+        self.ds.delete_transaction("1001")
+        self.assertMatchesRows()
+        self.assertEqual(len(self.ds.deltas), 21)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
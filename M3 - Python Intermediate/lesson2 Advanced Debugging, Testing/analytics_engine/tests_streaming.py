@@ -0,0 +1,111 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_streaming
+import math, statistics, unittest
+
+import numpy as np
+
+from .movies import MOVIE_SCHEMA, MovieDataset
+from .sales import SALES_SCHEMA, SalesDataset
+from .streaming import MAD_SCALE, QuantileSketch, Welford
+from .synth import movie_table, sales_table
+
+class WelfordTests(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(4).lognormal(3.0, 0.8, 400).tolist()
+
+    def assertStats(self, acc, values):
+        self.assertEqual(acc.n, len(values))
+        self.assertAlmostEqual(acc.mean, statistics.fmean(values), places=9)
+        self.assertAlmostEqual(acc.std, statistics.pstdev(values), places=9)
+
+    def test_01_add_matches_statistics(self):
+        acc = Welford()
+        for v in self.values:
+            acc.add(v)
+        self.assertStats(acc, self.values)
+        self.assertStats(Welford.of(self.values), self.values)
+
+    def test_02_remove_undoes_add(self):
+        acc = Welford.of(self.values)
+        for v in self.values[:150]:
+            acc.remove(v)
+        self.assertStats(acc, self.values[150:])
+        for v in self.values[150:]:
+            acc.remove(v)
+        self.assertEqual((acc.n, acc.mean, acc.variance), (0, 0.0, 0.0))
+        acc.remove(1.0)                                     # removing from empty stays empty
+        self.assertEqual(acc.n, 0)
+
+    def test_03_merge_and_state(self):
+        left, right = Welford.of(self.values[:123]), Welford.of(self.values[123:])
+        self.assertStats(left.merge(right), self.values)
+        self.assertStats(Welford().merge(Welford.of(self.values)), self.values)
+        self.assertStats(Welford.from_state(left.state()), self.values)
+
+    def test_04_large_offset_is_stable(self):
+        acc = Welford()
+        for v in (1e9 + 4, 1e9 + 7, 1e9 + 13, 1e9 + 16):
+            acc.add(v)
+        self.assertAlmostEqual(acc.variance, 22.5, places=6)
+
+class QuantileSketchTests(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(9)
+        self.values = np.concatenate((rng.lognormal(3.5, 0.6, 5000), -rng.lognormal(1, 0.5, 300), np.zeros(50)))
+
+    def test_01_quantiles_within_accuracy(self):
+        sketch = QuantileSketch(0.01).add_many(self.values)
+        for q in (0.0, 0.05, 0.25, 0.5, 0.9, 0.99, 1.0):
+            exact = float(np.quantile(self.values, q, method="lower"))
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), 0.011 * abs(exact) + 1e-12, q)
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+
+    def test_02_add_remove_and_merge(self):
+        one = QuantileSketch().add_many(self.values)
+        two = QuantileSketch()
+        for v in self.values[:2000]:
+            two.add(v)
+        two.merge(QuantileSketch().add_many(self.values[2000:]))
+        self.assertEqual((one.positive, one.negative, one.zeros, len(one)), (two.positive, two.negative, two.zeros, len(two)))
+        for v in self.values[:2000]:
+            two.remove(v)
+        rest = QuantileSketch().add_many(self.values[2000:])
+        self.assertEqual((two.positive, two.negative, len(two)), (rest.positive, rest.negative, len(rest)))
+        back = QuantileSketch.from_state(rest.state())
+        self.assertEqual(back.median, rest.median)
+        self.assertTrue(math.isnan(QuantileSketch().median))
+
+    def test_03_mad(self):
+        sketch = QuantileSketch().add_many(self.values)
+        median = np.median(self.values)
+        exact = np.median(np.abs(self.values - median))
+        self.assertLess(abs(sketch.mad() - exact), 0.05 * exact)
+
+class DatasetAnomalyTests(unittest.TestCase):
+    def test_01_stats_follow_appends(self):
+        ds = MovieDataset.from_table(movie_table(3000, MOVIE_SCHEMA, users=50, titles=30, seed=8))
+        flagged = []
+        ds.watch_anomalies(lambda i, value, cutoff: flagged.append(value))
+        ds.add_view("2024-01-01", "long", "u", "t", "drama", 5000, 4.0)
+        ds.add_view("2024-01-01", "short", "u", "t", "drama", 1, 4.0)
+        minutes = [r["minutes"] for r in ds.rows()]
+        self.assertAlmostEqual(ds.stats.mean, statistics.fmean(minutes), places=9)
+        self.assertAlmostEqual(ds.stats.std, statistics.pstdev(minutes), places=9)
+        cutoff = statistics.fmean(minutes) + ds.ANOMALY_K * statistics.pstdev(minutes)
+        self.assertEqual(sorted(r["minutes"] for r in ds.anomalies()), sorted(m for m in minutes if m >= cutoff))
+        self.assertEqual(flagged, [5000])
+        robust = ds.sketch.median + ds.ROBUST_K * MAD_SCALE * ds.sketch.mad()
+        self.assertAlmostEqual(ds.anomaly_cutoff(robust=True), robust)
+
+    def test_02_stats_follow_deletes(self):
+        ds = SalesDataset.from_table(sales_table(2000, SALES_SCHEMA, customers=40, products=30, seed=8))
+        for i in range(0, 600, 3):
+            ds.delete_transaction(ds.table.text("order_id", i))
+        amounts = [r["amount"] for r in ds.rows()]
+        self.assertEqual(ds.stats.n, len(amounts))
+        self.assertAlmostEqual(ds.stats.mean, statistics.fmean(amounts), places=9)
+        self.assertAlmostEqual(ds.stats.std, statistics.pstdev(amounts), places=9)
+        self.assertEqual(len(ds.sketch), len(amounts))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
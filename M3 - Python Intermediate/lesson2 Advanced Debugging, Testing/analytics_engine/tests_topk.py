@@ -0,0 +1,70 @@
+# Run me with (from the lesson folder): python -m analytics_engine.tests_topk
+import unittest
+
+import numpy as np
+
+from .indexes import GroupIndex
+from .topk import TopK, nlargest, top_k
+
+def brute(sums, n):
+    return sorted(range(len(sums)), key=lambda c: (-sums[c], c))[:n]
+
+class TopKFunctionTests(unittest.TestCase):
+    def test_01_top_k_matches_a_sort(self):
+        rng = np.random.default_rng(5)
+        for values in (rng.integers(0, 20, 300), rng.random(300), np.zeros(10)):   # many ties, none, all
+            for n in (1, 3, 10, 299, 300, 1000):
+                self.assertEqual(top_k(values, n), brute(values.tolist(), n), n)
+        self.assertEqual(top_k([5, 9, 7], 2, codes=[10, 20, 30]), [20, 30])
+        self.assertEqual(top_k([5, 9, 7], 0), [])
+        self.assertEqual(top_k([], 3), [])
+
+    def test_02_nlargest_keeps_insertion_order_on_ties(self):
+        totals = {"b": 3.0, "a": 5.0, "c": 3.0, "d": 1.0, "e": 5.0}
+        self.assertEqual(nlargest(totals, 3), [("a", 5.0), ("e", 5.0), ("b", 3.0)])
+        self.assertEqual(nlargest(totals, 10), sorted(totals.items(), key=lambda kv: -kv[1]))
+
+class TrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.rng = rng = np.random.default_rng(3)
+        self.index = GroupIndex(rng.integers(0, 50, 1000), rng.integers(1, 20, 1000), dtype=np.int64)
+        self.tracker = self.index.track_top(5)
+
+    def test_01_follows_adds_and_retracts(self):
+        for step in range(2000):
+            key = int(self.rng.integers(0, 50))
+            value = int(self.rng.integers(1, 40))
+            self.index.add(key, value if step % 3 else -value, 1 if step % 3 else -1)
+            if step % 50 == 0:
+                self.assertEqual(self.index.top(5), brute(self.index.sums.tolist(), 5), step)
+        self.assertEqual(self.index.top(3), brute(self.index.sums.tolist(), 3))
+
+    def test_02_increases_do_not_rebuild(self):
+        self.tracker.top()
+        rebuilds = self.tracker.rebuilds
+        for _ in range(500):
+            self.index.add(int(self.rng.integers(0, 50)), 7)
+            self.tracker.top()
+        self.assertEqual(self.tracker.rebuilds, rebuilds)
+        self.assertEqual(self.tracker.top(), brute(self.index.sums.tolist(), 5))
+
+    def test_03_new_groups_and_batches_invalidate(self):
+        self.index.add(80, 10**6)                            # grows the index
+        self.assertEqual(self.index.top(1), [80])
+        self.index.add_many(np.array([81, 81]), np.array([10**6, 10**6]))
+        self.assertEqual(self.index.top(2), [81, 80])
+        self.assertEqual(self.index.top(20), brute(self.index.sums.tolist(), 20))   # past k: no tracker
+
+    def test_04_fewer_groups_than_k(self):
+        index = GroupIndex(np.array([0, 1]), np.array([4, 6]), dtype=np.int64)
+        tracker = index.track_top(5)
+        self.assertEqual(tracker.top(), [1, 0])
+        index.add(2, 5)
+        self.assertEqual(tracker.top(), [1, 2, 0])
+        index.add(1, -6, -1)
+        self.assertEqual(tracker.top(), [2, 0, 1])
+        with self.assertRaises(ValueError):
+            TopK(index, 0)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,144 @@
+"""
+Top-k without sorting everything.
+
+top_k(values, n)        codes of the n largest values: argpartition (O(m)) and a sort of
+                        just the n winners (O(n log n)). Ties go to the lower code.
+nlargest(totals, n)     the same for a plain {label: total} dict, through heapq.nlargest.
+TopK(index, k)          the top k groups of a GroupIndex, kept current as rows are folded
+                        in: an increase only has to beat the smallest member (O(k) for the
+                        rare swap, O(1) otherwise); a member that decreases marks the set
+                        stale, and the next read recomputes it with top_k.
+
+Benchmark (run from the lesson folder):
+    python -m analytics_engine.topk --bench --groups 2000000
+"""
+from __future__ import annotations
+import argparse, heapq, time
+
+import numpy as np
+
+
+def top_k(values, n, codes=None):
+    """Positions (or `codes`, when given) of the n largest values, largest first."""
+    values = np.asarray(values)
+    n = min(n, len(values))
+    if n <= 0:
+        return []
+    if n < len(values):
+        # argpartition picks arbitrarily among values tied with the n-th; take all of them
+        part = np.argpartition(-values, n - 1)[:n]
+        part = np.flatnonzero(values >= values[part].min())
+    else:
+        part = np.arange(len(values))
+    # lexsort keeps ties in position order so results are deterministic
+    ranked = part[np.lexsort((part, -values[part]))][:n]
+    return (ranked if codes is None else np.asarray(codes)[ranked]).tolist()
+
+
+def nlargest(totals, n):
+    """[(label, total)] for the n largest totals of a dict, largest first (ties: first inserted)."""
+    order = {label: i for i, label in enumerate(totals)}
+    return heapq.nlargest(n, totals.items(), key=lambda kv: (kv[1], -order[kv[0]]))
+
+
+class TopK:
+    def __init__(self, index, k):
+        if k <= 0:
+            raise ValueError("k must be positive")
+        self.index, self.k = index, k
+        self.rebuilds = 0
+        self._rebuild()
+
+    def _rank(self, code):
+        """Larger is better: higher sum, then lower code."""
+        return self.index._sums[code], -code
+
+    def _rebuild(self):
+        self._members = set(top_k(self.index.sums, self.k))
+        self._ranked = None
+        self._floor = min(self._members, key=self._rank) if self._members else None
+        self._stale = False
+        self.rebuilds += 1
+
+    def invalidate(self):
+        """Recompute on the next read (GroupIndex calls this when new groups appear)."""
+        self._stale = True
+
+    def changed(self, code, delta):
+        """GroupIndex.add calls this after folding `delta` into group `code`."""
+        if self._stale:
+            return
+        if len(self._members) < self.k:      # fewer groups than k: every group is in, new ones too
+            self._stale = True
+        elif code in self._members:
+            if delta < 0:
+                self._stale = True           # a member fell; an outsider may now beat it
+            else:
+                self._ranked = None
+                if code == self._floor:
+                    self._floor = min(self._members, key=self._rank)
+        elif delta > 0 and self._rank(code) > self._rank(self._floor):
+            self._members.discard(self._floor)
+            self._members.add(code)
+            self._floor = min(self._members, key=self._rank)
+            self._ranked = None
+
+    def top(self, n=None):
+        """Codes of the top min(n, k) groups, largest first."""
+        if self._stale:
+            self._rebuild()
+        if self._ranked is None:
+            self._ranked = sorted(self._members, key=lambda c: (-self.index._sums[c], c))
+        return self._ranked if n is None else self._ranked[:n]
+
+
+# --------------------------- Benchmark ---------------------------
+
+def _timed(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - t0) / repeat, result
+
+
+def _bench(groups, n):
+    from .indexes import GroupIndex
+    rng = np.random.default_rng(0)
+    keys = rng.zipf(1.2, groups * 4) % groups
+    index = GroupIndex(keys, rng.random(len(keys)) * 10, groups)
+    totals = dict(enumerate(index.sums.tolist()))
+    print(f"[bench] {groups:,} groups, top {n}")
+
+    t_sort, a = _timed(lambda: [c for c, _ in sorted(totals.items(), key=lambda kv: (-kv[1], kv[0]))[:n]], 1)
+    t_heap, b = _timed(lambda: [c for c, _ in nlargest(totals, n)], 1)
+    t_part, c = _timed(lambda: top_k(index.sums, n), 5)
+    tracker = index.track_top(n)
+    t_kept, d = _timed(lambda: index.top(n), 10_000)
+    print(f"[bench] sorted(dict)        {t_sort * 1e3:9.1f} ms")
+    print(f"[bench] heapq.nlargest      {t_heap * 1e3:9.1f} ms")
+    print(f"[bench] argpartition        {t_part * 1e3:9.1f} ms")
+    print(f"[bench] maintained TopK     {t_kept * 1e6:9.2f} us   same={a == b == c == d}")
+
+    adds = rng.integers(0, groups, 100_000).tolist()
+    t0 = time.perf_counter()
+    for key in adds:
+        index.add(key, 5.0)
+    t_add = (time.perf_counter() - t0) / len(adds)
+    t_after, top = _timed(lambda: index.top(n), 1000)
+    print(f"[bench] add() with the tracker: {t_add * 1e6:.2f} us; top after 100k appends {t_after * 1e6:.2f} us, "
+          f"same={top == top_k(index.sums, n)}, {tracker.rebuilds} rebuild(s)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="top-k selection vs. full sorts")
+    ap.add_argument("--bench", action="store_true")
+    ap.add_argument("--groups", type=int, default=2_000_000)
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+    if not args.bench:
+        ap.error("nothing to do (try --bench)")
+    _bench(args.groups, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Game state for the LAN guessing game (demo_guess_game in networking_in_python_lesson.py).
+
+Two stores with the same interface:
+- MemoryGuessStore: one process. Writers take a lock; readers take NO lock — they grab
+  the current immutable Snapshot (a single attribute read) and render from it.
+- SQLiteGuessStore: several worker processes (gunicorn -w N) share one SQLite file.
+  Each process caches a Snapshot and rebuilds it only when the version counter moved.
+
+Ranking: the distance |guess - target| is 0..99, so guesses live in 100 buckets indexed
+by distance. A guess is O(1) to add or move, and the ranking is read bucket by bucket
+in order — it never needs a sort. Players at the same distance are listed in the order
+of their latest guess, so changing your guess (even to the same number) puts you behind
+everyone already at that distance. The original single-dict demo kept first-guess order.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+MAX_DELTA = 100  # guesses are 1..100
+
+
+class Snapshot(NamedTuple):
+    version: int
+    target: int
+    revealed: bool
+    count: int
+    ranking: Tuple[Tuple[str, int, int], ...]  # (name, guess, delta), closest first; only once revealed
+
+
+class MemoryGuessStore:
+    def __init__(self, new_target: Callable[[], int]) -> None:
+        self._new_target = new_target
+        self._lock = threading.Lock()
+        self._reset_locked(version=0)
+
+    def _reset_locked(self, version: int) -> None:
+        self._target = self._new_target()
+        self._revealed = False
+        self._buckets: List[Dict[str, int]] = [{} for _ in range(MAX_DELTA)]
+        self._delta_of: Dict[str, int] = {}
+        self._publish(version)
+
+    def _publish(self, version: int) -> None:
+        ranking: Tuple[Tuple[str, int, int], ...] = ()
+        if self._revealed:
+            ranking = tuple((name, g, d) for d, bucket in enumerate(self._buckets) for name, g in bucket.items())
+        # one reference assignment: readers see either the old or the new snapshot, never a mix
+        self._snapshot = Snapshot(version, self._target, self._revealed, len(self._delta_of), ranking)
+
+    def snapshot(self) -> Snapshot:
+        return self._snapshot
+
+    def guess(self, name: str, value: int) -> None:
+        with self._lock:
+            old = self._delta_of.pop(name, None)
+            if old is not None:
+                del self._buckets[old][name]
+            d = abs(value - self._target)
+            self._buckets[d][name] = value
+            self._delta_of[name] = d
+            self._publish(self._snapshot.version + 1)
+
+    def reveal(self) -> None:
+        with self._lock:
+            self._revealed = True
+            self._publish(self._snapshot.version + 1)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset_locked(self._snapshot.version + 1)
+
+
+class SQLiteGuessStore:
+    """Shared by every worker process; one connection per thread, WAL mode for concurrent readers."""
+
+    def __init__(self, path: str, new_target: Callable[[], int]) -> None:
+        self.path = path
+        self._new_target = new_target
+        self._local = threading.local()
+        self._cached: Optional[Snapshot] = None
+        db = sqlite3.connect(path)  # schema only; worker connections are opened lazily
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 1),
+                    target INTEGER NOT NULL, revealed INTEGER NOT NULL, version INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS guesses (name TEXT PRIMARY KEY, guess INTEGER NOT NULL,
+                    delta INTEGER NOT NULL, seq INTEGER NOT NULL);
+                CREATE INDEX IF NOT EXISTS guesses_by_delta ON guesses (delta, seq);
+            """)
+            db.execute("INSERT OR IGNORE INTO meta VALUES (1, ?, 0, 0)", (new_target(),))
+            db.commit()
+        finally:
+            db.close()
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():  # never reuse a connection across fork()
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db, self._local.pid = db, os.getpid()
+        return db
+
+    def _write(self, *statements: Tuple[str, tuple]) -> None:
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in statements:
+                db.execute(sql, params)
+            db.execute("UPDATE meta SET version = version + 1 WHERE id = 1")
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def snapshot(self) -> Snapshot:
+        db = self._db()
+        version, target, revealed = db.execute("SELECT version, target, revealed FROM meta WHERE id = 1").fetchone()
+        cached = self._cached
+        if cached is not None and cached.version == version:
+            return cached
+        count = db.execute("SELECT COUNT(*) FROM guesses").fetchone()[0]
+        ranking: Tuple[Tuple[str, int, int], ...] = ()
+        if revealed:
+            ranking = tuple(db.execute("SELECT name, guess, delta FROM guesses ORDER BY delta, seq"))
+        snap = Snapshot(version, target, bool(revealed), count, ranking)
+        self._cached = snap
+        return snap
+
+    def guess(self, name: str, value: int) -> None:
+        self._write((
+            "INSERT OR REPLACE INTO guesses VALUES (?, ?, ABS(? - (SELECT target FROM meta WHERE id = 1)),"
+            " (SELECT version FROM meta WHERE id = 1))", (name, value, value)))
+
+    def reveal(self) -> None:
+        self._write(("UPDATE meta SET revealed = 1 WHERE id = 1", ()))
+
+    def reset(self) -> None:
+        self._write(("DELETE FROM guesses", ()),
+                    ("UPDATE meta SET target = ?, revealed = 0 WHERE id = 1", (self._new_target(),)))
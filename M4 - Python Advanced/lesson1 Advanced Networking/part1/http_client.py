@@ -0,0 +1,328 @@
+"""
+Small HTTP/1.1 client — the grown-up version of demo_http_by_hand.
+
+What it adds over "open socket, send GET, read until close":
+- Keep-alive: finished connections go back into a per-host pool and are reused, so
+  1,000 requests to one server cost a handful of TCP handshakes instead of 1,000.
+- Framing: bodies are delimited by Content-Length or chunked Transfer-Encoding
+  (or, for old servers, by the connection closing), parsed as bytes arrive.
+- Streaming: the body is handed to a file or callback in fixed-size pieces, so a
+  1 GB download never sits in memory.
+
+    pool = HTTPConnectionPool()
+    r = pool.get("http://example.com/")              # r.status, r.headers, r.body
+    with open("big.bin", "wb") as f:
+        pool.get("http://example.com/big.bin", sink=f)
+
+Benchmark (1,000 requests to a local test server, one-shot vs. pooled):
+    python http_client.py --requests 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import socket
+import ssl
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+CHUNK = 64 * 1024      # body bytes handed to the sink at a time
+MAX_LINE = 64 * 1024   # longest status/header/chunk-size line we accept
+
+IDEMPOTENT = {"GET", "HEAD", "PUT", "DELETE"}   # safe to resend after a dropped connection
+
+Sink = Union[Callable[[bytes], object], BinaryIO, None]
+
+
+class HTTPError(Exception):
+    """Malformed response or connection dropped mid-response."""
+
+
+@dataclass
+class HTTPResponse:
+    status: int
+    reason: str
+    headers: Dict[str, str]               # lower-cased names
+    body: Optional[bytes] = None          # None when streamed to a sink
+    body_length: int = 0
+    reused_connection: bool = field(default=False, repr=False)
+
+
+class _Connection:
+    def __init__(self, host: str, port: int, use_tls: bool, timeout: float) -> None:
+        sock = socket.create_connection((host, port), timeout=timeout)
+        if use_tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self.rfile = sock.makefile("rb", buffering=CHUNK)   # buffered reads: few recv() calls
+        self.requests = 0
+
+    def close(self) -> None:
+        self.rfile.close()
+        self.sock.close()
+
+    def readline(self) -> bytes:
+        line = self.rfile.readline(MAX_LINE + 1)
+        if len(line) > MAX_LINE:
+            raise HTTPError("header line too long")
+        return line
+
+    def read_into_sink(self, n: int, write: Callable[[bytes], object]) -> None:
+        while n > 0:
+            piece = self.rfile.read(min(CHUNK, n))
+            if not piece:
+                raise HTTPError("connection closed in the middle of the body")
+            write(piece)
+            n -= len(piece)
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of keep-alive connections, at most `max_idle_per_host` kept per host."""
+
+    def __init__(self, max_idle_per_host: int = 8, timeout: float = 10.0,
+                 user_agent: str = "python-academy-http/1.0") -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._idle: Dict[Tuple[str, int, bool], List[_Connection]] = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    # ---- pool bookkeeping ----
+
+    def _acquire(self, key: Tuple[str, int, bool]) -> Tuple[_Connection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.connections_opened += 1
+        return _Connection(*key, timeout=self.timeout), False
+
+    def _release(self, key: Tuple[str, int, bool], conn: _Connection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for c in conns:
+            c.close()
+
+    def __enter__(self) -> "HTTPConnectionPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- requests ----
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, sink: Sink = None) -> HTTPResponse:
+        return self.request("GET", url, headers=headers, sink=sink)
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                body: bytes = b"", sink: Sink = None) -> HTTPResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme in {url!r}")
+        use_tls = parts.scheme == "https"
+        host = parts.hostname or ""
+        port = parts.port or (443 if use_tls else 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        host_header = host if parts.port is None else f"{host}:{port}"
+        head = [f"{method} {target} HTTP/1.1", f"Host: {host_header}", f"User-Agent: {self.user_agent}"]
+        for k, v in (headers or {}).items():
+            head.append(f"{k}: {v}")
+        if body or method in ("POST", "PUT", "PATCH"):
+            head.append(f"Content-Length: {len(body)}")
+        raw = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        key = (host, port, use_tls)
+        conn, reused = self._acquire(key)
+        try:
+            try:
+                conn.sock.sendall(raw)
+                status_line = conn.readline()
+                if not status_line:
+                    raise ConnectionResetError("idle connection was closed by the server")
+            except ConnectionError:
+                # the server dropped an idle keep-alive connection before answering: retry once on
+                # a fresh one, but only if sending the request twice is harmless (never on a timeout,
+                # where a slow server may still be processing it)
+                if not reused or method not in IDEMPOTENT:
+                    raise
+                conn.close()
+                conn, reused = _Connection(*key, timeout=self.timeout), False
+                with self._lock:
+                    self.connections_opened += 1
+                conn.sock.sendall(raw)
+                status_line = conn.readline()
+            resp, keep_alive = self._read_response(conn, status_line, method, sink)
+        except BaseException:
+            conn.close()
+            raise
+        resp.reused_connection = reused
+        conn.requests += 1
+        if keep_alive:
+            self._release(key, conn)
+        else:
+            conn.close()
+        return resp
+
+    def _read_response(self, conn: _Connection, status_line: bytes, method: str,
+                       sink: Sink) -> Tuple[HTTPResponse, bool]:
+        try:
+            version, status, *reason = status_line.decode("latin-1").split(None, 2)
+            code = int(status)
+        except ValueError:
+            raise HTTPError(f"bad status line {status_line!r}") from None
+        headers: Dict[str, str] = {}
+        while True:
+            line = conn.readline()
+            if line in (b"\r\n", b"\n"):
+                break
+            if not line:
+                raise HTTPError("connection closed inside the headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+        pieces: List[bytes] = []
+        if sink is None:
+            write = pieces.append
+        elif callable(sink):
+            write = sink
+        else:
+            write = sink.write
+        length = 0
+
+        def counted(piece: bytes) -> None:
+            nonlocal length
+            length += len(piece)
+            write(piece)
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = version == "HTTP/1.1" and "close" not in connection
+        if method == "HEAD" or code in (204, 304) or 100 <= code < 200:
+            pass  # no body
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = conn.readline()
+                try:
+                    size = int(size_line.split(b";", 1)[0], 16)
+                except ValueError:
+                    raise HTTPError(f"bad chunk size line {size_line!r}") from None
+                if size == 0:
+                    while conn.readline() not in (b"\r\n", b"\n", b""):
+                        pass  # skip trailers
+                    break
+                conn.read_into_sink(size, counted)
+                conn.readline()  # CRLF after each chunk
+        elif "content-length" in headers:
+            try:
+                size = int(headers["content-length"])
+            except ValueError:
+                raise HTTPError(f"bad Content-Length {headers['content-length']!r}") from None
+            if size < 0:
+                raise HTTPError(f"bad Content-Length {size}")
+            conn.read_into_sink(size, counted)
+        else:
+            # no framing: the body ends when the server closes the connection
+            keep_alive = False
+            while True:
+                piece = conn.rfile.read1(CHUNK)
+                if not piece:
+                    break
+                counted(piece)
+
+        body = b"".join(pieces) if sink is None else None
+        return HTTPResponse(code, reason[0].strip() if reason else "", headers, body, length), keep_alive
+
+
+def fetch_once(url: str, timeout: float = 10.0) -> bytes:
+    """The one-shot style of demo_http_by_hand (new connection, Connection: close) for comparison."""
+    parts = urlsplit(url)
+    host, port = parts.hostname or "", parts.port or 80
+    request = f"GET {parts.path or '/'} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n"
+    with socket.create_connection((host, port), timeout=timeout) as s:
+        s.sendall(request.encode())
+        chunks = []
+        while True:
+            chunk = s.recv(CHUNK)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+
+# ---------- Benchmark against a local test server ----------
+
+def _start_test_server() -> Tuple[object, int]:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive by default
+        disable_nagle_algorithm = True  # small header+body writes must not wait for delayed ACKs
+
+        def do_GET(self) -> None:
+            n = int(self.path.rsplit("/", 1)[-1] or 0)
+            body = (f"item {n} " * 50).encode()
+            self.send_response(200)
+            if n % 2:
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i in range(0, len(body), 100):
+                    part = body[i:i + 100]
+                    self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+            else:
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="one-shot vs. keep-alive pooled HTTP fetches")
+    ap.add_argument("--requests", type=int, default=1000)
+    args = ap.parse_args()
+    server, port = _start_test_server()
+    urls = [f"http://127.0.0.1:{port}/item/{i}" for i in range(args.requests)]
+    expected = [(f"item {i} " * 50).encode() for i in range(args.requests)]
+
+    t0 = time.perf_counter()
+    for url in urls:
+        fetch_once(url)
+    one_shot = time.perf_counter() - t0
+
+    with HTTPConnectionPool() as pool:
+        t0 = time.perf_counter()
+        for url, want in zip(urls, expected):
+            assert pool.get(url).body == want
+        pooled = time.perf_counter() - t0
+        opened = pool.connections_opened
+
+    print(f"one-shot : {args.requests / one_shot:8.0f} req/s  ({args.requests} connections)")
+    print(f"pooled   : {args.requests / pooled:8.0f} req/s  ({opened} connection(s), "
+          f"half the responses chunked)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,15 +11,27 @@ python networking_in_python_lesson.py --demo echo_client --host 127.0.0.1 --port
 python networking_in_python_lesson.py --demo udp_time_server --port 5001
 python networking_in_python_lesson.py --demo udp_time_client --host 127.0.0.1 --port 5001
 
-python networking_in_python_lesson.py --demo rpc_server --port 6000
+python networking_in_python_lesson.py --demo echo_server_threads --port 5000 --rate 5 --max-conns 3
+python networking_in_python_lesson.py --demo echo_server_selectors --port 5000 --rate 5
+
+python networking_in_python_lesson.py --demo rpc_server --port 6000 --rate 20 --max-conns 4
 # use netcat or any language as a client, send one JSON line:
 # {"op":"add","args":[2,3]}
 
+# Multi-process mode (Linux/macOS): N worker processes share the port via SO_REUSEPORT
+python networking_in_python_lesson.py --demo rpc_server --port 6000 --workers 4
+python networking_in_python_lesson.py --demo rpc_bench --workers 4   # throughput vs. worker count
+
 python networking_in_python_lesson.py --demo http_by_hand --host example.com --port 80 --path /
+python networking_in_python_lesson.py --demo http_get --host example.com --port 80 --path / --out page.html
+python http_client.py --requests 1000   # keep-alive pool vs. one connection per request
 
 # Flask browser game (LAN number guessing)
 # (First time) pip install flask
 python networking_in_python_lesson.py --demo guess_game --port 8080
+# Whole-school mode: precompiled page, snapshot reads, real WSGI server (pip install gunicorn)
+python networking_in_python_lesson.py --demo guess_game --port 8080 --production --workers 4
+python networking_in_python_lesson.py --demo guess_load --host 127.0.0.1 --port 8080 --players 1000
 
 # Then, on other devices on the same Wi‑Fi/LAN: http://<your-LAN-IP>:8080/
 
@@ -75,13 +87,19 @@ STRUCTURE OF THIS FILE
 from __future__ import annotations   # Type hints (lets us use forward references; faster imports)
 
 import argparse                      # Parse command-line flags like --demo, --port
+import asyncio                       # Event-loop servers used by the multi-process (--workers) mode
+import contextlib                    # suppress() for tidy connection teardown
 import json                          # Encode/decode JSON messages (e.g., our tiny RPC protocol)
+import multiprocessing               # Spawn worker processes for the SO_REUSEPORT server mode
+import os                            # File paths for the guessing game's shared state
+import selectors                     # Single-threaded multiplexing (echo_server_selectors)
+import signal                        # Graceful shutdown of worker processes (SIGTERM)
 import socket                        # Low-level networking: TCP/UDP sockets, bind/listen/accept/connect/recv/send
 import sys                           # Access argv/exit and other interpreter/runtime details
 import threading                     # Handle multiple clients concurrently with threads
 import time                          # Timestamps, sleep, simple timing in demos (e.g., UDP time server)
 from dataclasses import dataclass    # Lightweight class boilerplate for CLI args container
-from typing import Callable, Dict, Tuple  # Static typing: function signatures and data structures
+from typing import Awaitable, Callable, Dict, List, Tuple  # Static typing: function signatures and data structures
 
 
 # ---------- Utility helpers ----------
@@ -157,7 +175,15 @@ def demo_echo_client(host: str, port: int, message: str) -> None:
 
 # ---------- DEMO 2: Concurrent Echo Server (Thread per client) ----------
 
-def demo_echo_server_threads(host: str, port: int) -> None:
+def client_limits(rate: float = 0.0, max_conns: int = 0):
+    """(message limiter, connection limiter) from rate_limit.py; None where the option is 0 (off)."""
+    from rate_limit import ConnectionLimiter, TokenBucketLimiter
+    limiter = TokenBucketLimiter(rate=rate, burst=max(1.0, 2 * rate)) if rate > 0 else None
+    conns = ConnectionLimiter(per_key=max_conns) if max_conns > 0 else None
+    return limiter, conns
+
+
+def demo_echo_server_threads(host: str, port: int, rate: float = 0.0, max_conns: int = 0) -> None:
     """
     Serve multiple clients concurrently by using a thread per connection.
 
@@ -165,22 +191,34 @@ def demo_echo_server_threads(host: str, port: int) -> None:
     - Each client gets its own thread running 'handle_client'.
     - Pros: easy to reason about; Cons: many threads can exhaust resources.
     - Alternative: asyncio/selectors for scalable concurrency.
+    - --rate / --max-conns protect the server from one greedy client (see rate_limit.py).
 
     TODOs:
     - Log the current number of connected clients.
-    - Add per‑client message counters or rate limits.
+    - Add per‑client message counters.
     """
+    limiter, conns = client_limits(rate, max_conns)
+
     def handle_client(conn: socket.socket, addr: Tuple[str, int]) -> None:
         print(f"[threads] Connected by {addr}")
-        with conn:
-            while True:
-                data = conn.recv(1024)
-                if not data:
-                    print(f"[threads] {addr} disconnected")
-                    break
-                msg = data.decode(errors="replace")
-                resp = f"[you said] {msg}".encode()
-                conn.sendall(resp)
+        try:
+            with conn:
+                while True:
+                    data = conn.recv(1024)
+                    if not data:
+                        print(f"[threads] {addr} disconnected")
+                        break
+                    if limiter is not None and not limiter.allow(addr[0]):
+                        conn.sendall(b"rate limit exceeded\n")
+                        continue
+                    msg = data.decode(errors="replace")
+                    resp = f"[you said] {msg}".encode()
+                    conn.sendall(resp)
+        except ConnectionError:
+            print(f"[threads] {addr} reset the connection")
+        finally:
+            if conns is not None:
+                conns.release(addr[0])
 
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -189,10 +227,87 @@ def demo_echo_server_threads(host: str, port: int) -> None:
         print(f"[threads] Listening on {host}:{port} (LAN hint: {get_lan_ip_guess()}:{port})")
         while True:
             conn, addr = s.accept()
+            if conns is not None and not conns.acquire(addr[0]):
+                with conn:
+                    conn.sendall(b"too many connections\n")
+                continue
             t = threading.Thread(target=handle_client, args=(conn, addr), daemon=True)
             t.start()
 
 
+def demo_echo_server_selectors(host: str, port: int, rate: float = 0.0, max_conns: int = 0) -> None:
+    """
+    Same echo service, ONE thread, many clients: the selectors module tells us which
+    sockets are ready, so we never block on a quiet client.
+
+    THEORY:
+    - register(sock, EVENT_READ) -> select() returns only sockets with data (or new clients).
+    - Every socket is non-blocking; a handler must never wait.
+    """
+    limiter, conns = client_limits(rate, max_conns)
+    sel = selectors.DefaultSelector()
+    max_pending = 64 * 1024   # stop reading from a client that does not read its echoes
+
+    class Client:
+        def __init__(self, addr: Tuple[str, int]) -> None:
+            self.addr = addr
+            self.out = bytearray()   # echoed bytes the socket would not take yet
+            self.events = selectors.EVENT_READ
+
+    def accept(server: socket.socket) -> None:
+        conn, addr = server.accept()
+        if conns is not None and not conns.acquire(addr[0]):
+            conn.close()
+            return
+        conn.setblocking(False)
+        sel.register(conn, selectors.EVENT_READ, data=Client(addr))
+
+    def drop(conn: socket.socket, client: "Client") -> None:
+        sel.unregister(conn)
+        conn.close()
+        if conns is not None:
+            conns.release(client.addr[0])
+
+    def serve(conn: socket.socket, client: "Client", mask: int) -> None:
+        try:
+            if mask & selectors.EVENT_READ:
+                data = conn.recv(1024)
+                if not data:
+                    drop(conn, client)
+                    return
+                ok = limiter is None or limiter.allow(client.addr[0])
+                client.out += data if ok else b"rate limit exceeded\n"
+            if client.out:
+                sent = conn.send(client.out)   # may take only part of it
+                del client.out[:sent]
+        except BlockingIOError:
+            pass
+        except ConnectionError:
+            drop(conn, client)
+            return
+        # wait for writability while echoes are pending; stop reading while too many are
+        events = 0 if len(client.out) >= max_pending else selectors.EVENT_READ
+        if client.out:
+            events |= selectors.EVENT_WRITE
+        if events != client.events:
+            client.events = events
+            sel.modify(conn, events, data=client)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind((host, port))
+        s.listen()
+        s.setblocking(False)
+        sel.register(s, selectors.EVENT_READ, data=None)
+        print(f"[selectors] Listening on {host}:{port} (LAN hint: {get_lan_ip_guess()}:{port})")
+        while True:
+            for key, mask in sel.select():
+                if key.data is None:
+                    accept(key.fileobj)
+                else:
+                    serve(key.fileobj, key.data, mask)
+
+
 # ---------- DEMO 3: Tiny JSON-RPC-ish Server (call Python functions) ----------
 
 def add(a: float, b: float) -> float:
@@ -201,13 +316,44 @@ def add(a: float, b: float) -> float:
 def mul(a: float, b: float) -> float:
     return a * b
 
+def count_primes(n: int) -> int:
+    """Count primes below n by trial division. Deliberately CPU-bound (used by rpc_bench)."""
+    n = int(n)
+    if not (0 <= n <= 1_000_000):
+        raise ValueError("n must be in 0..1000000")
+    count = 0
+    for k in range(2, n):
+        d = 2
+        while d * d <= k:
+            if k % d == 0:
+                break
+            d += 1
+        else:
+            count += 1
+    return count
+
 FUNCTIONS: Dict[str, Callable[..., float]] = {
     "add": add,
     "mul": mul,
+    "count_primes": count_primes,
     # TODO: add "pow", "avg", etc. Validate input types!
 }
 
-def demo_rpc_server(host: str, port: int) -> None:
+def rpc_respond(line: bytes) -> bytes:
+    """Turn one request line into one response line (shared by the thread and asyncio servers)."""
+    try:
+        req = json.loads(line.decode())
+        op = req.get("op")
+        args = req.get("args", [])
+        if op not in FUNCTIONS:
+            raise ValueError(f"unknown op {op!r}")
+        result = FUNCTIONS[op](*args) #FUNCTION['add'](2,3)
+        resp = {"ok": True, "result": result}
+    except Exception as e:
+        resp = {"ok": False, "error": str(e)}
+    return (json.dumps(resp) + "\n").encode()
+
+def demo_rpc_server(host: str, port: int, rate: float = 0.0, max_conns: int = 0) -> None:
     """
     A newline‑delimited JSON protocol. Each line is a JSON request:
       {"op":"add","args":[2,3]}
@@ -219,30 +365,32 @@ def demo_rpc_server(host: str, port: int) -> None:
     - This demonstrates "calling a Python function from other applications" over TCP.
     - Protocol design: pick framing (we use '\n' delimited JSON).
     - Robustness: validate ops and arity; return structured errors.
+    - --rate / --max-conns apply per request line / per client IP, as in the echo servers.
     """
+    limiter, conns = client_limits(rate, max_conns)
+
     def handle(conn: socket.socket, addr: Tuple[str, int]) -> None:
         print(f"[rpc] client {addr} connected")
         buf = b""
-        with conn:
-            while True:
-                chunk = conn.recv(4096)
-                if not chunk:
-                    print(f"[rpc] client {addr} disconnected")
-                    break
-                buf += chunk
-                while b"\n" in buf:
-                    line, buf = buf.split(b"\n", 1)
-                    try:
-                        req = json.loads(line.decode())
-                        op = req.get("op")
-                        args = req.get("args", [])
-                        if op not in FUNCTIONS:
-                            raise ValueError(f"unknown op {op!r}")
-                        result = FUNCTIONS[op](*args) #FUNCTION['add'](2,3)
-                        resp = {"ok": True, "result": result}
-                    except Exception as e:
-                        resp = {"ok": False, "error": str(e)}
-                    conn.sendall((json.dumps(resp) + "\n").encode())
+        try:
+            with conn:
+                while True:
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        print(f"[rpc] client {addr} disconnected")
+                        break
+                    buf += chunk
+                    while b"\n" in buf:
+                        line, buf = buf.split(b"\n", 1)
+                        if limiter is not None and not limiter.allow(addr[0]):
+                            conn.sendall(b"rate limit exceeded\n")
+                            continue
+                        conn.sendall(rpc_respond(line))
+        except ConnectionError:
+            print(f"[rpc] client {addr} reset the connection")
+        finally:
+            if conns is not None:
+                conns.release(addr[0])
 
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
@@ -251,6 +399,10 @@ def demo_rpc_server(host: str, port: int) -> None:
         print(f"[rpc] Listening on {host}:{port} (LAN hint: {get_lan_ip_guess()}:{port}) | ops={list(FUNCTIONS)}")
         while True:
             conn, addr = s.accept()
+            if conns is not None and not conns.acquire(addr[0]):
+                with conn:
+                    conn.sendall(b"too many connections\n")
+                continue
             threading.Thread(target=handle, args=(conn, addr), daemon=True).start()
 
 
@@ -309,86 +461,95 @@ def demo_http_by_hand(host: str, port: int, path: str) -> None:
     request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n"
     with socket.create_connection((host, port), timeout=5) as s:
         s.sendall(request.encode())
-        response = b""
-        while True:
+        # Grow one bytearray in place (bytes += chunk would copy everything each time).
+        # We only print the head, so stop reading as soon as the blank line has arrived.
+        head = bytearray()
+        while b"\r\n\r\n" not in head:
             chunk = s.recv(4096)
             if not chunk:
                 break
-            response += chunk
-    head = response.split(b"\r\n\r\n", 1)[0]
-    print(head.decode(errors="replace"))
+            head += chunk
+    print(bytes(head).split(b"\r\n\r\n", 1)[0].decode(errors="replace"))
 
     # TODOs:
     # - Parse the status code and headers into a dict.
     # - Save the body to a file when status is 200 OK.
+    # (http_client.py next to this file does both, plus keep-alive and chunked bodies;
+    #  try: --demo http_get)
+
+
+def demo_http_get(host: str, port: int, path: str, out: str) -> None:
+    """
+    Same request through the small HTTP/1.1 client in http_client.py: parsed status and
+    headers, body streamed to a file in 64 KiB pieces (never fully in memory).
+    """
+    from http_client import HTTPConnectionPool
+
+    url = f"http://{host}:{port}{path}"
+    with HTTPConnectionPool() as pool, open(out, "wb") as f:
+        resp = pool.get(url, sink=f)
+    print(f"{resp.status} {resp.reason}")
+    for name, value in resp.headers.items():
+        print(f"{name}: {value}")
+    print(f"[http_get] saved {resp.body_length} bytes to {out}")
 
 
 # ---------- DEMO 6: Flask LAN Guessing Game ----------
 
-def demo_guess_game(host: str, port: int) -> None:
-    """
-    A light web app you can hit from your phone/laptop on the same LAN.
-    You'll submit a guess; when host clicks REVEAL, the app shows who was closest.
+GUESS_PAGE = """
+<!doctype html>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>LAN Guessing Game</title>
+<style>
+  body { font-family: system-ui, sans-serif; max-width: 700px; margin: 2rem auto; padding: 0 1rem; }
+  h1,h2 { margin: 0.2rem 0 0.8rem }
+  form { margin-bottom: 1rem }
+  input, button { font-size: 1rem; padding: 0.4rem 0.6rem; }
+  ol { padding-left: 1.2rem }
+  .muted { color: #555 }
+</style>
+<h1>Guess the number (1–100)</h1>
+<p class="muted">Connected from: {{ ip }}</p>
+{% if not revealed %}
+  <form method="POST" action="/guess">
+    <label>Your name: <input name="name" required></label>
+    <label>Your guess: <input name="guess" type="number" min="1" max="100" required></label>
+    <button type="submit">Submit</button>
+  </form>
+  <p>{{ status }}</p>
+{% else %}
+  <h2>Revealed number: {{ target }}</h2>
+  <ol>
+  {% for row in ranking %}
+    <li>{{ row[0] }} — guessed {{ row[1] }} (Δ={{ row[2] }})</li>
+  {% endfor %}
+  </ol>
+{% endif %}
+
+<hr>
+<form method="POST" action="/reveal">
+  <button type="submit">Reveal (teacher)</button>
+</form>
+<form method="POST" action="/reset">
+  <button type="submit">Reset game (teacher)</button>
+</form>
+"""
 
-    NOTE: Requires Flask. If missing, pip install flask
 
-    THEORY:
-    - Shows how HTTP sits atop TCP (we use a framework so you don't hand‑roll routing).
-    - Demonstrates shared state and locking for thread safety.
+def create_guess_app(store, rate: float = 0.0):
     """
-    try:
-        from flask import Flask, request, redirect, render_template_string
-    except Exception as e:
-        print("[guess_game] Flask is required. Run: pip install flask")
-        print(f"Import error: {e}")
-        return
+    Build the Flask app around a store from guess_store.py.
+    The template is compiled ONCE here (render_template_string would re-parse it on every request).
+    rate > 0 limits each IP to about `rate` guesses per second (HTTP 429 beyond that).
+    """
+    from flask import Flask, request, redirect
 
     app = Flask(__name__)
-    lock = threading.Lock()
-    state = {
-        "target": _new_target(),
-        "revealed": False,
-        "guesses": {},  # name/ip -> int
-    }
-
-    PAGE = """
-    <!doctype html>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <title>LAN Guessing Game</title>
-    <style>
-      body { font-family: system-ui, sans-serif; max-width: 700px; margin: 2rem auto; padding: 0 1rem; }
-      h1,h2 { margin: 0.2rem 0 0.8rem }
-      form { margin-bottom: 1rem }
-      input, button { font-size: 1rem; padding: 0.4rem 0.6rem; }
-      ol { padding-left: 1.2rem }
-      .muted { color: #555 }
-    </style>
-    <h1>Guess the number (1–100)</h1>
-    <p class="muted">Connected from: {{ ip }}</p>
-    {% if not revealed %}
-      <form method="POST" action="/guess">
-        <label>Your name: <input name="name" required></label>
-        <label>Your guess: <input name="guess" type="number" min="1" max="100" required></label>
-        <button type="submit">Submit</button>
-      </form>
-      <p>{{ status }}</p>
-    {% else %}
-      <h2>Revealed number: {{ target }}</h2>
-      <ol>
-      {% for row in ranking %}
-        <li>{{ row[0] }} — guessed {{ row[1] }} (Δ={{ row[2] }})</li>
-      {% endfor %}
-      </ol>
-    {% endif %}
-
-    <hr>
-    <form method="POST" action="/reveal">
-      <button type="submit">Reveal (teacher)</button>
-    </form>
-    <form method="POST" action="/reset">
-      <button type="submit">Reset game (teacher)</button>
-    </form>
-    """
+    page = app.jinja_env.from_string(GUESS_PAGE)
+    limiter, _ = client_limits(rate)
+    if limiter is not None:
+        from rate_limit import install_flask_rate_limit
+        install_flask_rate_limit(app, limiter, paths={"/guess"})
 
     def user_name(req) -> str:
         name = (req.form.get("name") or "").strip()
@@ -399,20 +560,11 @@ def demo_guess_game(host: str, port: int) -> None:
 
     @app.route("/", methods=["GET"])
     def index():
-        with lock:
-            ip = request.headers.get("X-Forwarded-For", request.remote_addr or "?")
-            status = f"{len(state['guesses'])} guesses so far."
-            if state["revealed"]:
-                ranking = sorted(
-                    [(k, v, abs(v - state["target"])) for k, v in state["guesses"].items()],
-                    key=lambda x: x[2]
-                )
-                return render_template_string(
-                    PAGE, revealed=True, target=state["target"], ranking=ranking, ip=ip
-                )
-            return render_template_string(
-                PAGE, revealed=False, status=status, ip=ip
-            )
+        snap = store.snapshot()  # immutable: no lock needed while rendering
+        ip = request.headers.get("X-Forwarded-For", request.remote_addr or "?")
+        if snap.revealed:
+            return page.render(revealed=True, target=snap.target, ranking=snap.ranking, ip=ip)
+        return page.render(revealed=False, status=f"{snap.count} guesses so far.", ip=ip)
 
     @app.route("/guess", methods=["POST"])
     def guess():
@@ -422,9 +574,7 @@ def demo_guess_game(host: str, port: int) -> None:
                 raise ValueError
         except Exception:
             return redirect("/")
-        name = user_name(request)
-        with lock:
-            state["guesses"][name] = g
+        store.guess(user_name(request), g)
         return redirect("/")
 
     @app.route("/reveal", methods=["POST"])
@@ -432,8 +582,7 @@ def demo_guess_game(host: str, port: int) -> None:
         # Allow only requests originating from the same machine (localhost)
         if request.remote_addr not in ("127.0.0.1", "::1"):
             return "Forbidden: admin action allowed only from localhost", 403
-        with lock:
-            state["revealed"] = True
+        store.reveal()
         return redirect("/")
 
     @app.route("/reset", methods=["POST"])
@@ -441,14 +590,128 @@ def demo_guess_game(host: str, port: int) -> None:
         # Allow only requests originating from the same machine (localhost)
         if request.remote_addr not in ("127.0.0.1", "::1"):
             return "Forbidden: admin action allowed only from localhost", 403
-        with lock:
-            state["target"] = _new_target()
-            state["revealed"] = False
-            state["guesses"].clear()
+        store.reset()
         return redirect("/")
 
+    return app
+
+
+def demo_guess_game(host: str, port: int, production: bool = False, workers: int = 1,
+                    rate: float = 0.0) -> None:
+    """
+    A light web app you can hit from your phone/laptop on the same LAN.
+    You'll submit a guess; when host clicks REVEAL, the app shows who was closest.
+
+    NOTE: Requires Flask. If missing, pip install flask
+    Production mode (--production) also wants a real WSGI server:
+      pip install gunicorn   (Linux/macOS, several worker processes)
+      pip install waitress   (any OS, one process with many threads)
+
+    THEORY:
+    - Shows how HTTP sits atop TCP (we use a framework so you don't hand‑roll routing).
+    - Demonstrates shared state: writers take a lock, readers use an immutable snapshot.
+    - Flask's built-in server is for development; a school full of phones needs a WSGI
+      server with several workers. Separate processes don't share memory, so the game
+      state then moves to a small local database file (SQLite).
+    """
+    try:
+        import flask  # noqa: F401
+    except Exception as e:
+        print("[guess_game] Flask is required. Run: pip install flask")
+        print(f"Import error: {e}")
+        return
+    from guess_store import MemoryGuessStore, SQLiteGuessStore
+
     print(f"[guess_game] Open http://{get_lan_ip_guess()}:{port}/ on devices in your LAN")
-    app.run(host=host, port=port, debug=False)
+    if not production:
+        app = create_guess_app(MemoryGuessStore(_new_target), rate)
+        app.run(host=host, port=port, debug=False, threaded=True)
+        return
+
+    if workers > 1:
+        try:
+            from gunicorn.app.base import BaseApplication
+        except ImportError:
+            print("[guess_game] --workers > 1 needs gunicorn (pip install gunicorn); using 1 worker")
+            workers = 1
+    if workers > 1:
+        import tempfile
+        db_path = os.path.join(tempfile.gettempdir(), f"guess_game_{port}.sqlite3")
+        for suffix in ("", "-wal", "-shm"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(db_path + suffix)  # fresh game on every start
+        app = create_guess_app(SQLiteGuessStore(db_path, _new_target), rate)
+
+        class GuessGameServer(BaseApplication):
+            def load_config(self):
+                self.cfg.set("bind", f"{host}:{port}")
+                self.cfg.set("workers", workers)
+                self.cfg.set("worker_class", "gthread")
+                self.cfg.set("threads", 8)
+                self.cfg.set("backlog", 2048)
+
+            def load(self):
+                return app
+
+        print(f"[guess_game] gunicorn: {workers} processes x 8 threads, shared state in {db_path}")
+        GuessGameServer().run()
+        return
+
+    app = create_guess_app(MemoryGuessStore(_new_target), rate)
+    try:
+        from waitress import serve
+    except ImportError:
+        print("[guess_game] waitress not installed (pip install waitress); using Flask's threaded server")
+        app.run(host=host, port=port, debug=False, threaded=True)
+        return
+    print("[guess_game] waitress: 1 process x 32 threads")
+    serve(app, host=host, port=port, threads=32, backlog=2048, _quiet=True)
+
+
+def demo_guess_load(host: str, port: int, players: int, clients: int) -> None:
+    """
+    Load test for the guessing game: `players` simulated players (each loads the page,
+    submits a guess, loads the page again) driven over `clients` keep-alive connections.
+    """
+    import random
+    from http_client import HTTPConnectionPool, HTTPError
+
+    host = "127.0.0.1" if host == "0.0.0.0" else host
+    base = f"http://{host}:{port}"
+    form = {"Content-Type": "application/x-www-form-urlencoded"}
+    todo = list(range(players))
+    todo_lock = threading.Lock()
+    counts = {"requests": 0, "errors": 0}
+
+    def client() -> None:
+        with HTTPConnectionPool(max_idle_per_host=1) as pool:
+            while True:
+                with todo_lock:
+                    if not todo:
+                        return
+                    player = todo.pop()
+                try:
+                    for method, path, body in (("GET", "/", b""),
+                                               ("POST", "/guess", f"name=player{player}&guess={random.randint(1, 100)}".encode()),
+                                               ("GET", "/", b"")):
+                        resp = pool.request(method, base + path, headers=form if body else None, body=body)
+                        with todo_lock:
+                            counts["requests"] += 1
+                            counts["errors"] += resp.status >= 400
+                except (OSError, ValueError, HTTPError) as e:
+                    with todo_lock:
+                        counts["errors"] += 1
+                    print(f"[guess_load] {type(e).__name__}: {e}")
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    print(f"[guess_load] {players} players, {counts['requests']} requests in {elapsed:.2f}s "
+          f"-> {counts['requests'] / elapsed:,.0f} req/s, errors={counts['errors']}")
 
 
 def _new_target() -> int:
@@ -460,9 +723,195 @@ def _new_target() -> int:
 # ---------- Stretch: selectors/asyncio pointers (theory only) ----------
 # THEORY:
 # For many concurrent clients, threads can become heavy. Two scalable options:
-# 1) selectors module: multiplex sockets in one thread by reacting to readiness events.
+# 1) selectors module: multiplex sockets in one thread by reacting to readiness events
+#    (see demo_echo_server_selectors above).
 # 2) asyncio: high-level, single-threaded cooperative multitasking using await/async def.
+# DEMO 7 below uses asyncio inside each worker process.
+
+
+# ---------- DEMO 7: Multi-process servers with SO_REUSEPORT ----------
+# THEORY:
+# - Threads share one GIL, so CPU-heavy RPC ops (e.g. count_primes) use only one core.
+# - Fix: run N *processes*. Each one opens its own listening socket on the SAME port with
+#   SO_REUSEPORT; the kernel then spreads new connections across the N listeners.
+# - Each worker runs an asyncio event loop, so one process still serves many clients.
+# - Graceful shutdown: the parent catches Ctrl+C / SIGTERM and forwards SIGTERM to every
+#   worker; a worker stops accepting, closes its listener and exits.
+# - SO_REUSEPORT exists on Linux and the BSDs/macOS (not on Windows).
+
+async def _echo_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    with contextlib.suppress(ConnectionError):
+        while True:
+            data = await reader.read(1024)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    writer.close()
+
 
+async def _rpc_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    with contextlib.suppress(ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        while True:
+            line = await reader.readuntil(b"\n")
+            writer.write(rpc_respond(line[:-1]))
+            await writer.drain()
+    writer.close()
+
+
+SESSIONS: Dict[str, Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]]] = {
+    "echo": _echo_session,
+    "rpc": _rpc_session,
+}
+
+
+def reuseport_listener(host: str, port: int) -> socket.socket:
+    """A listening TCP socket that other processes may bind to the same (host, port)."""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise SystemExit("SO_REUSEPORT is not available on this OS; run without --workers")
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    s.bind((host, port))
+    s.listen(1024)
+    s.setblocking(False)
+    return s
+
+
+def _worker_main(kind: str, host: str, port: int, worker_id: int, rate: float = 0.0, max_conns: int = 0) -> None:
+    # Ctrl+C reaches the whole process group; let the parent coordinate shutdown instead.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        session = SESSIONS[kind]
+        if rate > 0 or max_conns > 0:
+            from rate_limit import limit_asyncio_session
+            # limits are per worker process (each process keeps its own counters)
+            session = limit_asyncio_session(session, *client_limits(rate, max_conns))
+        server = await asyncio.start_server(session, sock=reuseport_listener(host, port))
+        async with server:
+            await stop.wait()
+        print(f"[workers] worker {worker_id} (pid {multiprocessing.current_process().pid}) stopped")
+
+    asyncio.run(run())
+
+
+def start_workers(kind: str, host: str, port: int, workers: int,
+                  rate: float = 0.0, max_conns: int = 0) -> List[multiprocessing.Process]:
+    procs = [
+        multiprocessing.Process(target=_worker_main, args=(kind, host, port, i, rate, max_conns),
+                                name=f"{kind}-worker-{i}")
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    return procs
+
+
+def stop_workers(procs: List[multiprocessing.Process], timeout: float = 5.0) -> None:
+    for p in procs:
+        if p.is_alive():
+            p.terminate()  # SIGTERM -> graceful stop inside the worker
+    for p in procs:
+        p.join(timeout)
+        if p.is_alive():
+            p.kill()
+            p.join()
+
+
+def serve_multiprocess(kind: str, host: str, port: int, workers: int,
+                       rate: float = 0.0, max_conns: int = 0) -> None:
+    """
+    Run the echo or RPC server as `workers` processes sharing one port (SO_REUSEPORT).
+
+    TODOs:
+    - Restart a worker automatically if it crashes.
+    - Print how many connections each worker handled when it stops.
+    """
+    reuseport_listener(host, port).close()  # fail fast (port in use / no SO_REUSEPORT)
+    procs = start_workers(kind, host, port, workers, rate, max_conns)
+    print(f"[workers] {kind} server on {host}:{port} with {workers} processes "
+          f"(LAN hint: {get_lan_ip_guess()}:{port}) — Ctrl+C to stop")
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        for p in procs:
+            p.join()
+    except (KeyboardInterrupt, SystemExit):
+        print("\n[workers] shutting down...")
+    finally:
+        stop_workers(procs)
+
+
+def _free_port(host: str) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_listening(host: str, port: int, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def rpc_load(host: str, port: int, clients: int, requests: int, n: int) -> float:
+    """Drive the RPC server with `clients` connections x `requests` count_primes calls; return req/s."""
+    line = (json.dumps({"op": "count_primes", "args": [n]}) + "\n").encode()
+    errors: List[str] = []
+
+    def one_client() -> None:
+        with socket.create_connection((host, port), timeout=30) as s:
+            f = s.makefile("rb")
+            for _ in range(requests):
+                s.sendall(line)
+                if not json.loads(f.readline()).get("ok"):
+                    errors.append("server returned ok=false")
+
+    threads = [threading.Thread(target=one_client) for _ in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    if errors:
+        print(f"[rpc_bench] {len(errors)} errors, e.g. {errors[0]}")
+    return clients * requests / elapsed
+
+
+def demo_rpc_bench(host: str, workers: int, clients: int, requests: int, n: int = 20000) -> None:
+    """
+    Benchmark: RPC throughput with 1, 2, 4, ... up to `workers` processes.
+
+    Each round starts a fresh multi-process RPC server on a free local port, runs a
+    CPU-bound load (count_primes) from `clients` concurrent connections and stops it.
+    On a machine with free cores, req/s should grow roughly linearly with workers.
+    """
+    host = "127.0.0.1" if host == "0.0.0.0" else host
+    counts = sorted({1, workers, *(2 ** i for i in range(workers.bit_length()) if 2 ** i <= workers)})
+    clients = clients or 4 * workers
+    print(f"[rpc_bench] cpus={multiprocessing.cpu_count()} clients={clients} "
+          f"requests/client={requests} op=count_primes({n})")
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8}")
+    base = None
+    for w in counts:
+        port = _free_port(host)
+        procs = start_workers("rpc", host, port, w)
+        try:
+            _wait_until_listening(host, port)
+            rate = rpc_load(host, port, clients, requests, n)
+        finally:
+            stop_workers(procs)
+        base = base or rate
+        print(f"{w:>8} {rate:>10.1f} {rate / base:>7.2f}x")
 
 
 # ---------- Exercise Bank ----------
@@ -480,6 +929,7 @@ EXERCISE C — UDP “ping” RTT
 EXERCISE D — Concurrent echo features
 - Add a counter per client and include it in the echoed message: "[#3] you said ..."
 - Add a cap: after 100 messages, politely close the connection.
+- Run echo_server with --workers 4 and watch which worker pid serves each client.
 
 EXERCISE E — JSON-RPC ops & validation
 - Add "pow" (a**b) but only accept integers 0..10 to avoid huge numbers.
@@ -493,6 +943,7 @@ EXERCISE G — Guessing game enhancements
 - Add per‑person latest guess time and show a "fastest correct guess" ribbon.
 - Prevent duplicate names by appending a suffix or using IP as a stable key.
 - Add input rate limiting (e.g., ignore guesses faster than 1/sec per IP).
+  (Compare with --rate 1 and rate_limit.py: token bucket vs. sliding window.)
 """
 
 
@@ -505,6 +956,14 @@ class Args:
     port: int = 5000
     message: str = "hello"
     path: str = "/"
+    out: str = "download.bin"
+    workers: int = 1
+    rate: float = 0.0
+    max_conns: int = 0
+    production: bool = False
+    players: int = 1000
+    clients: int = 0
+    requests: int = 200
 
 
 def parse_args(argv) -> Args:
@@ -513,39 +972,67 @@ def parse_args(argv) -> Args:
         "echo_server",
         "echo_client",
         "echo_server_threads",
+        "echo_server_selectors",
         "rpc_server",
         "udp_time_server",
         "udp_time_client",
         "http_by_hand",
+        "http_get",
         "guess_game",
+        "guess_load",
+        "rpc_bench",
         "print_exercises",
     ], help="Which demo to run")
     p.add_argument("--host", default="0.0.0.0", help="Host/IP to bind/connect")
     p.add_argument("--port", type=int, default=5000, help="Port number")
     p.add_argument("--message", default="hello", help="Message for echo_client")
-    p.add_argument("--path", default="/", help="Path for http_by_hand")
+    p.add_argument("--path", default="/", help="Path for http_by_hand/http_get")
+    p.add_argument("--out", default="download.bin", help="Where http_get saves the body")
+    p.add_argument("--workers", type=int, default=1,
+                   help="Processes for echo_server/echo_server_threads/rpc_server (SO_REUSEPORT), guess_game --production; max workers for rpc_bench")
+    p.add_argument("--rate", type=float, default=0.0,
+                   help="Per-client messages (or /guess posts) per second; 0 = unlimited")
+    p.add_argument("--max-conns", type=int, default=0, help="Simultaneous connections per client IP; 0 = unlimited")
+    p.add_argument("--production", action="store_true", help="guess_game: WSGI server + shared store")
+    p.add_argument("--players", type=int, default=1000, help="Simulated players for guess_load")
+    p.add_argument("--clients", type=int, default=0,
+                   help="Concurrent connections for rpc_bench (default 4*workers) / guess_load (default 50)")
+    p.add_argument("--requests", type=int, default=200, help="Requests per client for rpc_bench")
     ns = p.parse_args(argv)
     return Args(**vars(ns))
 
 
 def main(argv=None) -> None:
     args = parse_args(argv or sys.argv[1:])
-    if args.demo == "echo_server":
+    if args.workers < 1:
+        raise SystemExit("--workers must be >= 1")
+    if args.workers > 1 and args.demo in ("echo_server", "echo_server_threads", "echo_server_selectors", "rpc_server"):
+        serve_multiprocess("rpc" if args.demo == "rpc_server" else "echo", args.host, args.port, args.workers,
+                           args.rate, args.max_conns)
+    elif args.demo == "echo_server":
         demo_echo_server(args.host, args.port)
     elif args.demo == "echo_client":
         demo_echo_client(args.host, args.port, args.message)
     elif args.demo == "echo_server_threads":
-        demo_echo_server_threads(args.host, args.port)
+        demo_echo_server_threads(args.host, args.port, args.rate, args.max_conns)
+    elif args.demo == "echo_server_selectors":
+        demo_echo_server_selectors(args.host, args.port, args.rate, args.max_conns)
     elif args.demo == "rpc_server":
-        demo_rpc_server(args.host, args.port)
+        demo_rpc_server(args.host, args.port, args.rate, args.max_conns)
     elif args.demo == "udp_time_server":
         demo_udp_time_server(args.host, args.port)
     elif args.demo == "udp_time_client":
         demo_udp_time_client(args.host, args.port)
     elif args.demo == "http_by_hand":
         demo_http_by_hand(args.host, args.port, args.path)
+    elif args.demo == "http_get":
+        demo_http_get(args.host, args.port, args.path, args.out)
     elif args.demo == "guess_game":
-        demo_guess_game(args.host, args.port)
+        demo_guess_game(args.host, args.port, args.production, args.workers, args.rate)
+    elif args.demo == "guess_load":
+        demo_guess_load(args.host, args.port, args.players, args.clients or 50)
+    elif args.demo == "rpc_bench":
+        demo_rpc_bench(args.host, args.workers, args.clients, args.requests)
     elif args.demo == "print_exercises":
         print(EXERCISES)
     else:
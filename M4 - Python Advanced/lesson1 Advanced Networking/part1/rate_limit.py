@@ -0,0 +1,229 @@
+"""
+Per-client rate limiting and connection caps for the lesson servers.
+
+    limiter = TokenBucketLimiter(rate=5, burst=10)    # 5 msgs/s, bursts of 10
+    if not limiter.allow(client_ip):
+        ...reject / drop...
+
+    conns = ConnectionLimiter(per_key=4, total=500)
+    if conns.acquire(client_ip):
+        try: serve(...)
+        finally: conns.release(client_ip)
+
+Two algorithms, both O(1) per check:
+- Token bucket: each key has `tokens` that refill at `rate`/s up to `burst`; a request spends one.
+- Sliding window (counter approximation): count requests in the current and previous
+  fixed window and weight the previous one by how much of it still overlaps.
+
+Memory is bounded: keys live in an OrderedDict used as an LRU; when more than `max_keys`
+clients are tracked, the least recently seen one is forgotten (it just starts fresh).
+
+Adapters for the servers in networking_in_python_lesson.py:
+- threads / selectors: call allow() / acquire() directly
+- asyncio: limit_asyncio_session(session, limiter, conns)
+- Flask: install_flask_rate_limit(app, limiter, paths={"/guess"})
+
+Benchmark (per-check cost with 1M distinct keys):
+    python rate_limit.py --keys 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional
+
+
+class _LRULimiter:
+    def __init__(self, max_keys: int, clock: Callable[[], float]) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        self._state: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def _get(self, key: Hashable, fresh: Callable[[float], list], now: float) -> list:
+        state = self._state
+        entry = state.get(key)
+        if entry is None:
+            entry = state[key] = fresh(now)
+            if len(state) > self.max_keys:
+                state.popitem(last=False)  # forget the least recently seen client
+        else:
+            state.move_to_end(key)
+        return entry
+
+
+class TokenBucketLimiter(_LRULimiter):
+    def __init__(self, rate: float, burst: float, max_keys: int = 100_000,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        super().__init__(max_keys, clock)
+        if rate <= 0 or burst < 1:
+            raise ValueError("need rate > 0 and burst >= 1")
+        self.rate = rate
+        self.burst = burst
+
+    def allow(self, key: Hashable, cost: float = 1.0) -> bool:
+        now = self.clock()
+        with self._lock:
+            entry = self._get(key, lambda t: [self.burst, t], now)   # [tokens, last refill]
+            tokens = min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+            entry[1] = now
+            if tokens >= cost:
+                entry[0] = tokens - cost
+                return True
+            entry[0] = tokens
+            return False
+
+
+class SlidingWindowLimiter(_LRULimiter):
+    def __init__(self, limit: int, window: float, max_keys: int = 100_000,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        super().__init__(max_keys, clock)
+        if limit < 1 or window <= 0:
+            raise ValueError("need limit >= 1 and window > 0")
+        self.limit = limit
+        self.window = window
+
+    def allow(self, key: Hashable) -> bool:
+        now = self.clock()
+        window = self.window
+        with self._lock:
+            entry = self._get(key, lambda t: [t - t % window, 0, 0], now)  # [window start, previous, current]
+            start = entry[0]
+            if now - start >= window:
+                # roll forward; more than one full window of silence clears "previous" too
+                entry[1] = entry[2] if now - start < 2 * window else 0
+                entry[2] = 0
+                entry[0] = start = now - now % window
+            weight = 1.0 - (now - start) / window
+            if entry[1] * weight + entry[2] >= self.limit:
+                return False
+            entry[2] += 1
+            return True
+
+
+class ConnectionLimiter:
+    """Caps simultaneous connections per client key and in total."""
+
+    def __init__(self, per_key: int = 0, total: int = 0) -> None:
+        self.per_key = per_key   # 0 = unlimited
+        self.total = total       # 0 = unlimited
+        self._open: dict = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> bool:
+        with self._lock:
+            n = self._open.get(key, 0)
+            if (self.per_key and n >= self.per_key) or (self.total and self._count >= self.total):
+                return False
+            self._open[key] = n + 1
+            self._count += 1
+            return True
+
+    def release(self, key: Hashable) -> None:
+        with self._lock:
+            n = self._open.get(key, 0) - 1
+            if n > 0:
+                self._open[key] = n
+            else:
+                self._open.pop(key, None)   # keeps memory proportional to *connected* clients
+            self._count = max(0, self._count - 1)
+
+
+# ---------- Adapters ----------
+
+def limit_asyncio_session(session, limiter=None, conns: Optional[ConnectionLimiter] = None,
+                          reject: bytes = b"rate limit exceeded\n"):
+    """
+    Wrap an asyncio `session(reader, writer)`. Connections over the cap are refused.
+    Every chunk the session reads is checked with limiter.allow(ip); chunks over the
+    limit are discarded and `reject` is sent back instead.
+    """
+    import asyncio
+
+    class _LimitedReader:
+        def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, key) -> None:
+            self._reader, self._writer, self._key = reader, writer, key
+
+        async def _checked(self, read):
+            while True:
+                data = await read()
+                if not data or limiter is None or limiter.allow(self._key):
+                    return data
+                self._writer.write(reject)
+
+        async def read(self, n: int = -1) -> bytes:
+            return await self._checked(lambda: self._reader.read(n))
+
+        async def readuntil(self, separator: bytes = b"\n") -> bytes:
+            return await self._checked(lambda: self._reader.readuntil(separator))
+
+        async def readline(self) -> bytes:
+            return await self._checked(self._reader.readline)
+
+    async def limited(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        key = (writer.get_extra_info("peername") or ("?",))[0]
+        if conns is not None and not conns.acquire(key):
+            writer.write(b"too many connections\n")
+            writer.close()
+            return
+        try:
+            await session(_LimitedReader(reader, writer, key), writer)
+        finally:
+            if conns is not None:
+                conns.release(key)
+
+    return limited
+
+
+def install_flask_rate_limit(app, limiter, paths: Optional[Iterable[str]] = None,
+                             key_func: Optional[Callable[[], Hashable]] = None) -> None:
+    """Answer 429 Too Many Requests when a client exceeds `limiter` (optionally only on `paths`)."""
+    from flask import request
+
+    limited_paths = set(paths) if paths is not None else None
+
+    def client_key() -> Hashable:
+        return request.remote_addr or "?"
+
+    key_func = key_func or client_key
+
+    @app.before_request
+    def _rate_limit():
+        if limited_paths is not None and request.path not in limited_paths:
+            return None
+        if not limiter.allow(key_func()):
+            return "Too many requests — slow down a little.", 429, {"Retry-After": "1"}
+        return None
+
+
+# ---------- Benchmark ----------
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="per-check overhead of the limiters")
+    ap.add_argument("--keys", type=int, default=1_000_000, help="distinct client keys")
+    ap.add_argument("--checks", type=int, default=2_000_000)
+    args = ap.parse_args()
+    rng = random.Random(1)
+    keys = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.keys)]
+    stream = [keys[rng.randrange(args.keys)] for _ in range(args.checks)]
+    for name, limiter in (("token bucket", TokenBucketLimiter(rate=5, burst=10, max_keys=args.keys)),
+                          ("sliding window", SlidingWindowLimiter(limit=10, window=1.0, max_keys=args.keys)),
+                          ("token bucket, LRU 100k", TokenBucketLimiter(rate=5, burst=10, max_keys=100_000))):
+        allow = limiter.allow
+        t0 = time.perf_counter()
+        for k in stream:
+            allow(k)
+        elapsed = time.perf_counter() - t0
+        print(f"{name:>24}: {elapsed / len(stream) * 1e9:6.0f} ns/check, tracking {len(limiter):,} keys")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# Run me with: python tests_guess_store.py
+import os, random, shutil, tempfile, threading, unittest
+
+from guess_store import MemoryGuessStore, SQLiteGuessStore
+
+TARGET = 40
+
+def baseline_ranking(guesses, target):
+    """What the original demo showed: a stable sort of the {name: guess} dict by distance."""
+    return sorted(((k, v, abs(v - target)) for k, v in guesses.items()), key=lambda x: x[2])
+
+class StoreTests:
+    """Shared by both stores; make_store() returns a fresh store whose target is TARGET."""
+
+    def test_01_ranking_matches_the_baseline(self):
+        store, guesses = self.make_store(), {}
+        rng = random.Random(5)
+        for k in range(200):                                    # every player guesses once
+            name, value = f"p{k}", rng.randint(1, 100)
+            store.guess(name, value)
+            guesses[name] = value
+        store.reveal()
+        self.assertEqual(list(store.snapshot().ranking), baseline_ranking(guesses, TARGET))
+
+    def test_02_reguess_goes_behind_its_new_distance(self):
+        store, guesses = self.make_store(), {}
+        for name, value in (("ann", 45), ("bob", 35), ("cat", 50), ("dan", 30), ("ann", 35), ("cat", 45)):
+            store.guess(name, value)
+            guesses[name] = value
+        store.reveal()
+        ranking = list(store.snapshot().ranking)
+        self.assertEqual(sorted(ranking), sorted(baseline_ranking(guesses, TARGET)))
+        self.assertEqual([r[2] for r in ranking], [r[2] for r in baseline_ranking(guesses, TARGET)])
+        # the baseline keeps first-guess order (ann, bob, cat); the stores use latest-guess order
+        self.assertEqual([r[0] for r in ranking], ["bob", "ann", "cat", "dan"])
+        store.guess("bob", 35)                                  # same number, still a new guess
+        self.assertEqual([r[0] for r in store.snapshot().ranking], ["ann", "cat", "bob", "dan"])
+
+    def test_03_snapshots_are_published_per_write(self):
+        store = self.make_store()
+        first = store.snapshot()
+        self.assertEqual((first.target, first.revealed, first.count, first.ranking), (TARGET, False, 0, ()))
+        store.guess("ann", 41)
+        store.guess("bob", 90)
+        store.guess("ann", 40)
+        hidden = store.snapshot()
+        self.assertEqual((hidden.version, hidden.count, hidden.ranking), (first.version + 3, 2, ()))
+        self.assertIs(store.snapshot(), hidden)                 # nothing changed: same object
+        store.reveal()
+        shown = store.snapshot()
+        self.assertEqual(shown.version, hidden.version + 1)
+        self.assertEqual(shown.ranking, (("ann", 40, 0), ("bob", 90, 50)))
+        self.assertEqual((hidden.revealed, hidden.ranking), (False, ()))   # old snapshots never change
+        store.reset()
+        fresh = store.snapshot()
+        self.assertEqual((fresh.version, fresh.revealed, fresh.count, fresh.ranking), (shown.version + 1, False, 0, ()))
+
+class MemoryGuessStoreTests(StoreTests, unittest.TestCase):
+    def make_store(self):
+        return MemoryGuessStore(lambda: TARGET)
+
+    def test_04_concurrent_writers(self):
+        store = self.make_store()
+        def play(t):
+            for k in range(200):
+                store.guess(f"t{t}-{k % 50}", 1 + (t * 7 + k) % 100)
+        threads = [threading.Thread(target=play, args=(t,)) for t in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        store.reveal()
+        snap = store.snapshot()
+        self.assertEqual((snap.version, snap.count, len(snap.ranking)), (8 * 200 + 1, 8 * 50, 8 * 50))
+        self.assertEqual([r[2] for r in snap.ranking], sorted(r[2] for r in snap.ranking))
+
+class SQLiteGuessStoreTests(StoreTests, unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="guess_store_")
+        self.path = os.path.join(self.tmpdir, "game.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def make_store(self):
+        return SQLiteGuessStore(self.path, lambda: TARGET)
+
+    def test_04_workers_share_the_file_through_the_version(self):
+        a = self.make_store()
+        b = SQLiteGuessStore(self.path, lambda: 99)             # a second worker: schema exists, target kept
+        a.guess("ann", 42)
+        seen = b.snapshot()
+        self.assertEqual((seen.target, seen.count), (TARGET, 1))
+        self.assertIs(b.snapshot(), seen)                       # cached until the version moves
+        a.reveal()
+        self.assertEqual(b.snapshot().ranking, (("ann", 42, 2),))
+        self.assertEqual(b.snapshot().version, seen.version + 1)
+
+    def test_05_one_connection_per_thread_and_process(self):
+        store = self.make_store()
+        db = store._db()
+        self.assertIs(store._db(), db)
+        other = []
+        t = threading.Thread(target=lambda: other.append(store._db()))
+        t.start()
+        t.join()
+        self.assertIsNot(other[0], db)
+        store._local.pid = os.getpid() + 1                      # as if this thread's connection came through fork()
+        self.assertIsNot(store._db(), db)
+        self.assertEqual(store._local.pid, os.getpid())
+        store.guess("ann", 40)                                  # the new connection works
+        self.assertEqual(store.snapshot().count, 1)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,125 @@
+# Run me with: python tests_http_client.py
+import io, socketserver, threading, unittest
+
+from http_client import HTTPConnectionPool, HTTPError, _start_test_server, fetch_once
+
+class OneShotHandler(socketserver.StreamRequestHandler):
+    """Answers as if keeping the connection alive, then drops it: what an idle timeout does."""
+    reply = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+
+    def handle(self):
+        while self.rfile.readline() not in (b"\r\n", b""):
+            pass
+        self.wfile.write(self.reply)
+
+def start(handler):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.server_address[1]
+
+class PoolTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server, port = _start_test_server()
+        cls.base = f"http://127.0.0.1:{port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_01_keep_alive_reuses_one_connection(self):
+        with HTTPConnectionPool() as pool:
+            responses = [pool.get(f"{self.base}/{n}") for n in range(20)]
+            self.assertEqual(pool.connections_opened, 1)
+        self.assertFalse(responses[0].reused_connection)
+        self.assertTrue(all(r.reused_connection for r in responses[1:]))
+        for n, r in enumerate(responses):                       # odd n are chunked
+            self.assertEqual((r.status, r.body), (200, (f"item {n} " * 50).encode()))
+            self.assertEqual(r.body_length, len(r.body))
+
+    def test_02_streaming_to_a_sink(self):
+        with HTTPConnectionPool() as pool:
+            f, pieces = io.BytesIO(), []
+            r = pool.get(f"{self.base}/7", sink=f)
+            self.assertIsNone(r.body)
+            self.assertEqual(f.getvalue(), b"item 7 " * 50)
+            r = pool.get(f"{self.base}/8", sink=pieces.append)
+            self.assertEqual(b"".join(pieces), b"item 8 " * 50)
+            self.assertEqual(r.body_length, len(b"item 8 " * 50))
+
+    def test_03_matches_fetch_once(self):
+        raw = fetch_once(f"{self.base}/4")
+        with HTTPConnectionPool() as pool:
+            self.assertTrue(raw.endswith(pool.get(f"{self.base}/4").body))
+
+class ReconnectTests(unittest.TestCase):
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_01_dropped_idle_connection_is_retried(self):
+        self.server, port = start(OneShotHandler)
+        with HTTPConnectionPool() as pool:
+            for _ in range(5):
+                r = pool.get(f"http://127.0.0.1:{port}/")
+                self.assertEqual((r.status, r.body), (200, b"ok"))
+                self.assertFalse(r.reused_connection)           # the retry used a fresh connection
+            self.assertEqual(pool.connections_opened, 5)
+
+    def test_02_fresh_connection_errors_are_raised(self):
+        class Truncated(OneShotHandler):
+            reply = b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nshort"
+        self.server, port = start(Truncated)
+        with HTTPConnectionPool() as pool:
+            with self.assertRaises(HTTPError):
+                pool.get(f"http://127.0.0.1:{port}/")
+            self.assertEqual(pool._idle.get(("127.0.0.1", port, False), []), [])
+
+    def test_03_stale_post_is_not_resent(self):
+        self.server, port = start(OneShotHandler)
+        with HTTPConnectionPool() as pool:
+            pool.get(f"http://127.0.0.1:{port}/")
+            with self.assertRaises(ConnectionError):
+                pool.request("POST", f"http://127.0.0.1:{port}/guess", body=b"guess=5")
+            self.assertEqual(pool.connections_opened, 1)
+            self.assertEqual(pool.request("PUT", f"http://127.0.0.1:{port}/x", body=b"1").body, b"ok")
+
+    def test_04_timeouts_are_not_retried(self):
+        class AnswersOnce(OneShotHandler):
+            connections = []
+            def handle(self):                                   # keeps the connection, stalls on request 2
+                self.connections.append(1)
+                super().handle()
+                while self.rfile.readline() not in (b"\r\n", b""):
+                    pass
+                self.rfile.read(1)
+        self.server, port = start(AnswersOnce)
+        with HTTPConnectionPool(timeout=0.3) as pool:
+            pool.get(f"http://127.0.0.1:{port}/")
+            with self.assertRaises(TimeoutError):
+                pool.get(f"http://127.0.0.1:{port}/slow")       # reused, idempotent, but timed out
+        self.assertEqual(len(AnswersOnce.connections), 1)
+
+    def test_05_bad_content_length(self):
+        class BadLength(OneShotHandler):
+            reply = b"HTTP/1.1 200 OK\r\nContent-Length: ten\r\n\r\nok"
+        self.server, port = start(BadLength)
+        with HTTPConnectionPool() as pool:
+            with self.assertRaises(HTTPError):
+                pool.get(f"http://127.0.0.1:{port}/")
+
+    def test_06_unframed_body_ends_at_close(self):
+        class Unframed(OneShotHandler):
+            reply = b"HTTP/1.0 200 OK\r\n\r\nuntil the end"
+        self.server, port = start(Unframed)
+        with HTTPConnectionPool() as pool:
+            r = pool.get(f"http://127.0.0.1:{port}/")
+            self.assertEqual(r.body, b"until the end")
+            self.assertEqual(pool._idle.get(("127.0.0.1", port, False), []), [])   # not pooled
+        with self.assertRaises(ValueError):
+            HTTPConnectionPool().get("ftp://127.0.0.1/")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
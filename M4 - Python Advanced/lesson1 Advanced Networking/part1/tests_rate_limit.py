@@ -0,0 +1,134 @@
+# Run me with: python tests_rate_limit.py
+import asyncio, threading, unittest
+
+from rate_limit import ConnectionLimiter, SlidingWindowLimiter, TokenBucketLimiter, limit_asyncio_session
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+class TokenBucketTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = TokenBucketLimiter(rate=2, burst=5, clock=self.clock)
+
+    def test_01_burst_then_refill(self):
+        self.assertEqual([self.limiter.allow("a") for _ in range(7)], [True] * 5 + [False] * 2)
+        self.clock.now += 0.5                                   # one token back
+        self.assertTrue(self.limiter.allow("a"))
+        self.assertFalse(self.limiter.allow("a"))
+        self.clock.now += 60                                    # refills only up to burst
+        self.assertEqual(sum(self.limiter.allow("a") for _ in range(10)), 5)
+
+    def test_02_keys_are_independent(self):
+        for _ in range(5):
+            self.limiter.allow("a")
+        self.assertFalse(self.limiter.allow("a"))
+        self.assertTrue(self.limiter.allow("b"))
+
+    def test_03_cost_and_bad_arguments(self):
+        self.assertTrue(self.limiter.allow("a", cost=4))
+        self.assertFalse(self.limiter.allow("a", cost=2))       # a refused request spends nothing
+        self.assertTrue(self.limiter.allow("a", cost=1))
+        with self.assertRaises(ValueError):
+            TokenBucketLimiter(rate=0, burst=5)
+        with self.assertRaises(ValueError):
+            TokenBucketLimiter(rate=1, burst=0.5)
+
+    def test_04_lru_forgets_the_oldest_key(self):
+        limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=3, clock=self.clock)
+        for key in "abc":
+            limiter.allow(key)
+        limiter.allow("a")                                      # a is now the most recent
+        limiter.allow("d")
+        self.assertEqual(len(limiter), 3)
+        self.assertTrue(limiter.allow("b"))                     # b was forgotten: starts fresh
+        self.assertFalse(limiter.allow("a"))
+
+class SlidingWindowTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(100.0)                           # window boundary
+        self.limiter = SlidingWindowLimiter(limit=10, window=10, clock=self.clock)
+
+    def test_01_limit_per_window(self):
+        self.assertEqual(sum(self.limiter.allow("a") for _ in range(15)), 10)
+        self.assertTrue(self.limiter.allow("b"))
+
+    def test_02_previous_window_is_weighted(self):
+        for _ in range(10):
+            self.limiter.allow("a")
+        self.clock.now = 115.0                                  # half of the previous window overlaps
+        self.assertEqual(sum(self.limiter.allow("a") for _ in range(10)), 5)
+        self.clock.now = 119.0                                  # 10% overlap: 10*0.1 + 5 used
+        self.assertEqual(sum(self.limiter.allow("a") for _ in range(10)), 4)
+
+    def test_03_long_silence_clears_history(self):
+        for _ in range(10):
+            self.limiter.allow("a")
+        self.clock.now = 125.0                                  # more than one full window later
+        self.assertEqual(sum(self.limiter.allow("a") for _ in range(15)), 10)
+        with self.assertRaises(ValueError):
+            SlidingWindowLimiter(limit=0, window=1)
+
+class ConnectionLimiterTests(unittest.TestCase):
+    def test_01_per_key_and_total(self):
+        conns = ConnectionLimiter(per_key=2, total=3)
+        self.assertTrue(conns.acquire("a"))
+        self.assertTrue(conns.acquire("a"))
+        self.assertFalse(conns.acquire("a"))
+        self.assertTrue(conns.acquire("b"))
+        self.assertFalse(conns.acquire("c"))                    # total reached
+        conns.release("a")
+        self.assertTrue(conns.acquire("c"))
+        for key in ("a", "b", "c"):
+            conns.release(key)
+        self.assertEqual((conns._open, conns._count), ({}, 0))
+        conns.release("a")                                      # an extra release stays at zero
+        self.assertEqual(conns._count, 0)
+
+    def test_02_unlimited_and_threads(self):
+        conns = ConnectionLimiter()
+        def worker():
+            for _ in range(1000):
+                conns.acquire("x")
+                conns.release("x")
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual((conns._open, conns._count), ({}, 0))
+
+class AsyncioAdapterTests(unittest.TestCase):
+    def test_01_session_is_limited(self):
+        async def echo(reader, writer):
+            while data := await reader.readline():
+                writer.write(data)
+            writer.close()
+
+        async def run():
+            conns = ConnectionLimiter(per_key=1)
+            limiter = TokenBucketLimiter(rate=0.001, burst=2)
+            server = await asyncio.start_server(limit_asyncio_session(echo, limiter, conns), "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"one\ntwo\nthree\n")
+            replies = [await reader.readline() for _ in range(3)]
+            second_r, second_w = await asyncio.open_connection("127.0.0.1", port)
+            refused = await second_r.read()
+            second_w.close()
+            writer.close()
+            await writer.wait_closed()
+            server.close()
+            await server.wait_closed()
+            return replies, refused
+
+        replies, refused = asyncio.run(run())
+        self.assertEqual(replies, [b"one\n", b"two\n", b"rate limit exceeded\n"])
+        self.assertEqual(refused, b"too many connections\n")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
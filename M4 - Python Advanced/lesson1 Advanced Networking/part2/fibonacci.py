@@ -0,0 +1,124 @@
+"""
+FIBONACCI ENGINE — shared by teacher_test_rigs.py (server_tcp_fib) and student_skeleton.py
+
+The classic loop `a, b = b, a + b` does n big-int additions: fine for N=30, hopeless for
+N in the millions. Fast doubling uses
+    F(2k)   = F(k) * (2*F(k+1) - F(k))
+    F(2k+1) = F(k)^2 + F(k+1)^2
+so it needs only ~log2(n) steps (each a few big-int multiplications).
+
+    fib(10)            -> 55
+    fib_mod(10**18, 1_000_000_007)
+    fib_decimal(10**6) -> the ~209k digit answer as text, cached for the rig
+
+Python 3.11+ refuses str() on ints with more than 4300 digits (sys.set_int_max_str_digits).
+Rather than lift that limit for every importer, to_decimal() builds the text through the
+decimal module, which has no such limit and multiplies huge numbers quickly.
+
+Benchmark (loop vs. fast doubling, N = 10^3 .. 10^7):
+    python fibonacci.py --max-exp 7
+"""
+
+from __future__ import annotations
+import argparse, decimal, functools, time
+
+_SMALL_BITS = 4096      # ~1233 digits: well under the str() limit, converted directly
+
+
+def fib_loop(n: int) -> int:
+    """Reference O(n) version (what the exercise started with)."""
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def _fib_pair(n: int, m: int = 0) -> tuple:
+    """(F(n), F(n+1)), optionally modulo m, walking the bits of n from the top."""
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * (2 * b - a)
+        d = a * a + b * b
+        if m:
+            c, d = c % m, d % m
+        a, b = (d, (c + d) % m if m else c + d) if bit == "1" else (c, d)
+    return a, b
+
+
+@functools.lru_cache(maxsize=64)
+def fib(n: int) -> int:
+    """F(n) with fast doubling; recent results are kept in an LRU cache."""
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    return _fib_pair(n)[0]
+
+
+def fib_mod(n: int, m: int) -> int:
+    """F(n) mod m without ever building the full big integer."""
+    if n < 0 or m <= 0:
+        raise ValueError("need n >= 0 and m > 0")
+    return _fib_pair(n, m)[0] % m
+
+
+def to_decimal(x: int) -> str:
+    """str(x) for ints of any size, without touching sys.set_int_max_str_digits."""
+    if x < 0:
+        return "-" + to_decimal(-x)
+    if x.bit_length() <= _SMALL_BITS:
+        return str(x)
+    ctx = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+    powers = {}
+
+    def pow2(bits):
+        if bits not in powers:
+            powers[bits] = ctx.power(decimal.Decimal(2), bits)
+        return powers[bits]
+
+    def convert(v, bits):
+        # split on a power of two: v = hi * 2**half + lo, each half converted recursively
+        if bits <= _SMALL_BITS:
+            return decimal.Decimal(v)
+        half = bits >> 1
+        hi, lo = v >> half, v & ((1 << half) - 1)
+        return ctx.add(ctx.multiply(convert(hi, bits - half), pow2(half)), convert(lo, half))
+
+    return str(convert(x, x.bit_length()))
+
+
+@functools.lru_cache(maxsize=16)
+def fib_decimal(n: int) -> str:
+    """F(n) as decimal text. For huge n the int -> str conversion costs more than fib itself."""
+    return to_decimal(fib(n))
+
+
+def fib_digits_estimate(n: int) -> int:
+    """Upper bound on the number of decimal digits in F(n) (log10 of the golden ratio ~ 0.20899)."""
+    return int(n * 0.20899) + 2
+
+
+# ---------- Benchmark ----------
+
+def _time(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="O(n) loop vs. fast doubling")
+    ap.add_argument("--max-exp", type=int, default=7, help="benchmark N = 10^3 .. 10^max_exp")
+    ap.add_argument("--loop-max-exp", type=int, default=5, help="skip the slow loop above 10^this")
+    args = ap.parse_args()
+    print(f"{'N':>10} {'loop s':>10} {'doubling s':>11} {'mod 1e9+7 s':>12} {'digits':>10}")
+    for e in range(3, args.max_exp + 1):
+        n = 10 ** e
+        fib.cache_clear()
+        loop = f"{_time(fib_loop, n):.4f}" if e <= args.loop_max_exp else "skipped"
+        fast = _time(fib, n)
+        mod = _time(fib_mod, n, 1_000_000_007)
+        assert e > args.loop_max_exp or fib(n) == fib_loop(n)
+        print(f"{n:>10} {loop:>10} {fast:>11.4f} {mod:>12.6f} {fib(n).bit_length() * 0.30103:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
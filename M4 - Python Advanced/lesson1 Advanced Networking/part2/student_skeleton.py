@@ -42,34 +42,34 @@ Exercises overview
 
 Tips
 ----
-- For TCP line I/O, you can wrap with: f = sock.makefile("rwb", buffering=0)
+- For TCP line I/O, use recv_line(sock) (buffered, see buffered_socket.py) instead of recv(1) loops.
 - For exercise 3, read lines until you see the exact line "---END---\n".
 - For UDP, use sendto/recvfrom with text (bytes).
 
 Run this file for quick local tests:
     python student_skeleton.py --demo client_tcp_fib --host 127.0.0.1 --port 7001
     python student_skeleton.py --demo client_udp_affine --host 127.0.0.1 --port 7002 --x 42
+    python student_skeleton.py --demo bench_udp_affine --host 127.0.0.1 --port 7002 --count 20000
     python student_skeleton.py --demo server_tcp_wordcount --host 0.0.0.0 --port 7003
     python student_skeleton.py --demo server_udp_checksum --host 0.0.0.0 --port 7004
+    python student_skeleton.py --demo server_udp_checksum --host 0.0.0.0 --port 7004 --workers 4
     python student_skeleton.py --demo server_tcp_rpc --host 0.0.0.0 --port 7005
 """
 
 from __future__ import annotations
-import argparse, socket, json, threading, sys, random
+import argparse, asyncio, codecs, contextlib, multiprocessing, selectors, socket, json, threading, sys, random, time
+try:
+    import numpy as np  # optional: vectorised checksums in the fast UDP server
+except ImportError:
+    np = None
+from buffered_socket import reader_for
+from fibonacci import fib, to_decimal
 
 # ---------- Helpers ----------
 
 def recv_line(sock: socket.socket) -> bytes:
     """Read until a newline (\\n). Returns the line excluding the trailing newline."""
-    buf = bytearray()
-    while True:
-        ch = sock.recv(1)
-        if not ch:
-            break
-        if ch == b"\n":
-            break
-        buf.extend(ch)
-    return bytes(buf)
+    return reader_for(sock).readline()
 
 def get_lan_ip_guess():
     try:
@@ -88,15 +88,13 @@ def student_client_tcp_fib(host: str, port: int) -> None:
     line = recv_line(sock).decode('utf-8').strip()
     print(f"Linie primita : {line}")
     if line.startswith("N="):
-        a=0
-        b=1
         n = int(line[2:])
-        for _ in range(n):
-            a, b = b, a + b
+        a = fib(n)  # fast doubling, O(log n) steps (see fibonacci.py)
 
-        response = f"{a}\n"
+        response = f"{to_decimal(a)}\n"   # str(a) refuses more than 4300 digits on 3.11+
         sock.sendall(response.encode('utf-8'))
-        print(f"Sent: {a}")
+        print(f"Sent: {response[:40].strip()}{'...' if len(response) > 41 else ''}")
+        print(f"Verdict: {recv_line(sock).decode().strip()}")
 
     sock.close()
 
@@ -113,28 +111,169 @@ def student_client_udp_affine(host: str, port: int, x: int) -> int:
 
     return int(text)
 
+# Pipelined version: thousands of requests in flight at once, matched back by their ID.
+# A request that gets no reply within `timeout` is sent again (up to `retries` times).
+
+class _AffineClientProtocol(asyncio.DatagramProtocol):
+    def __init__(self, ys: list) -> None:
+        self.ys = ys
+        self.inflight = {}            # id -> [index into xs, deadline, attempts]
+        self.wake = asyncio.Event()   # set whenever a slot frees up
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        parts = data.split()
+        if len(parts) == 4 and parts[0] == b"ID" and parts[2] == b"Y":
+            entry = self.inflight.pop(int(parts[1]), None)
+            if entry is not None:     # None: duplicate reply after a retransmission
+                self.ys[entry[0]] = int(parts[3])
+                self.wake.set()
+
+async def affine_many(host: str, port: int, xs: list, window: int = 1000,
+                      timeout: float = 0.5, retries: int = 5) -> tuple:
+    """Returns (ys, stats); ys[i] is None if request i never got an answer."""
+    loop = asyncio.get_running_loop()
+    ys = [None] * len(xs)
+    transport, proto = await loop.create_datagram_endpoint(
+        lambda: _AffineClientProtocol(ys), remote_addr=(host, port))
+    # bursts of replies arrive faster than we parse them; a big receive buffer avoids drops
+    transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    stats = {"sent": 0, "retransmits": 0, "failed": 0}
+    base = random.randint(1, 1 << 30)
+    inflight = proto.inflight
+    next_i = 0
+    try:
+        while next_i < len(xs) or inflight:
+            now = loop.time()
+            while next_i < len(xs) and len(inflight) < window:
+                rid = base + next_i
+                transport.sendto(f"ID {rid} X {xs[next_i]}\n".encode())
+                inflight[rid] = [next_i, now + timeout, 0]
+                stats["sent"] += 1
+                next_i += 1
+            proto.wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(proto.wake.wait(), timeout / 4)
+            now = loop.time()
+            for rid, entry in list(inflight.items()):
+                if entry[1] > now:
+                    continue
+                if entry[2] >= retries:
+                    del inflight[rid]
+                    stats["failed"] += 1
+                    continue
+                entry[1] = now + timeout
+                entry[2] += 1
+                transport.sendto(f"ID {rid} X {xs[entry[0]]}\n".encode())
+                stats["sent"] += 1
+                stats["retransmits"] += 1
+    finally:
+        transport.close()
+    return ys, stats
+
+def bench_udp_affine(host: str, port: int, count: int = 20000, bursts: int = 5,
+                     window: int = 2000, pause: float = 0.5) -> None:
+    """Bursty load: `bursts` rounds of `count` pipelined requests with idle gaps between them."""
+    async def run() -> None:
+        total = wrong = sent = failed = 0
+        busy = 0.0
+        for b in range(bursts):
+            xs = [random.randint(0, 2 ** 32 - 1) for _ in range(count)]
+            t0 = time.perf_counter()
+            ys, stats = await affine_many(host, port, xs, window=window)
+            elapsed = time.perf_counter() - t0
+            bad = sum(1 for x, y in zip(xs, ys) if y is not None and y != (3 * x + 1) % 2 ** 32)
+            print(f"[affine] burst {b + 1}: {count / elapsed:>10,.0f} req/s  sent={stats['sent']} "
+                  f"retransmits={stats['retransmits']} failed={stats['failed']} wrong={bad}")
+            total += count; wrong += bad; sent += stats["sent"]; failed += stats["failed"]; busy += elapsed
+            await asyncio.sleep(pause)
+        answered = total - failed
+        print(f"[affine] overall {total / busy:,.0f} req/s, datagram loss {100 * (sent - answered) / max(1, sent):.2f}%, "
+              f"failed requests {failed}, wrong answers {wrong}")
+    asyncio.run(run())
+
 # ---------- Exercise 3: Server (TCP) WordCount (TEXT with terminator) ----------
 
-def student_server_tcp_wordcount(host: str, port: int) -> None:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        text =''
-        s.bind((host, port))
-        s.listen()
-        con, adr = s.accept()
-        while True:
-            data = con.recv(1024)
+class WordCounter:
+    """
+    Streaming word/line/char counter. Feed it byte chunks of any size (a chunk may end
+    in the middle of a word, a line or even a multi-byte UTF-8 character); memory use
+    stays constant no matter how big the upload is.
+    """
+    TERMINATOR = "---END---"
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.words = self.lines = self.chars = 0
+        self.done = False          # True once the terminator line was seen
+        self._in_word = False      # previous chunk ended inside a word
+        self._line_head = ""       # first few chars of the current line (terminator check)
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        if self.done:
+            return
+        pieces = self._decoder.decode(data, final).split("\n")
+        for i, piece in enumerate(pieces):
+            if piece:
+                self.chars += len(piece)
+                self.words += len(piece.split())
+                if self._in_word and not piece[0].isspace():
+                    self.words -= 1  # word continued from the previous chunk
+                self._in_word = not piece[-1].isspace()
+                if len(self._line_head) <= len(self.TERMINATOR):
+                    self._line_head = (self._line_head + piece)[:len(self.TERMINATOR) + 2]
+            if i == len(pieces) - 1:
+                break  # no newline after the last piece (yet)
+            self.chars += 1
+            self.lines += 1
+            if self._line_head.rstrip("\r") == self.TERMINATOR:
+                # the terminator is not part of the document
+                self.lines -= 1
+                self.words -= 1
+                self.chars -= len(self._line_head) + 1
+                self.done = True
+                return
+            self._in_word = False
+            self._line_head = ""
+
+    def finish(self) -> None:
+        """Client closed without a terminator: count the unterminated last line."""
+        self.feed(b"", final=True)
+        if self._line_head and not self.done:
+            self.lines += 1
+        self.done = True
+
+    def reply(self) -> bytes:
+        return f"words={self.words},lines={self.lines},chars={self.chars}\n".encode()
+
+
+async def _wordcount_session(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    counter = WordCounter()
+    try:
+        while not counter.done:
+            data = await reader.read(64 * 1024)
             if not data:
+                counter.finish()
                 break
-            line = data.decode().strip()
-            if line == '---END---':
-                break
-            text += line + '\n'
-        l = text.count('\n')
-        w = len(text.split())
-        c = len(text)
-        response = f"words={w},lines={l},chars={c}\n"
-        con.sendall(response.encode())
-        con.close()
+            counter.feed(data)
+        writer.write(counter.reply())
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def student_server_tcp_wordcount(host: str, port: int) -> None:
+    async def serve() -> None:
+        server = await asyncio.start_server(_wordcount_session, host, port, reuse_address=True)
+        print(f"[wordcount] listening on {host}:{port} (LAN hint: {get_lan_ip_guess()}:{port})")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
 
 
 # ---------- Exercise 4: Server (UDP) Simple checksum ----------
@@ -150,6 +289,71 @@ def student_server_udp_checksum(host: str, port: int) -> None:
             response = f"LEN={n} SUM={s}\n".encode()
             sock.sendto(response, addr)
 
+# High-rate variant: drain the socket in batches into preallocated buffers, sum bytes
+# with NumPy when it's installed, and run several processes on one port (SO_REUSEPORT).
+#   python student_skeleton.py --demo server_udp_checksum --port 7004 --workers 4
+# Blast it from the teacher side:
+#   python teacher_test_rigs.py --demo client_udp_blast --host 127.0.0.1 --port 7004
+
+def checksum16(buf) -> int:
+    """Sum of all byte values modulo 65536."""
+    if np is not None:
+        return int(np.frombuffer(buf, dtype=np.uint8).sum(dtype=np.uint64)) % 65536
+    return sum(bytes(buf)) % 65536
+
+def _udp_checksum_worker(host: str, port: int, batch: int, reuse_port: bool) -> None:
+    pool = [bytearray(65535) for _ in range(batch)]      # one buffer per datagram in a batch
+    views = [memoryview(b) for b in pool]
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        sock.bind((host, port))
+        sock.setblocking(False)
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+        while True:
+            sel.select()
+            # drain up to `batch` datagrams before doing any work (recvmmsg-style)
+            got = []
+            for view in views:
+                try:
+                    n, addr = sock.recvfrom_into(view)
+                except (BlockingIOError, InterruptedError):
+                    break
+                got.append((view[:n], addr))
+            for data, addr in got:
+                reply = f"LEN={len(data)} SUM={checksum16(data)}\n".encode()
+                try:
+                    sock.sendto(reply, addr)
+                except (BlockingIOError, InterruptedError):
+                    pass  # send buffer full: UDP is allowed to drop
+
+def student_server_udp_checksum_fast(host: str, port: int, workers: int = 1, batch: int = 64) -> None:
+    reuse_port = workers > 1
+    if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+        raise SystemExit("SO_REUSEPORT is not available on this OS; use --workers 1")
+    print(f"[checksum] UDP {host}:{port} workers={workers} batch={batch} "
+          f"numpy={'yes' if np is not None else 'no'} (LAN hint: {get_lan_ip_guess()}:{port})")
+    if workers == 1:
+        try:
+            _udp_checksum_worker(host, port, batch, reuse_port)
+        except KeyboardInterrupt:
+            pass
+        return
+    procs = [multiprocessing.Process(target=_udp_checksum_worker, args=(host, port, batch, True), daemon=True)
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join()
+
 # ---------- Exercise 5: Server (TCP) JSON-RPC ----------
 
 def student_server_tcp_rpc(host: str, port: int) -> None:
@@ -203,11 +407,16 @@ def student_server_tcp_rpc(host: str, port: int) -> None:
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--demo", required=True, choices=[
-        "client_tcp_fib","client_udp_affine","server_tcp_wordcount","server_udp_checksum","server_tcp_rpc"
+        "client_tcp_fib","client_udp_affine","bench_udp_affine","server_tcp_wordcount","server_udp_checksum","server_tcp_rpc"
     ])
     ap.add_argument("--host", default="127.0.0.1")
     ap.add_argument("--port", type=int, default=7001)
     ap.add_argument("--x", type=int, default=42)
+    ap.add_argument("--count", type=int, default=20000, help="bench_udp_affine: requests per burst")
+    ap.add_argument("--window", type=int, default=2000, help="bench_udp_affine: requests in flight")
+    ap.add_argument("--workers", type=int, default=0,
+                    help="server_udp_checksum: >0 selects the batched multi-process server")
+    ap.add_argument("--batch", type=int, default=64, help="datagrams drained per wakeup (fast UDP server)")
     args = ap.parse_args()
 
     if args.demo == "client_tcp_fib":
@@ -215,10 +424,15 @@ def main():
     elif args.demo == "client_udp_affine":
         y = student_client_udp_affine(args.host, args.port, args.x)
         print(y)
+    elif args.demo == "bench_udp_affine":
+        bench_udp_affine(args.host, args.port, args.count, window=args.window)
     elif args.demo == "server_tcp_wordcount":
         student_server_tcp_wordcount(args.host, args.port)
     elif args.demo == "server_udp_checksum":
-        student_server_udp_checksum(args.host, args.port)
+        if args.workers:
+            student_server_udp_checksum_fast(args.host, args.port, args.workers, args.batch)
+        else:
+            student_server_udp_checksum(args.host, args.port)
     elif args.demo == "server_tcp_rpc":
         student_server_tcp_rpc(args.host, args.port)
 
@@ -5,7 +5,10 @@ All defaults bind to 0.0.0.0 for LAN access; change host to your LAN IP if desir
 """
 
 from __future__ import annotations
-import argparse, socket, json, random
+import argparse, asyncio, os, select, socket, json, random, time
+from collections import deque
+from buffered_socket import BufferedSocketReader, LineTooLong
+from fibonacci import fib_decimal, fib_digits_estimate
 
 # ---------- Utilities ----------
 def get_lan_ip_guess():
@@ -17,62 +20,101 @@ def get_lan_ip_guess():
     except Exception:
         return "127.0.0.1"
 
-# ---------- Ex1: Teacher server (TCP Fib challenge) ----------
+def same_integer(text: str, digits: str) -> bool:
+    """True if text spells the non-negative integer `digits` ("055" and "+55" count as 55).
+    Works on the digit strings, so answers past the int/str digit limit need no int()."""
+    text = text.strip()
+    if text.startswith("+"):
+        text = text[1:]
+    return text.isascii() and text.isdigit() and (text.lstrip("0") or "0") == (digits.lstrip("0") or "0")
 
-def server_tcp_fib(host: str, port: int) -> None:
-    def fib_mod(n: int,) -> int:
-        a, b = 0, 1
-        for _ in range(n):
-            a, b = b, (a + b)
-        return a
+# ---------- Ex1: Teacher server (TCP Fib challenge) ----------
 
+def server_tcp_fib(host: str, port: int, max_n: int = 30) -> None:
+    # max_n > 30 turns this into a stress test (students need an O(log n) fib, see fibonacci.py)
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         s.bind((host, port)); s.listen()
-        print(f"[FibSrv] Listening on {host}:{port} (LAN hint: {get_lan_ip_guess()}:{port})")
+        print(f"[FibSrv] Listening on {host}:{port} (LAN hint: {get_lan_ip_guess()}:{port}) N in 20..{max(30, max_n)}")
         while True:
             conn, addr = s.accept()
             with conn:
                 print(f"[FibSrv] {addr} connected")
-                n = random.randint(20, 30)
+                n = random.randint(20, max(30, max_n))
                 conn.sendall(f"N={n}\n".encode())
-                # read answer line
-                buf = bytearray()
-                while True:
-                    ch = conn.recv(1)
-                    if not ch or ch == b"\n":
-                        break
-                    buf.extend(ch)
+                # read answer line (F(n) has about 0.209*n digits)
+                reader = BufferedSocketReader(conn, max_line=fib_digits_estimate(n) + 64)
                 try:
-                    val = int(bytes(buf).decode().strip() or "-1")
-                    ok = (val == fib_mod(n))
-                    conn.sendall(b"OK\n" if ok else b"ERR\n")
-                    print(f"[FibSrv] N={n} got={val} -> {'OK' if ok else 'ERR'}")
-                except ValueError:
-                    conn.sendall(b"ERR\n")
+                    got = reader.readline().decode(errors="replace").strip()
+                except (LineTooLong, OSError):
+                    got = ""
+                ok = same_integer(got, fib_decimal(n))
+                conn.sendall(b"OK\n" if ok else b"ERR\n")
+                shown = got if len(got) <= 40 else f"{got[:12]}...({len(got)} digits)"
+                print(f"[FibSrv] N={n} got={shown or '-'} -> {'OK' if ok else 'ERR'}")
 
 # ---------- Ex2: Teacher server (UDP affine, TEXT) ----------
 
+def affine_reply(data: bytes):
+    """ "ID <id> X <x>" -> b"ID <id> Y <y>\\n", or None for malformed requests."""
+    try:
+        parts = data.decode().strip().split()
+        if len(parts) != 4 or parts[0].upper() != "ID" or parts[2].upper() != "X":
+            return None
+        _id = int(parts[1]); x = int(parts[3])
+    except (UnicodeDecodeError, ValueError):
+        return None
+    y = (3 * (x & 0xFFFFFFFF) + 1) & 0xFFFFFFFF
+    return f"ID {_id} Y {y}\n".encode()
+
 def server_udp_affine(host: str, port: int) -> None:
     with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
         s.bind((host, port))
         print(f"[AffSrv] UDP on {host}:{port} (LAN hint: {get_lan_ip_guess()}:{port})")
         while True:
             data, addr = s.recvfrom(1024)
-            try:
-                txt = data.decode().strip()
-                # Expect: "ID <id> X <x>"
-                parts = txt.split()
-                if len(parts) != 4 or parts[0].upper() != "ID" or parts[2].upper() != "X":
-                    continue
-                _id = int(parts[1]); x = int(parts[3])
-                y = (3 * (x & 0xFFFFFFFF) + 1) & 0xFFFFFFFF
-                reply = f"ID {_id} Y {y}\n".encode()
-                s.sendto(reply, addr)
-                print(f"[AffSrv] {addr} id={_id} x={x} -> y={y}")
-            except Exception:
-                # ignore malformed
-                pass
+            # Expect: "ID <id> X <x>"; malformed datagrams are ignored
+            reply = affine_reply(data)
+            if reply is None:
+                continue
+            s.sendto(reply, addr)
+            print(f"[AffSrv] {addr} {data.decode().strip()} -> {reply.decode().strip()}")
+
+class AffineProtocol(asyncio.DatagramProtocol):
+    """asyncio version: the event loop calls datagram_received for every packet, no blocking."""
+    def __init__(self) -> None:
+        self.transport = None
+        self.served = 0
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        reply = affine_reply(data)
+        if reply is not None:
+            self.transport.sendto(reply, addr)
+            self.served += 1
+
+def server_udp_affine_async(host: str, port: int, report_every: float = 5.0) -> None:
+    async def serve() -> None:
+        loop = asyncio.get_running_loop()
+        transport, proto = await loop.create_datagram_endpoint(AffineProtocol, local_addr=(host, port))
+        transport.get_extra_info("socket").setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        print(f"[AffSrv] asyncio UDP on {host}:{port} (LAN hint: {get_lan_ip_guess()}:{port})")
+        last = 0
+        try:
+            while True:
+                await asyncio.sleep(report_every)
+                if proto.served != last:
+                    print(f"[AffSrv] {(proto.served - last) / report_every:,.0f} req/s (total {proto.served})")
+                    last = proto.served
+        finally:
+            transport.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
 
 # ---------- Ex3: Teacher client (TCP WordCount, TEXT terminator) ----------
 
@@ -87,13 +129,8 @@ def client_tcp_wordcount(host: str, port: int) -> None:
             s.sendall((line + "\n").encode("utf-8"))
         s.sendall(b"---END---\n")  # terminator
         # read reply line
-        buf = bytearray()
-        while True:
-            ch = s.recv(1)
-            if not ch or ch == b"\n":
-                break
-            buf.extend(ch)
-    print("[WordCount] reply:", bytes(buf).decode().strip())
+        reply = BufferedSocketReader(s).readline()
+    print("[WordCount] reply:", reply.decode().strip())
 
 # ---------- Ex4: Teacher client (UDP checksum) ----------
 
@@ -109,6 +146,77 @@ def client_udp_checksum(host: str, port: int) -> None:
             except socket.timeout:
                 print("[Checksum] timeout (no reply)")
 
+def client_udp_blast(host: str, port: int, seconds: float = 5.0, window: int = 256,
+                     size: int = 64, timeout: float = 1.0) -> None:
+    """
+    Load test for the checksum server: keep `window` datagrams in flight for `seconds`.
+    Datagram k of the window is `size + k` bytes long, so the LEN in each reply tells us
+    which request it answers (for latency) and which SUM to expect.
+    """
+    payloads = [os.urandom(size + k) for k in range(window)]
+    expected = [sum(p) % 65536 for p in payloads]
+    sent_at = [0.0] * window          # 0.0 -> slot is free
+    free = deque(range(window))
+    latencies = []
+    sent = bad = lost = 0
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.setblocking(False)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        target = (host, port)
+        t0 = time.perf_counter()
+        end = t0 + seconds
+        next_expiry = t0 + timeout
+        while True:
+            now = time.perf_counter()
+            if now < end:
+                while free:
+                    k = free.popleft()
+                    try:
+                        s.sendto(payloads[k], target)
+                    except (BlockingIOError, InterruptedError):
+                        free.appendleft(k)
+                        break
+                    sent_at[k] = time.perf_counter()
+                    sent += 1
+            elif len(free) == window or now > end + timeout:
+                break
+            select.select([s], [], [], 0.01)
+            while True:
+                try:
+                    data = s.recv(128)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except ConnectionRefusedError:
+                    continue  # ICMP port unreachable from an earlier datagram
+                now = time.perf_counter()
+                try:
+                    n_txt, s_txt = data.decode().split()
+                    k = int(n_txt.split("=")[1]) - size
+                    value = int(s_txt.split("=")[1])
+                except (ValueError, IndexError):
+                    bad += 1
+                    continue
+                if not (0 <= k < window) or not sent_at[k]:
+                    continue  # late reply for a datagram we already counted as lost
+                latencies.append(now - sent_at[k])
+                bad += value != expected[k]
+                sent_at[k] = 0.0
+                free.append(k)
+            if now >= next_expiry:
+                for k in range(window):
+                    if sent_at[k] and now - sent_at[k] > timeout:
+                        sent_at[k] = 0.0
+                        lost += 1
+                        free.append(k)
+                next_expiry = now + timeout / 4
+        lost += sum(1 for t in sent_at if t)
+        elapsed = time.perf_counter() - t0
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3 if latencies else float("nan")
+    print(f"[Blast] sent={sent} replies={len(latencies)} lost={lost} ({100 * lost / max(1, sent):.2f}%) bad={bad}")
+    print(f"[Blast] {sent / elapsed:,.0f} pkt/s sent, {len(latencies) / elapsed:,.0f} replies/s")
+    print(f"[Blast] latency ms p50={pct(0.50):.3f} p90={pct(0.90):.3f} p99={pct(0.99):.3f}")
+
 # ---------- Ex5: Teacher RPC client (TCP) ----------
 
 def client_tcp_rpc(host: str, port: int) -> None:
@@ -119,39 +227,197 @@ def client_tcp_rpc(host: str, port: int) -> None:
         {"op":"oops"},  # should return ok:false
     ]
     with socket.create_connection((host, port), timeout=5) as s:
+        reader = BufferedSocketReader(s)
         for r in reqs:
             s.sendall((json.dumps(r) + "\n").encode())
             # read one response line
-            buf = bytearray()
-            while True:
-                ch = s.recv(1)
-                if not ch or ch == b"\n":
-                    break
-                buf.extend(ch)
-            print("[RPC] ->", r, "| <-", bytes(buf).decode().strip())
+            line = reader.readline()
+            print("[RPC] ->", r, "| <-", line.decode().strip())
+
+# ---------- Class grading: many student servers at once (asyncio) ----------
+# Roster file, one target per line ("#" starts a comment, the name is optional):
+#     alice 192.168.1.20:7003
+#     192.168.1.21:7003
+# Every target gets `rounds` randomized requests; all targets are tested concurrently.
+
+WORDS = ["to", "be", "or", "not", "question", "nobler", "mind", "suffer", "slings",
+         "arrows", "fortune", "é", "naïve", "über", "—", "ok!", "🙂"]
+
+def load_roster(path: str) -> list:
+    targets = []
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            *name, addr = line.split()
+            host, _, port = addr.rpartition(":")
+            targets.append((name[0] if name else addr, host, int(port)))
+    return targets
+
+def random_document(max_bytes: int) -> str:
+    target = random.randint(1, max_bytes)
+    lines, size = [], 0
+    while size < target:
+        line = " ".join(random.choices(WORDS, k=random.randint(0, 20)))
+        lines.append(line)
+        size += len(line) + 1
+    return "".join(l + "\n" for l in lines)
+
+async def _round_wordcount(host: str, port: int, max_bytes: int) -> tuple:
+    text = random_document(max_bytes)
+    data = text.encode("utf-8")
+    want = f"words={len(text.split())},lines={text.count(chr(10))},chars={len(text)}"
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(data + b"---END---\n")
+        await writer.drain()
+        got = (await reader.readline()).decode(errors="replace").strip()
+    finally:
+        writer.close()
+    return got == want, len(data), time.perf_counter() - start, f"want {want!r} got {got!r}"
+
+class _OneShotUDP(asyncio.DatagramProtocol):
+    def __init__(self) -> None:
+        self.reply = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data, addr) -> None:
+        if not self.reply.done():
+            self.reply.set_result(data)
+
+    def error_received(self, exc) -> None:
+        if not self.reply.done():
+            self.reply.set_exception(exc)
+
+CHECKSUM_MAX_DATAGRAM = 4096   # the exercise server reads with recvfrom(4096); longer datagrams get truncated
+
+async def _round_checksum(host: str, port: int, max_bytes: int) -> tuple:
+    payload = os.urandom(random.randint(0, min(max_bytes, CHECKSUM_MAX_DATAGRAM)))
+    want = f"LEN={len(payload)} SUM={sum(payload) % 65536}"
+    start = time.perf_counter()
+    transport, proto = await asyncio.get_running_loop().create_datagram_endpoint(
+        _OneShotUDP, remote_addr=(host, port))
+    try:
+        transport.sendto(payload)
+        got = (await proto.reply).decode(errors="replace").strip()
+    finally:
+        transport.close()
+    return got == want, len(payload), time.perf_counter() - start, f"want {want!r} got {got!r}"
+
+async def _round_rpc(host: str, port: int, max_bytes: int) -> tuple:
+    n = max(1, random.randint(1, max_bytes) // 8)
+    xs = [random.randint(-1000, 1000) for _ in range(n)]
+    word = "".join(random.choices("abcdefghij", k=max(1, n)))
+    cases = [
+        ({"op": "reverse", "s": word}, lambda r: r == word[::-1]),
+        ({"op": "sum", "xs": xs}, lambda r: r == sum(xs)),
+        ({"op": "uniq", "xs": xs}, lambda r: isinstance(r, list) and len(r) == len(set(r)) and set(r) == set(xs)),
+    ]
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port, limit=max(2 ** 16, 4 * max_bytes))
+    sent, failures = 0, []
+    try:
+        for req, check in cases:
+            line = (json.dumps(req) + "\n").encode()
+            writer.write(line)
+            await writer.drain()
+            sent += len(line)
+            resp = json.loads(await reader.readline() or b"null")
+            if not (isinstance(resp, dict) and resp.get("ok") and check(resp.get("result"))):
+                failures.append(req["op"])
+        writer.write(b'{"op":"oops"}\n')
+        await writer.drain()
+        resp = json.loads(await reader.readline() or b"null")
+        if not (isinstance(resp, dict) and resp.get("ok") is False):
+            failures.append("error-handling")
+    finally:
+        writer.close()
+    return not failures, sent, time.perf_counter() - start, f"failed: {', '.join(failures)}"
+
+ROUNDS = {"wordcount": _round_wordcount, "checksum": _round_checksum, "rpc": _round_rpc}
+
+async def _grade_target(name: str, host: str, port: int, exercise: str, rounds: int,
+                        max_bytes: int, timeout: float) -> dict:
+    latencies, passed, nbytes, last_error = [], 0, 0, ""
+    for _ in range(rounds):
+        start = time.perf_counter()
+        try:
+            ok, size, seconds, detail = await asyncio.wait_for(ROUNDS[exercise](host, port, max_bytes), timeout)
+        except Exception as e:
+            ok, size, seconds, detail = False, 0, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+        latencies.append(seconds)  # network time only, payload generation excluded
+        passed += ok
+        nbytes += size
+        if not ok:
+            last_error = detail
+    elapsed = sum(latencies) or 1e-9
+    latencies.sort()
+    pct = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3, 2)
+    return {"name": name, "target": f"{host}:{port}", "passed": passed, "rounds": rounds,
+            "mb_per_s": round(nbytes / elapsed / 1e6, 3), "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95), "p99_ms": pct(0.99), "error": last_error[:120]}
+
+async def _grade_all(targets: list, exercise: str, rounds: int, max_bytes: int, timeout: float) -> list:
+    return await asyncio.gather(*(
+        _grade_target(name, host, port, exercise, rounds, max_bytes, timeout)
+        for name, host, port in targets))
+
+def grade_roster(roster: str, exercise: str, rounds: int = 5, max_bytes: int = 1_000_000,
+                 timeout: float = 30.0, json_out: str = "") -> None:
+    targets = load_roster(roster)
+    if exercise == "checksum":
+        max_bytes = min(max_bytes, CHECKSUM_MAX_DATAGRAM)
+    print(f"[Grade] {exercise}: {len(targets)} targets x {rounds} rounds, payloads up to {max_bytes:,} bytes")
+    results = asyncio.run(_grade_all(targets, exercise, rounds, max_bytes, timeout))
+    print(f"{'student':<16} {'target':<22} {'pass':>6} {'MB/s':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8}  error")
+    for r in results:
+        print(f"{r['name']:<16} {r['target']:<22} {r['passed']:>3}/{r['rounds']:<2} {r['mb_per_s']:>8} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8}  {r['error']}")
+    if json_out:
+        with open(json_out, "w", encoding="utf-8") as f:
+            json.dump({"exercise": exercise, "results": results}, f, indent=2)
+        print(f"[Grade] wrote {json_out}")
 
 # ---------- CLI ----------
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--demo", required=True, choices=[
-        "server_tcp_fib","server_udp_affine","client_tcp_wordcount",
-        "client_udp_checksum","client_tcp_rpc"
+        "server_tcp_fib","server_udp_affine","server_udp_affine_async","client_tcp_wordcount",
+        "client_udp_checksum","client_udp_blast","client_tcp_rpc","grade_roster"
     ])
     ap.add_argument("--host", default="0.0.0.0")
     ap.add_argument("--port", type=int, default=7001)
+    ap.add_argument("--max-n", type=int, default=30, help="server_tcp_fib: largest N to ask (stress grading)")
+    ap.add_argument("--seconds", type=float, default=5.0, help="client_udp_blast: test duration")
+    ap.add_argument("--window", type=int, default=256, help="client_udp_blast: datagrams in flight")
+    ap.add_argument("--roster", help="grade_roster: file with one [name] host:port per line")
+    ap.add_argument("--exercise", choices=sorted(ROUNDS), default="wordcount", help="grade_roster: what to test")
+    ap.add_argument("--rounds", type=int, default=5, help="grade_roster: requests per student")
+    ap.add_argument("--max-bytes", type=int, default=1_000_000, help="grade_roster: largest random payload (checksum: at most 4096, one datagram)")
+    ap.add_argument("--timeout", type=float, default=30.0, help="grade_roster: seconds per round")
+    ap.add_argument("--json", default="", help="grade_roster: also write results to this JSON file")
     args = ap.parse_args()
 
     if args.demo == "server_tcp_fib":
-        server_tcp_fib(args.host, args.port)
+        server_tcp_fib(args.host, args.port, args.max_n)
     elif args.demo == "server_udp_affine":
         server_udp_affine(args.host, args.port)
+    elif args.demo == "server_udp_affine_async":
+        server_udp_affine_async(args.host, args.port)
     elif args.demo == "client_tcp_wordcount":
         client_tcp_wordcount(args.host, args.port)
     elif args.demo == "client_udp_checksum":
         client_udp_checksum(args.host, args.port)
+    elif args.demo == "client_udp_blast":
+        client_udp_blast(args.host, args.port, args.seconds, args.window)
     elif args.demo == "client_tcp_rpc":
         client_tcp_rpc(args.host, args.port)
+    elif args.demo == "grade_roster":
+        if not args.roster:
+            ap.error("grade_roster needs --roster")
+        grade_roster(args.roster, args.exercise, args.rounds, args.max_bytes, args.timeout, args.json)
 
 if __name__ == "__main__":
     main()
@@ -159,9 +425,13 @@ if __name__ == "__main__":
 """
 # Exercise 1 — start TCP Fib challenge (teacher = server)
 python teacher_test_rigs.py --demo server_tcp_fib --host 0.0.0.0 --port 7001
+# harder: N up to a million (answers are ~200k digits)
+python teacher_test_rigs.py --demo server_tcp_fib --host 0.0.0.0 --port 7001 --max-n 1000000
 
 # Exercise 2 — start UDP affine (teacher = server)
 python teacher_test_rigs.py --demo server_udp_affine --host 0.0.0.0 --port 7002
+# or the asyncio server for pipelined/benchmark clients (prints req/s instead of every packet)
+python teacher_test_rigs.py --demo server_udp_affine_async --host 0.0.0.0 --port 7002
 
 # Exercise 3 — test student WordCount (teacher = client)
 python teacher_test_rigs.py --demo client_tcp_wordcount --host <STUDENT_IP> --port 7003
@@ -169,6 +439,14 @@ python teacher_test_rigs.py --demo client_tcp_wordcount --host <STUDENT_IP> --po
 # Exercise 4 — test student UDP checksum (teacher = client)
 python teacher_test_rigs.py --demo client_udp_checksum --host <STUDENT_IP> --port 7004
 
+# Exercise 4 (load test) — packets/sec, loss and latency against the student checksum server
+python teacher_test_rigs.py --demo client_udp_blast --host <STUDENT_IP> --port 7004 --seconds 5 --window 256
+
 # Exercise 5 — test student RPC server (teacher = client)
 python teacher_test_rigs.py --demo client_tcp_rpc --host <STUDENT_IP> --port 7005
+
+# Whole class at once — every host:port in roster.txt, concurrently, randomized payloads
+python teacher_test_rigs.py --demo grade_roster --roster roster.txt --exercise wordcount --rounds 5 --max-bytes 2000000 --json results.json
+python teacher_test_rigs.py --demo grade_roster --roster roster.txt --exercise checksum
+python teacher_test_rigs.py --demo grade_roster --roster roster.txt --exercise rpc
 """
\ No newline at end of file
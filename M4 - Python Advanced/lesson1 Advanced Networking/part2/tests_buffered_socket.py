@@ -0,0 +1,58 @@
+# Run me with: python tests_buffered_socket.py
+import socket, unittest
+
+from buffered_socket import BufferedSocketReader, LineTooLong, reader_for
+
+class ChunkSocket:
+    """recv() hands out the given chunks one at a time, then b"" (EOF)."""
+    def __init__(self, *chunks):
+        self.chunks = list(chunks)
+
+    def recv(self, n):
+        return self.chunks.pop(0)[:n] if self.chunks else b""
+
+class ReaderTests(unittest.TestCase):
+    def test_01_lines_across_chunks(self):
+        reader = BufferedSocketReader(ChunkSocket(b"N=2", b"5\nN=", b"7\n\nlast"))
+        self.assertEqual([reader.readline() for _ in range(5)], [b"N=25", b"N=7", b"", b"last", b""])
+
+    def test_02_terminator_split_across_chunks(self):
+        data = b"one\r\n> two\r\n> three"
+        for cut in range(1, len(data)):                           # recv() never returns b"" before EOF
+            reader = BufferedSocketReader(ChunkSocket(data[:cut], data[cut:]))
+            got = [reader.read_until(b"\r\n> ") for _ in range(3)]
+            self.assertEqual(got, [b"one", b"two", b"three"], cut)
+        with self.assertRaises(ValueError):
+            reader.read_until(b"")
+
+    def test_03_one_byte_chunks(self):
+        data = b"alpha\nbeta\n"
+        reader = BufferedSocketReader(ChunkSocket(*(data[i:i + 1] for i in range(len(data)))))
+        self.assertEqual((reader.readline(), reader.readline()), (b"alpha", b"beta"))
+        self.assertEqual(reader.recv_calls, len(data))
+
+    def test_04_readexactly_and_read_available(self):
+        reader = BufferedSocketReader(ChunkSocket(b"ab", b"cdef", b"gh"))
+        self.assertEqual(reader.readexactly(3), b"abc")
+        self.assertEqual(reader.read_available(), b"def")
+        self.assertEqual(reader.read_available(), b"gh")
+        self.assertEqual(reader.read_available(), b"")
+        with self.assertRaises(EOFError):
+            BufferedSocketReader(ChunkSocket(b"xy")).readexactly(3)
+
+    def test_05_line_too_long(self):
+        reader = BufferedSocketReader(ChunkSocket(b"x" * 40, b"x" * 40, b"\n"), max_line=64)
+        with self.assertRaises(LineTooLong):
+            reader.readline()
+
+    def test_06_reader_for_a_real_socket(self):
+        a, b = socket.socketpair()
+        with a, b:
+            a.sendall(b"first\nsecond\n")
+            self.assertEqual(reader_for(b).readline(), b"first")
+            self.assertIs(reader_for(b), reader_for(b))      # buffered "second" is not lost
+            self.assertEqual(reader_for(b).readline(), b"second")
+            self.assertEqual(reader_for(b).recv_calls, 1)
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,71 @@
+# Run me with: python tests_fibonacci.py
+import decimal, sys, unittest
+
+from fibonacci import fib, fib_decimal, fib_digits_estimate, fib_loop, fib_mod, to_decimal
+from teacher_test_rigs import same_integer
+
+class FibonacciTests(unittest.TestCase):
+    def test_01_fib_matches_the_loop(self):
+        for n in list(range(200)) + [1000, 1023, 1024, 4097]:
+            self.assertEqual(fib(n), fib_loop(n), n)
+        with self.assertRaises(ValueError):
+            fib(-1)
+
+    def test_02_fib_mod_matches_the_loop(self):
+        for m in (1, 2, 10, 1_000_000_007, 2**61 - 1):
+            for n in (0, 1, 2, 50, 999, 1000, 12345):
+                self.assertEqual(fib_mod(n, m), fib_loop(n) % m, (n, m))
+        self.assertEqual(fib_mod(10**18, 1_000_000_007), 209783453)
+        with self.assertRaises(ValueError):
+            fib_mod(5, 0)
+
+    def test_03_digits_estimate_is_an_upper_bound(self):
+        for n in (1, 10, 100, 1000, 5000):
+            digits = len(to_decimal(fib(n)))
+            self.assertLessEqual(digits, fib_digits_estimate(n))
+            self.assertGreaterEqual(digits, fib_digits_estimate(n) - 2)
+
+    def test_04_grading_accepts_any_spelling_of_the_number(self):
+        for answer in ("832040", "0832040", "+832040", " 832040\r"):
+            self.assertTrue(same_integer(answer, fib_decimal(30)), answer)
+        for answer in ("", "+", "-832040", "832041", "832 040", "8.3204e5"):
+            self.assertFalse(same_integer(answer, fib_decimal(30)), answer)
+        self.assertTrue(same_integer("00" + fib_decimal(50_000), fib_decimal(50_000)))   # past the int/str limit
+
+class ToDecimalTests(unittest.TestCase):
+    def setUp(self):
+        self.limit = sys.get_int_max_str_digits() if hasattr(sys, "get_int_max_str_digits") else None
+
+    def reference(self, x):
+        """str(x) with the int/str limit lifted just for the comparison."""
+        if self.limit is None:
+            return str(x)
+        sys.set_int_max_str_digits(0)
+        try:
+            return str(x)
+        finally:
+            sys.set_int_max_str_digits(self.limit)
+
+    def test_01_matches_str(self):
+        for x in (0, 7, -12345, 10**1232, 2**4096, 2**4097 - 1, 10**5000, -(3**20000), fib(60000)):
+            self.assertEqual(to_decimal(x), self.reference(x))
+
+    def test_02_needs_no_global_limit_change(self):
+        if self.limit is None:
+            self.skipTest("no int/str digit limit before Python 3.11")
+        text = fib_decimal(100_000)
+        self.assertEqual(sys.get_int_max_str_digits(), self.limit)
+        self.assertEqual(len(text), 20899)
+        self.assertEqual(text, self.reference(fib(100_000)))
+        with self.assertRaises(ValueError):
+            str(fib(100_000))                             # the limit is still in force for everyone else
+
+    def test_03_fib_decimal_round_trips(self):
+        text = fib_decimal(30_000)
+        with decimal.localcontext() as ctx:
+            ctx.prec = len(text) + 5
+            value = decimal.Decimal(text)
+            self.assertEqual(value % 1_000_000_007, fib_mod(30_000, 1_000_000_007))
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
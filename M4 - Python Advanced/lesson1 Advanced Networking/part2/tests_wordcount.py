@@ -0,0 +1,65 @@
+# Run me with: python tests_wordcount.py
+import random, unittest
+
+from student_skeleton import WordCounter
+
+TEXT = "héllo wörld\nnaïve  café — 日本語 テキスト\n\n  emoji 🙂🙃 end\ttab\nlast line\n"
+
+def expected(text):
+    """What teacher_test_rigs checks: counts over the text before the terminator line."""
+    return f"words={len(text.split())},lines={text.count(chr(10))},chars={len(text)}\n".encode()
+
+def count(chunks, finish=False):
+    counter = WordCounter()
+    for chunk in chunks:
+        counter.feed(chunk)
+    if finish:
+        counter.finish()
+    return counter
+
+class WordCounterTests(unittest.TestCase):
+    def setUp(self):
+        self.data = (TEXT + WordCounter.TERMINATOR + "\n").encode()
+
+    def test_01_one_chunk(self):
+        counter = count([self.data])
+        self.assertTrue(counter.done)
+        self.assertEqual(counter.reply(), expected(TEXT))
+
+    def test_02_every_split_point(self):
+        # includes splits inside every multi-byte character, word and the terminator
+        for cut in range(len(self.data) + 1):
+            self.assertEqual(count([self.data[:cut], self.data[cut:]]).reply(), expected(TEXT), cut)
+
+    def test_03_one_byte_at_a_time(self):
+        counter = count(self.data[i:i + 1] for i in range(len(self.data)))
+        self.assertEqual(counter.reply(), expected(TEXT))
+
+    def test_04_random_chunks_of_a_big_upload(self):
+        rng = random.Random(3)
+        text = TEXT * 500
+        data = (text + WordCounter.TERMINATOR + "\n").encode()
+        chunks, i = [], 0
+        while i < len(data):
+            n = rng.randint(1, 700)
+            chunks.append(data[i:i + n])
+            i += n
+        self.assertEqual(count(chunks).reply(), expected(text))
+
+    def test_05_terminator_rules(self):
+        crlf = "one two\r\n---END---\r\n".encode()
+        self.assertEqual(count([crlf]).reply(), expected("one two\r\n"))
+        not_end = "a ---END--- b\n---END---X\n---END---\n".encode()        # only the exact line counts
+        self.assertEqual(count([not_end]).reply(), expected("a ---END--- b\n---END---X\n"))
+        after = count([b"x\n---END---\nignored words\n"])
+        self.assertEqual(after.reply(), expected("x\n"))
+
+    def test_06_closed_without_terminator(self):
+        data = "ends mid-line 日本".encode()
+        counter = count([data[:-2], data[-2:]], finish=True)           # split inside the last character
+        self.assertEqual(counter.reply(), b"words=3,lines=1,chars=16\n")
+        self.assertEqual(count([b"whole line\n"], finish=True).reply(), b"words=2,lines=1,chars=11\n")
+        self.assertEqual(count([], finish=True).reply(), b"words=0,lines=0,chars=0\n")
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
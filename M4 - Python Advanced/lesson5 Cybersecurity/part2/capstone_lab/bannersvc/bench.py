@@ -0,0 +1,48 @@
+# Load test for server.py: many concurrent sessions, each sending pipelined HELP/FLAG commands.
+#   python server.py --async --backlog 4096 &
+#   python bench.py --sessions 2000 --commands 20
+import argparse, asyncio, time
+PROMPT = b"\r\n> "
+async def session(host, port, commands, pipeline, stats):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats["connect_errors"] += 1
+        return
+    try:
+        await reader.readuntil(PROMPT)  # banner
+        sent = 0
+        while sent < commands:
+            batch = min(pipeline, commands - sent)
+            # several commands in one write: the server has to split them by line
+            writer.write(b"".join(b"HELP\r\n" if (sent + i) % 2 else b"FLAG\r\n" for i in range(batch)))
+            await writer.drain()
+            for i in range(batch):
+                reply = await reader.readuntil(PROMPT)
+                if (sent + i) % 2 == 0 and b"FLAG{" not in reply:
+                    stats["bad"] += 1
+            sent += batch
+            stats["commands"] += batch
+    except (OSError, asyncio.IncompleteReadError):
+        stats["errors"] += 1
+    finally:
+        writer.close()
+async def run(args):
+    stats = {"commands": 0, "bad": 0, "errors": 0, "connect_errors": 0}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(session(args.host, args.port, args.commands, args.pipeline, stats)
+                           for _ in range(args.sessions)))
+    elapsed = time.perf_counter() - t0
+    print(f"{args.sessions} sessions x {args.commands} commands (pipeline {args.pipeline}) in {elapsed:.2f}s "
+          f"-> {stats['commands'] / elapsed:,.0f} commands/s | bad={stats['bad']} "
+          f"errors={stats['errors']} connect_errors={stats['connect_errors']}")
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=2323)
+    ap.add_argument("--sessions", type=int, default=2000)
+    ap.add_argument("--commands", type=int, default=20)
+    ap.add_argument("--pipeline", type=int, default=4, help="commands sent per write")
+    asyncio.run(run(ap.parse_args()))
+if __name__ == "__main__":
+    main()
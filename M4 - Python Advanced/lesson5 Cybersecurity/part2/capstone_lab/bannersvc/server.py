@@ -1,33 +1,91 @@
-import socket, threading
+import argparse, asyncio, socket, threading
 HOST = "0.0.0.0"
 PORT = 2323
 FLAG = "FLAG{tcp}"
 BANNER = b"DEMO-BANNER 1.0\r\nType HELP for commands.\r\n> "
-def handle(conn, addr):
-    conn.sendall(BANNER)
+BACKLOG = 5
+IDLE_TIMEOUT = 300.0   # seconds without a command before we hang up
+MAX_LINE = 1024
+def respond(line):
+    # one command per line, so "HELP\r\nFLAG\r\n" in a single packet is two commands
+    cmd = line.strip().upper()
+    if cmd == b"HELP":
+        return b"Commands: HELP, HELLO, FLAG\r\n> "
+    elif cmd == b"HELLO":
+        return b"Hello there.\r\n> "
+    elif cmd == b"FLAG":
+        return FLAG.encode() + b"\r\n> "
+    else:
+        return b"Unknown command.\r\n> "
+def handle(conn, addr, idle_timeout=IDLE_TIMEOUT):
+    conn.settimeout(idle_timeout)
+    f = conn.makefile("rb")
     try:
+        conn.sendall(BANNER)
         while True:
-            data = conn.recv(1024)
-            if not data: break
-            cmd = data.strip().upper()
-            if cmd == b"HELP":
-                conn.sendall(b"Commands: HELP, HELLO, FLAG\r\n> ")
-            elif cmd == b"HELLO":
-                conn.sendall(b"Hello there.\r\n> ")
-            elif cmd == b"FLAG":
-                conn.sendall(FLAG.encode() + b"\r\n> ")
-            else:
-                conn.sendall(b"Unknown command.\r\n> ")
+            line = f.readline(MAX_LINE)
+            if not line: break
+            if len(line) == MAX_LINE and not line.endswith(b"\n"):
+                conn.sendall(b"Line too long.\r\n")   # same as the asyncio server's limit
+                break
+            conn.sendall(respond(line))
+    except OSError:
+        pass
     finally:
+        f.close()
         conn.close()
+async def handle_async(reader, writer, idle_timeout=IDLE_TIMEOUT):
+    try:
+        writer.write(BANNER)
+        while True:
+            try:
+                line = await asyncio.wait_for(reader.readuntil(b"\n"), idle_timeout)
+            except asyncio.TimeoutError:
+                writer.write(b"\r\nIdle timeout.\r\n")
+                break
+            except asyncio.IncompleteReadError as e:
+                if e.partial.strip():
+                    writer.write(respond(e.partial))  # last command sent without a newline
+                break
+            except asyncio.LimitOverrunError:
+                writer.write(b"Line too long.\r\n")
+                break
+            writer.write(respond(line))
+            await writer.drain()
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+async def serve_async(host, port, backlog, idle_timeout):
+    server = await asyncio.start_server(
+        lambda r, w: handle_async(r, w, idle_timeout), host, port,
+        backlog=backlog, limit=MAX_LINE, reuse_address=True)
+    print(f"Listening on {host}:{port} (asyncio, backlog={backlog}, idle timeout={idle_timeout}s)")
+    async with server:
+        await server.serve_forever()
 def main():
+    ap = argparse.ArgumentParser(description="line-based banner service for the capstone lab")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--async", dest="use_async", action="store_true",
+                    help="asyncio server: one thread, thousands of sessions")
+    ap.add_argument("--backlog", type=int, default=BACKLOG, help="listen() queue length")
+    ap.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+    args = ap.parse_args()
+    if args.use_async:
+        try:
+            asyncio.run(serve_async(args.host, args.port, args.backlog, args.idle_timeout))
+        except KeyboardInterrupt:
+            pass
+        return
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    s.bind((HOST, PORT))
-    s.listen(5)
-    print(f"Listening on {HOST}:{PORT}")
+    s.bind((args.host, args.port))
+    s.listen(args.backlog)
+    print(f"Listening on {args.host}:{args.port}")
     while True:
         conn, addr = s.accept()
-        threading.Thread(target=handle, args=(conn, addr), daemon=True).start()
+        threading.Thread(target=handle, args=(conn, addr, args.idle_timeout), daemon=True).start()
 if __name__ == "__main__":
     main()
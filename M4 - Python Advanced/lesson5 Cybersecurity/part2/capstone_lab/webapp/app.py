@@ -1,7 +1,62 @@
-from flask import Flask, request, jsonify, send_from_directory
-app = Flask(__name__)
+import hashlib, mimetypes, os, stat, sys, threading
+from flask import Flask, Response, request, jsonify, send_from_directory, abort
+from urllib.parse import parse_qsl
+from werkzeug.security import safe_join
+app = Flask(__name__, static_folder=None)   # the built-in /static/<filename> rule shadowed static_files
 BANNER = "SimpleDemo/0.1"
 FLAG = "FLAG{web}"
+CACHE_ENABLED = os.environ.get("WEBAPP_CACHE", "1") != "0"
+CACHE_MAX = 1024                  # cached (route, query) pairs; ?id=<anything> must not grow it forever
+STATIC_INLINE_MAX = 256 * 1024    # bigger files go out via wsgi.file_wrapper (sendfile under gunicorn)
+_static = {}
+_lock = threading.Lock()
+class ResponseCache:
+    # WSGI layer in front of Flask: a repeat GET for a cached (route, query) is answered with the
+    # stored status, headers and body without building a request context at all.
+    def __init__(self, wsgi_app, paths, max_entries=CACHE_MAX):
+        self.wsgi_app = wsgi_app
+        self.paths = frozenset(paths)
+        self.max_entries = max_entries
+        self.entries = {}
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path not in self.paths or environ["REQUEST_METHOD"] not in ("GET", "HEAD"):
+            return self.wsgi_app(environ, start_response)
+        key = (path, tuple(sorted(parse_qsl(environ.get("QUERY_STRING", ""), keep_blank_values=True))))
+        hit = self.entries.get(key)
+        if hit is None:
+            hit = self._fill(key, environ)
+            if hit is None:    # not a 200: nothing to cache, replay what Flask said once
+                return self.wsgi_app(environ, start_response)
+        etag, status, headers, not_modified, body = hit
+        inm = environ.get("HTTP_IF_NONE_MATCH")
+        if inm and (inm.strip() == "*" or etag in (t.strip() for t in inm.split(","))):
+            start_response("304 NOT MODIFIED", not_modified)
+            return []
+        start_response(status, headers)
+        return [] if environ["REQUEST_METHOD"] == "HEAD" else [body]
+    def _fill(self, key, environ):
+        captured = []
+        environ = dict(environ, REQUEST_METHOD="GET")
+        chunks = self.wsgi_app(environ, lambda status, headers, exc_info=None: captured.append((status, headers)))
+        try:
+            body = b"".join(chunks)
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+        status, headers = captured[0]
+        if not status.startswith("200"):
+            return None
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        headers = [(k, v) for k, v in headers if k.lower() not in ("etag", "cache-control")]
+        headers += [("ETag", etag), ("Cache-Control", "no-cache")]   # clients may keep it but must revalidate
+        not_modified = [(k, v) for k, v in headers if k.lower() not in ("content-type", "content-length")]
+        hit = (etag, status, headers, not_modified, body)
+        with _lock:
+            if len(self.entries) >= self.max_entries:
+                self.entries.pop(next(iter(self.entries)))
+            self.entries[key] = hit
+        return hit
 @app.after_request
 def add_headers(resp):
     resp.headers["Server"] = BANNER
@@ -19,6 +74,39 @@ def note():
     return jsonify({"id":1, "owner":"guest", "note":"Keep looking."})
 @app.route("/static/<path:p>")
 def static_files(p):
-    return send_from_directory(".", p)
+    path = safe_join(app.root_path, p)
+    try:
+        st = os.stat(path) if path else None
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
+        abort(404)
+    if not CACHE_ENABLED or st.st_size > STATIC_INLINE_MAX:
+        return send_from_directory(".", p)
+    # small files are kept in memory and re-read only when size or mtime changes
+    version = (st.st_size, st.st_mtime_ns)
+    hit = _static.get(path)
+    if hit is None or hit[0] != version:
+        with open(path, "rb") as f:
+            body = f.read()
+        hit = (version, body, mimetypes.guess_type(path)[0] or "application/octet-stream",
+               hashlib.sha1(body).hexdigest())
+        _static[path] = hit
+    _, body, mimetype, etag = hit
+    resp = Response(body, mimetype=mimetype)
+    resp.set_etag(etag)
+    resp.last_modified = st.st_mtime
+    resp.cache_control.no_cache = True
+    if request.if_none_match.contains(etag):
+        resp.status_code = 304
+        resp.set_data(b"")
+    return resp
+if CACHE_ENABLED:
+    app.wsgi_app = ResponseCache(app.wsgi_app, ["/", "/note"])
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8080)
+    if "--production" in sys.argv:
+        # waitress keeps the app's Server header; gunicorn would add its own in front of it
+        from waitress import serve
+        serve(app, host="0.0.0.0", port=8080, threads=16)
+    else:
+        app.run(host="0.0.0.0", port=8080)
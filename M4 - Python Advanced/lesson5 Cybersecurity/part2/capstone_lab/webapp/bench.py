@@ -0,0 +1,56 @@
+# Load test for app.py: N client threads, each on its own keep-alive connection.
+# Compare with the cache off and on:
+#   WEBAPP_CACHE=0 python app.py --production &   python bench.py
+#   python app.py --production &                  python bench.py --conditional
+# waitress closes the connection after every 304, so --conditional also measures reconnects.
+import argparse, http.client, threading, time
+PATHS = ["/", "/note?id=1", "/note?id=0", "/static/app.py"]
+def worker(host, port, requests, conditional, stats, lock):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    etags = {}
+    done = not_modified = errors = 0
+    for i in range(requests):
+        path = PATHS[i % len(PATHS)]
+        headers = {"If-None-Match": etags[path]} if conditional and path in etags else {}
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        if resp.status == 304:
+            not_modified += 1
+        elif resp.getheader("ETag"):
+            etags[path] = resp.getheader("ETag")
+        done += 1
+    conn.close()
+    with lock:
+        stats["requests"] += done
+        stats["not_modified"] += not_modified
+        stats["errors"] += errors
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--clients", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=200, help="requests per client")
+    ap.add_argument("--conditional", action="store_true", help="revalidate with If-None-Match")
+    args = ap.parse_args()
+    stats = {"requests": 0, "not_modified": 0, "errors": 0}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=worker, args=(args.host, args.port, args.requests,
+                                                    args.conditional, stats, lock))
+               for _ in range(args.clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    print(f"{args.clients} clients x {args.requests} requests in {elapsed:.2f}s "
+          f"-> {stats['requests'] / elapsed:,.0f} req/s | 304s={stats['not_modified']} errors={stats['errors']}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# Concurrent service fingerprinting for the ports found by scanner.py.
+#
+# Every open port is probed at the same time, each probe under its own deadline:
+#   1) connect and wait briefly: many line-based services talk first (a banner)
+#   2) if the service stays quiet, send a tiny HTTP request and look at the first bytes
+#      ("HTTP/1.x 200 ..." -> it's a web server; also grab the Server header)
+#   3) classify: http / ssh / line (banner + prompt) / unknown
+# Results are yielded as each probe finishes, so the slow ports never hold up the fast ones.
+#
+# Usage:
+#   python fingerprint.py 127.0.0.1 8080 2323
+
+import argparse, asyncio, re, time
+from dataclasses import dataclass, field
+
+BANNER_WAIT = 0.5   # how long a talk-first service gets to say hello
+READ_LIMIT = 2048   # bytes kept from each response
+
+
+@dataclass
+class Fingerprint:
+    port: int
+    kind: str                 # "http" | "ssh" | "line" | "unknown" | "error"
+    banner: str = ""          # first bytes the service sent (decoded, trimmed)
+    server: str = ""          # HTTP Server header, if any
+    status: int = 0           # HTTP status code, if any
+    seconds: float = 0.0
+    error: str = field(default="", repr=False)
+
+    def describe(self):
+        extra = f" {self.status} server={self.server!r}" if self.kind == "http" else ""
+        text = self.banner.splitlines()[0][:60] if self.banner else ""
+        return f"{self.port:>5}/tcp {self.kind:<7}{extra} {text!r} ({self.seconds * 1000:.0f} ms)"
+
+
+def _parse_http_head(data):
+    head = data.split(b"\r\n\r\n", 1)[0].decode("latin-1", "replace")
+    lines = head.split("\r\n")
+    m = re.match(r"HTTP/\d(?:\.\d)?\s+(\d{3})", lines[0])
+    status = int(m.group(1)) if m else 0
+    server = ""
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "server":
+            server = value.strip()
+    return status, server
+
+
+async def _read_some(reader, wait):
+    try:
+        return await asyncio.wait_for(reader.read(READ_LIMIT), wait)
+    except asyncio.TimeoutError:
+        return b""
+
+
+async def _probe(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        first = await _read_some(reader, BANNER_WAIT)
+        if first.startswith(b"SSH-"):
+            return Fingerprint(port, "ssh", first.decode("ascii", "replace").strip())
+        if first and not first.startswith(b"HTTP/"):
+            return Fingerprint(port, "line", first.decode("ascii", "replace").strip())
+        # quiet service: ask it something HTTP-shaped and look at the first bytes of the answer
+        writer.write(f"HEAD / HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+        await writer.drain()
+        data = first + await _read_some(reader, BANNER_WAIT * 2)
+        if data.startswith(b"HTTP/"):
+            status, server = _parse_http_head(data)
+            return Fingerprint(port, "http", data.split(b"\r\n", 1)[0].decode("latin-1"), server, status)
+        return Fingerprint(port, "line" if data else "unknown", data.decode("ascii", "replace").strip())
+    finally:
+        writer.close()
+
+
+async def fingerprint_port(host, port, deadline=2.0):
+    start = time.perf_counter()
+    try:
+        fp = await asyncio.wait_for(_probe(host, port), deadline)
+    except (OSError, asyncio.TimeoutError) as e:
+        fp = Fingerprint(port, "error", error=f"{type(e).__name__}: {e}")
+    fp.seconds = time.perf_counter() - start
+    return fp
+
+
+async def fingerprint_all(host, ports, deadline=2.0):
+    """Async generator: one Fingerprint per port, in the order the probes finish."""
+    for done in asyncio.as_completed([fingerprint_port(host, p, deadline) for p in ports]):
+        yield await done
+
+
+def main():
+    ap = argparse.ArgumentParser(description="concurrent banner grab + HTTP detection")
+    ap.add_argument("host")
+    ap.add_argument("ports", nargs="+", type=int)
+    ap.add_argument("--deadline", type=float, default=2.0, help="seconds per port")
+    args = ap.parse_args()
+
+    async def run():
+        t0 = time.perf_counter()
+        async for fp in fingerprint_all(args.host, args.ports, args.deadline):
+            print(fp.describe() if fp.kind != "error" else f"{fp.port:>5}/tcp error   {fp.error}")
+        print(f"[fp] {len(args.ports)} ports in {time.perf_counter() - t0:.2f}s")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# Async content discovery ("dirbusting") for the web ports found by scanner.py / fingerprint.py.
+#
+#   - the wordlist is streamed from disk one line at a time (a 200 MB list costs no memory),
+#     through a small bounded queue, so reading never runs far ahead of the network
+#   - `connections` workers each own ONE keep-alive HTTP/1.1 connection and send request
+#     after request on it; a connection the server closes is reopened transparently
+#   - soft-404s: some apps answer 200 (or a redirect to /login) for every path. Before the
+#     run we request a few random paths and remember their (status, length) signature;
+#     during the run any response that lands in that cluster, or in a new cluster that grows
+#     past `cluster_limit` responses, is treated as "not found"
+#   - hits are yielded as soon as they are confirmed, not at the end: a new cluster is held
+#     back until it can no longer reach `cluster_limit` (once the wordlist is fully queued,
+#     when fewer requests are left than it would need; at the latest when the run ends)
+#
+# Usage:
+#   python pathenum.py 127.0.0.1 8080                        # built-in list of common paths
+#   python pathenum.py 127.0.0.1 8080 -w words.txt -x .bak,.txt
+#   python pathenum.py 127.0.0.1 8080 --bench 20000          # req/s with 1 vs. N connections
+
+import argparse, asyncio, secrets
+from collections import Counter
+from dataclasses import dataclass
+
+COMMON_PATHS = [
+    "admin", "administrator", "login", "logout", "dashboard", "api", "api/v1", "backup", "backups",
+    "config", "console", "debug", "flag", "flags", "hidden", "index.html", "note", "notes", "private",
+    "robots.txt", "secret", "secrets", "server-status", "static", "static/app.py", "static/index.html",
+    "test", "tmp", "upload", "uploads", "user", "users", ".git/HEAD", ".env", "app.py", "requirements.txt",
+]
+
+
+@dataclass
+class Hit:
+    path: str
+    status: int
+    length: int
+    location: str = ""
+
+    def describe(self):
+        extra = f" -> {self.location}" if self.location else ""
+        return f"{self.status} {self.length:>8} B  /{self.path}{extra}"
+
+
+def iter_wordlist(path=None, extensions=()):
+    """Yield candidate paths lazily: each word, then each word + extension. No file = COMMON_PATHS."""
+    def words():
+        if path is None:
+            yield from COMMON_PATHS
+            return
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                word = line.strip().lstrip("/")
+                if word and not word.startswith("#"):
+                    yield word
+    for word in words():
+        yield word
+        for ext in extensions:
+            yield word + ext
+
+
+class Soft404Filter:
+    """Decide whether a response is a real hit, based on (status, length) clustering."""
+
+    def __init__(self, tolerance=16, cluster_limit=25):
+        self.tolerance = tolerance          # bytes; lengths this close count as the same page
+        self.cluster_limit = cluster_limit  # this many look-alike answers = a catch-all page
+        self.baseline = set()
+        self.reflects_path = False          # does the not-found page echo the requested path?
+        self.clusters = Counter()
+        self._held = {}                     # signature -> [Hit] not yet confirmed
+
+    def _signature(self, word, status, length):
+        if self.reflects_path:
+            length -= len(word)
+        return status, length // self.tolerance
+
+    def calibrate(self, samples):
+        """samples: [(random_word, status, length), ...] for paths that cannot exist."""
+        by_status = {}
+        for word, status, length in samples:
+            by_status.setdefault(status, []).append((len(word), length))
+        for pairs in by_status.values():
+            # two random paths of different lengths whose page length moved by the same amount
+            if len({n for n, _ in pairs}) > 1 and len({length - n for n, length in pairs}) == 1:
+                self.reflects_path = True
+        for word, status, length in samples:
+            status_, bucket = self._signature(word, status, length)
+            # neighbouring buckets too, so a length right on a bucket edge still matches
+            self.baseline.update({(status_, bucket - 1), (status_, bucket), (status_, bucket + 1)})
+
+    def add(self, hit):
+        """Count one response; a candidate hit is held back until release() confirms its cluster."""
+        if hit.status == 404:
+            return
+        sig = self._signature(hit.path, hit.status, hit.length)
+        if sig in self.baseline:
+            return
+        self.clusters[sig] += 1
+        if self.clusters[sig] > self.cluster_limit:
+            self._held.pop(sig, None)       # a catch-all page after all: none of it was real
+        else:
+            self._held.setdefault(sig, []).append(hit)
+
+    def release(self, remaining=None):
+        """
+        Held hits whose cluster can no longer pass cluster_limit, given that at most
+        `remaining` responses are still to come (None = unknown: nothing is released).
+        """
+        if remaining is None:
+            return []
+        done = [sig for sig in self._held if self.clusters[sig] + remaining <= self.cluster_limit]
+        return [hit for sig in done for hit in self._held.pop(sig)]
+
+
+class _Connection:
+    """One keep-alive HTTP/1.1 connection: GET, read status + body length, repeat."""
+
+    def __init__(self, host, port, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self.reader = self.writer = None
+        self.opened = 0
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        self.opened += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def get(self, path):
+        """-> (status, body_length, location). Retries once if a reused connection went stale."""
+        for attempt in (0, 1):
+            fresh = self.writer is None
+            if fresh:
+                await self._open()
+            try:
+                return await asyncio.wait_for(self._exchange(path), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                if fresh or attempt:
+                    raise
+            except BaseException:
+                self.close()
+                raise
+
+    async def _exchange(self, path):
+        self.writer.write(f"GET /{path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                          f"User-Agent: pathenum/1.0\r\nAccept: */*\r\n\r\n".encode("latin-1"))
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        version, status = lines[0].split(" ", 2)[:2]
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" or (connection != "close" and version != "HTTP/1.0")
+        length = 0
+        if "content-length" in headers:
+            length = int(headers["content-length"])
+            await self._drain(length)
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                await self._drain(size + 2)
+                if size == 0:
+                    break
+                length += size
+        elif int(status) not in (204, 304) and not 100 <= int(status) < 200:
+            while chunk := await self.reader.read(65536):   # body ends when the server closes
+                length += len(chunk)
+            keep_alive = False
+        if not keep_alive:
+            self.close()
+        return int(status), length, headers.get("location", "")
+
+    async def _drain(self, n):
+        while n > 0:
+            chunk = await self.reader.read(min(n, 65536))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b"", n)
+            n -= len(chunk)
+
+
+class PathEnumerator:
+    def __init__(self, host, port, connections=16, timeout=5.0, soft404=None):
+        self.host, self.port = host, port
+        self.connections = connections
+        self.timeout = timeout
+        self.filter = soft404 or Soft404Filter()
+        self.stats = {"requests": 0, "hits": 0, "errors": 0, "connects": 0, "elapsed": 0.0}
+
+    async def calibrate(self, samples=4):
+        conn = _Connection(self.host, self.port, self.timeout)
+        results = []
+        try:
+            for i in range(samples):
+                word = secrets.token_hex(4 + 3 * i)   # different lengths, to spot echoed paths
+                status, length, _ = await conn.get(word)
+                results.append((word, status, length))
+        finally:
+            conn.close()
+            self.stats["connects"] += conn.opened
+        self.filter.calibrate(results)
+        return results
+
+    async def run(self, words, on_progress=None):
+        """Async generator of Hit, in the order they are found."""
+        await self.calibrate()
+        words = iter(words)
+        queue = asyncio.Queue(maxsize=self.connections * 4)
+        hits = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        left = {"queued": 0, "done": 0, "all_queued": False}
+
+        def confirm(remaining):
+            for hit in self.filter.release(remaining):
+                self.stats["hits"] += 1
+                hits.put_nowait(hit)
+
+        async def feed():
+            for word in words:
+                await queue.put(word)
+                left["queued"] += 1
+            left["all_queued"] = True
+            for _ in range(self.connections):
+                await queue.put(None)
+
+        async def worker():
+            conn = _Connection(self.host, self.port, self.timeout)
+            try:
+                while (word := await queue.get()) is not None:
+                    try:
+                        status, length, location = await conn.get(word)
+                    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                            asyncio.LimitOverrunError, ValueError):       # overrun: a header/chunk line > 64 KiB
+                        self.stats["errors"] += 1
+                    else:
+                        self.stats["requests"] += 1
+                        self.filter.add(Hit(word, status, length, location))
+                        if on_progress and self.stats["requests"] % 1000 == 0:
+                            on_progress(self)
+                    left["done"] += 1
+                    if left["all_queued"]:
+                        confirm(left["queued"] - left["done"])
+            finally:
+                conn.close()
+                self.stats["connects"] += conn.opened
+
+        tasks = [asyncio.create_task(feed())] + [asyncio.create_task(worker()) for _ in range(self.connections)]
+        workers_done = asyncio.gather(*tasks)     # the feeder too: a bad wordlist must not hang the run
+        try:
+            while True:
+                getter = asyncio.ensure_future(hits.get())
+                await asyncio.wait({getter, workers_done}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                break
+            if workers_done.exception() is None:
+                confirm(0)
+            while not hits.empty():
+                yield hits.get_nowait()
+            workers_done.result()                 # re-raise a worker that died instead of ending quietly
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.stats["elapsed"] = loop.time() - t0
+
+    def summary(self):
+        s = self.stats
+        rate = s["requests"] / s["elapsed"] if s["elapsed"] else 0.0
+        return (f"{s['requests']} requests in {s['elapsed']:.2f}s ({rate:,.0f} req/s) over "
+                f"{self.connections} connections ({s['connects']} opened): hits={s['hits']} errors={s['errors']}")
+
+
+async def _bench(host, port, count, connections):
+    words = lambda: (f"bench-{i}" for i in range(count))   # all misses: pure request throughput
+    for n in (1, connections):
+        enum = PathEnumerator(host, port, connections=n)
+        async for _ in enum.run(words()):
+            pass
+        print(f"[bench] {enum.summary()}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="async path enumeration with soft-404 detection")
+    ap.add_argument("host")
+    ap.add_argument("port", type=int)
+    ap.add_argument("-w", "--wordlist", help="one path per line (default: a short built-in list)")
+    ap.add_argument("-x", "--extensions", default="", help="e.g. .php,.bak,.txt")
+    ap.add_argument("-c", "--connections", type=int, default=16)
+    ap.add_argument("--timeout", type=float, default=5.0)
+    ap.add_argument("--bench", type=int, metavar="N", help="send N guaranteed misses, report req/s")
+    args = ap.parse_args()
+    if args.bench:
+        asyncio.run(_bench(args.host, args.port, args.bench, args.connections))
+        return
+    extensions = [e for e in args.extensions.split(",") if e]
+
+    async def run():
+        enum = PathEnumerator(args.host, args.port, args.connections, args.timeout)
+        async for hit in enum.run(iter_wordlist(args.wordlist, extensions),
+                                  on_progress=lambda e: print(f"... {e.summary()}")):
+            print(hit.describe())
+        print(enum.summary())
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
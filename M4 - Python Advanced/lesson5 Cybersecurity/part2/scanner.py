@@ -0,0 +1,274 @@
+# Adaptive async TCP connect scanner used by student.py (scan_all_ports).
+#
+# Compared to "create 65,535 tasks behind a fixed Semaphore":
+#   - each host is resolved ONCE, then we connect to the raw IP (no getaddrinfo per port)
+#   - (host, port) pairs come from a lazy generator; only `limit` probes exist at a time
+#   - a probe that times out is retried once with a longer deadline before we call it filtered
+#   - concurrency follows AIMD like TCP congestion control: +1 per "round" of healthy
+#     answers, halved when the OS runs out of sockets/buffers (EMFILE, ENOBUFS, ...) or when
+#     the share of timeouts rises (a rate-limiting firewall or an overloaded target); a
+#     steadily filtered host does not count, only a rise above the long-run timeout rate
+#   - a probe that keeps hitting resource errors is given up as "error" after a few retries
+#   - the connect timeout follows the measured RTT (srtt + 4*rttvar, like TCP's RTO),
+#     so a LAN scan waits milliseconds, not 350 ms, on filtered ports
+#   - targets can be hostnames, IPs or CIDR ranges (192.168.1.0/24)
+#
+# Usage:
+#   python scanner.py 192.168.1.23 --ports 1-65535
+#   python scanner.py 192.168.1.0/28 --ports 22,80,443,2323,8080
+#   python scanner.py --bench            # fixed-semaphore scan vs. this engine on local stand-ins
+
+import argparse, asyncio, errno, ipaddress, socket, time
+from collections import deque
+from contextlib import suppress
+
+# errors that mean "we are pushing too hard", not "port closed"
+BACKOFF_ERRNOS = {errno.EMFILE, errno.ENFILE, errno.ENOBUFS, errno.EAGAIN, errno.EADDRNOTAVAIL, errno.ENOMEM}
+MAX_BACKOFF_RETRIES = 8   # after this many resource errors in a row a probe is reported as "error"
+
+
+def parse_ports(spec):
+    """'22,80,8000-8100' -> sorted list of ports."""
+    ports = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            ports.update(range(int(lo), int(hi) + 1))
+        elif part:
+            ports.add(int(part))
+    return sorted(p for p in ports if 1 <= p <= 65535)
+
+
+class PortScanner:
+    def __init__(self, initial_concurrency=256, min_concurrency=16, max_concurrency=4096,
+                 initial_timeout=0.35, min_timeout=0.1, max_timeout=2.0):
+        self.limit = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt = None      # smoothed RTT of answered probes (open or refused)
+        self.rttvar = 0.0
+        self.stats = {"probes": 0, "open": 0, "closed": 0, "timeout": 0, "error": 0, "backoff": 0, "elapsed": 0.0}
+        self._last_backoff = 0.0
+        self.loss_fast = self.loss_slow = 0.0   # share of first attempts that time out: recent / long-run
+        self._loss_samples = 0
+
+    # ---------- target expansion ----------
+
+    async def _resolve(self, target):
+        """Yield IPs for a hostname, an IP or a CIDR range (resolved once per target)."""
+        try:
+            net = ipaddress.ip_network(target, strict=False)
+        except ValueError:
+            infos = await asyncio.get_running_loop().getaddrinfo(target, None, family=socket.AF_INET,
+                                                                 type=socket.SOCK_STREAM)
+            yield infos[0][4][0]
+            return
+        if net.num_addresses == 1:
+            yield str(net.network_address)
+        else:
+            for ip in net.hosts():
+                yield str(ip)
+
+    # ---------- adaptation ----------
+
+    def _on_rtt(self, rtt):
+        if self.srtt is None:
+            self.srtt, self.rttvar = rtt, rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.timeout = min(self.max_timeout, max(self.min_timeout, self.srtt + 4 * self.rttvar))
+        # additive increase: about +1 for every `limit` healthy answers
+        self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+
+    def _decrease(self, now):
+        # multiplicative decrease, at most once per timeout interval
+        if now - self._last_backoff > self.timeout:
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            self._last_backoff = now
+
+    def _on_backoff(self, now):
+        self.stats["backoff"] += 1
+        self._decrease(now)
+
+    def _on_first_attempt(self, timed_out, now):
+        """Timeouts as a loss signal: back off when they rise well above their long-run rate."""
+        x = 1.0 if timed_out else 0.0
+        self._loss_samples += 1
+        # plain running means until the windows fill, so a host that filters from the start
+        # does not look like a rise
+        self.loss_fast += (x - self.loss_fast) / min(self._loss_samples, 16)
+        self.loss_slow += (x - self.loss_slow) / min(self._loss_samples, 256)
+        if self.loss_fast > 2 * self.loss_slow + 0.1:
+            self._decrease(now)
+
+    # ---------- probing ----------
+
+    async def _probe(self, ip, port, timeout):
+        """Returns ('open'|'closed'|'timeout'|'backoff'|'error', rtt)."""
+        loop = asyncio.get_running_loop()
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        except OSError as e:
+            return ("backoff" if e.errno in BACKOFF_ERRNOS else "error"), 0.0
+        sock.setblocking(False)
+        start = loop.time()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+            return "open", loop.time() - start
+        except ConnectionRefusedError:
+            return "closed", loop.time() - start
+        except asyncio.TimeoutError:
+            return "timeout", 0.0
+        except OSError as e:
+            return ("backoff" if e.errno in BACKOFF_ERRNOS else "error"), 0.0
+        finally:
+            sock.close()
+
+    async def scan(self, targets, ports, on_progress=None):
+        """Async generator yielding (ip, port) for every open port, as soon as it is found."""
+        ports = list(ports)
+
+        async def pairs():
+            for target in targets:
+                async for ip in self._resolve(target):
+                    for port in ports:
+                        yield ip, port
+
+        source = pairs().__aiter__()
+        retry = deque()            # (ip, port, attempt, backoffs): resource errors and first timeouts, tried again
+        inflight = {}
+        exhausted = False
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        try:
+            while True:
+                while len(inflight) < int(self.limit) and (retry or not exhausted):
+                    if retry:
+                        ip, port, attempt, backoffs = retry.popleft()
+                    else:
+                        try:
+                            ip, port = await source.__anext__()
+                        except StopAsyncIteration:
+                            exhausted = True
+                            break
+                        attempt = backoffs = 0
+                    # a second try gets a longer deadline (the first may have lost to event-loop lag)
+                    timeout = self.timeout if attempt == 0 else min(self.max_timeout, 4 * self.timeout)
+                    inflight[asyncio.ensure_future(self._probe(ip, port, timeout))] = (ip, port, attempt, backoffs)
+                if not inflight:
+                    break
+                done, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+                now = loop.time()
+                for task in done:
+                    ip, port, attempt, backoffs = inflight.pop(task)
+                    outcome, rtt = task.result()
+                    if outcome == "backoff":
+                        self._on_backoff(now)
+                        if backoffs < MAX_BACKOFF_RETRIES:
+                            retry.append((ip, port, attempt, backoffs + 1))
+                            continue
+                        outcome = "error"   # the resource shortage is not going away
+                    if attempt == 0 and outcome in ("open", "closed", "timeout"):
+                        self._on_first_attempt(outcome == "timeout", now)
+                    if outcome == "timeout" and attempt == 0:
+                        retry.append((ip, port, 1, backoffs))
+                        continue
+                    self.stats["probes"] += 1
+                    if outcome in ("open", "closed"):
+                        self._on_rtt(rtt)
+                    self.stats[outcome] += 1
+                    if outcome == "open":
+                        yield ip, port
+                    if on_progress and self.stats["probes"] % 5000 == 0:
+                        on_progress(self)
+        finally:
+            for task in inflight:
+                task.cancel()
+            self.stats["elapsed"] = loop.time() - t0
+
+    def summary(self):
+        s = self.stats
+        rate = s["probes"] / s["elapsed"] if s["elapsed"] else 0.0
+        return (f"{s['probes']} probes in {s['elapsed']:.2f}s ({rate:,.0f} ports/s): open={s['open']} "
+                f"closed={s['closed']} timeout={s['timeout']} error={s['error']} backoffs={s['backoff']} "
+                f"| concurrency={int(self.limit)} timeout={self.timeout * 1000:.0f}ms")
+
+
+# ---------- Benchmark against local stand-ins for the capstone services ----------
+
+async def _fixed_semaphore_scan(host, ports, concurrency=512, timeout=0.35):
+    """The original student.py strategy, for comparison."""
+    sema = asyncio.Semaphore(concurrency)
+
+    async def check(port):
+        async with sema:
+            loop = asyncio.get_running_loop()
+            with suppress(Exception):
+                await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            try:
+                r, w = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+                w.close()
+                with suppress(Exception):
+                    await w.wait_closed()
+                return port
+            except Exception:
+                return None
+
+    tasks = [asyncio.create_task(check(p)) for p in ports]
+    return sorted(p for p in await asyncio.gather(*tasks) if p)
+
+
+async def _bench(ports):
+    async def banner(reader, writer):   # stand-in for capstone_lab/bannersvc
+        writer.write(b"DEMO-BANNER 1.0\r\n> ")
+        writer.close()
+
+    servers = [await asyncio.start_server(banner, "127.0.0.1", 0) for _ in range(3)]
+    expected = sorted(s.sockets[0].getsockname()[1] for s in servers)
+    ports = sorted(set(ports) | set(expected))
+    print(f"[bench] stand-in services on 127.0.0.1:{expected}, scanning {len(ports)} ports")
+
+    t0 = time.perf_counter()
+    found = await _fixed_semaphore_scan("localhost", ports)
+    old = time.perf_counter() - t0
+    print(f"[bench] fixed semaphore : {len(ports) / old:>9,.0f} ports/s  found {[p for p in found if p in expected]}")
+
+    scanner = PortScanner()
+    found = sorted([p async for _, p in scanner.scan(["localhost"], ports)])
+    print(f"[bench] adaptive engine : {len(ports) / scanner.stats['elapsed']:>9,.0f} ports/s  "
+          f"found {[p for p in found if p in expected]}")
+    print(f"[bench] {scanner.summary()}")
+    for s in servers:
+        s.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="adaptive asyncio TCP port scanner")
+    ap.add_argument("targets", nargs="*", help="hostnames, IPs or CIDR ranges")
+    ap.add_argument("--ports", default="1-65535", help="e.g. 1-1024,8080")
+    ap.add_argument("--concurrency", type=int, default=256, help="starting concurrency")
+    ap.add_argument("--bench", action="store_true", help="compare with the fixed-semaphore scan locally")
+    args = ap.parse_args()
+    ports = parse_ports(args.ports)
+    if args.bench:
+        asyncio.run(_bench(ports))
+        return
+    if not args.targets:
+        ap.error("give at least one target (or --bench)")
+
+    async def run():
+        scanner = PortScanner(initial_concurrency=args.concurrency)
+        async for ip, port in scanner.scan(args.targets, ports, on_progress=lambda s: print(f"... {s.summary()}")):
+            print(f"OPEN {ip}:{port}")
+        print(scanner.summary())
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,14 @@
 
 import asyncio, socket, re, sys, urllib.request, urllib.error
 from contextlib import suppress
+from fingerprint import fingerprint_all
+from pathenum import PathEnumerator, iter_wordlist
+from scanner import PortScanner
 
 HOST = "192.168.1.23"  # <-- CHANGE THIS to your IP
-TIMEOUT = 0.35         # seconds per connection (LAN-friendly)
-CONCURRENCY = 512      # async connections at once (tune down if needed)
+TIMEOUT = 0.35         # starting seconds per connection (adapts to the measured RTT)
+CONCURRENCY = 512      # starting async connections at once (adapts, AIMD-style)
+WORDLIST = None        # path to a wordlist file for content discovery (None = built-in list)
 FLAG_RE = re.compile(r"FLAG\{[A-Za-z0-9_\-]+\}")
 
 # ---------- STUDENT TODO #1 ----------
@@ -49,34 +53,17 @@ def try_tcp_flag(host: str, port: int):
 
 # ====== below this line is ready-to-run infrastructure ======
 
-async def check_port(sema, host, port):
-    async with sema:
-        loop = asyncio.get_event_loop()
-        with suppress(Exception):
-            fut = loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
-            await loop.run_in_executor(None, fut)  # resolve
-        try:
-            conn = asyncio.open_connection(host, port)
-            r, w = await asyncio.wait_for(conn, timeout=TIMEOUT)
-            w.close()
-            with suppress(Exception):
-                await w.wait_closed()
-            return port
-        except Exception:
-            return None
-
 async def scan_all_ports(host):
-    sema = asyncio.Semaphore(CONCURRENCY)
-    tasks = [asyncio.create_task(check_port(sema, host, p)) for p in range(1, 65536)]
+    # Adaptive engine (scanner.py): resolves HOST once, feeds ports lazily, tunes
+    # concurrency and timeout from what the network answers. TIMEOUT/CONCURRENCY are
+    # only the starting points now.
+    scanner = PortScanner(initial_concurrency=CONCURRENCY, initial_timeout=TIMEOUT)
     open_ports = []
-    for i, t in enumerate(asyncio.as_completed(tasks), 1):
-        res = await t
-        if res:
-            open_ports.append(res)
-            print(f"OPEN {res}")
-        # (Optional) a tiny progress cue every few thousand completions:
-        if i % 5000 == 0:
-            print(f"...checked {i} ports")
+    progress = lambda s: print(f"...checked {s.stats['probes']} ports")
+    async for _, port in scanner.scan([host], range(1, 65536), on_progress=progress):
+        open_ports.append(port)
+        print(f"OPEN {port}")
+    print(f"[+] {scanner.summary()}")
     return sorted(open_ports)
 
 def classify_and_hunt(host, port):
@@ -90,6 +77,55 @@ def classify_and_hunt(host, port):
         return ("TCP", flag)
     return (None, None)
 
+PROBE_DEADLINE = 5.0   # seconds a student probe (try_*_flag) may take per port
+
+async def hunt_flags(host, open_ports, web_ports=None):
+    """
+    Fingerprint every open port concurrently (fingerprint.py) and, as each result
+    streams in, run the matching student probe in a worker thread. Returns as soon as
+    both flags are known. HTTP ports are appended to `web_ports` if a list is given.
+    """
+    probes = {"http": try_http_flag, "line": try_tcp_flag}
+    web_flag = tcp_flag = None
+    hunts = set()
+
+    async def hunt(fp):
+        probe = probes.get(fp.kind)
+        try:
+            if probe is None:  # unknown service: let classify_and_hunt try both dialogues
+                kind, flag = await asyncio.wait_for(asyncio.to_thread(classify_and_hunt, host, fp.port), PROBE_DEADLINE)
+            else:
+                kind = "WEB" if fp.kind == "http" else "TCP"
+                flag = await asyncio.wait_for(asyncio.to_thread(probe, host, fp.port), PROBE_DEADLINE)
+        except Exception:
+            return fp.port, None, None
+        return fp.port, kind, flag
+
+    async for fp in fingerprint_all(host, open_ports):
+        print(f"[FP] {fp.describe() if fp.kind != 'error' else f'{fp.port} error {fp.error}'}")
+        if fp.kind == "http" and web_ports is not None:
+            web_ports.append(fp.port)
+        if fp.kind != "error":
+            hunts.add(asyncio.create_task(hunt(fp)))
+    for done in asyncio.as_completed(hunts):
+        port, kind, flag = await done
+        if kind == "WEB" and flag and not web_flag:
+            web_flag = (flag, port); print(f"[WEB] port {port} -> {flag}")
+        elif kind == "TCP" and flag and not tcp_flag:
+            tcp_flag = (flag, port); print(f"[TCP] port {port} -> {flag}")
+        if web_flag and tcp_flag:
+            break
+    for t in hunts:
+        t.cancel()
+    return web_flag, tcp_flag
+
+async def discover_paths(host, port):
+    """Guess common paths on a web port (pathenum.py), printing hits as they are found."""
+    enum = PathEnumerator(host, port)
+    async for hit in enum.run(iter_wordlist(WORDLIST)):
+        print(f"[PATH] port {port} {hit.describe()}")
+    print(f"[+] {enum.summary()}")
+
 def main():
     print(f"[+] Target: {HOST}")
     print("[+] Scanning all TCP ports (1..65535). This should be quick on a LAN...")
@@ -101,16 +137,13 @@ def main():
     print("\n[+] Open ports:")
     print(", ".join(map(str, open_ports)))
 
-    web_flag = None
-    tcp_flag = None
-    for p in open_ports:
-        kind, flag = classify_and_hunt(HOST, p)
-        if kind == "WEB" and not web_flag:
-            web_flag = (flag, p); print(f"[WEB] port {p} -> {flag}")
-        elif kind == "TCP" and not tcp_flag:
-            tcp_flag = (flag, p); print(f"[TCP] port {p} -> {flag}")
-        if web_flag and tcp_flag:
-            break
+    print("\n[+] Fingerprinting all open ports in parallel...")
+    web_ports = []
+    web_flag, tcp_flag = asyncio.run(hunt_flags(HOST, open_ports, web_ports))
+
+    for port in web_ports:
+        print(f"\n[+] Content discovery on port {port}...")
+        asyncio.run(discover_paths(HOST, port))
 
     print("\n=== RESULTS ===")
     print(f"WEB FLAG: {web_flag[0]} (port {web_flag[1]})" if web_flag else "WEB FLAG: not found")